@@ -1,102 +1,227 @@
+"""Synthetic tenant population with controllable racial disparities.
+
+    python Data_genrators.py                      # 5000 rows -> tenant_data_biased_{train,test}.csv
+    python Data_genrators.py --rows 10000000 --chunk-size 500000 --workers 8 --format parquet
+
+Rows are generated in fixed-size chunks with vectorized sampling and written
+incrementally, so memory use depends on the chunk size, not on --rows. Every
+chunk gets its own seed derived from (--seed, chunk index), so the output is
+the same whatever the worker count and chunks can be built in parallel.
+"""
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 
-np.random.seed(42)
-n = 5000
-a=0
-
-# Race array    
-races = np.random.choice(['White','Black','Hispanic'], p=[0.5,0.3,0.2], size=n)
-
-# Voucher based of race
-voucher = np.array([np.random.choice([0,1], p=[0.8,0.2]) if r=='White' 
-                    else np.random.choice([0,1], p=[0.5,0.5]) if r=='Black' 
-                    else np.random.choice([0,1], p=[0.6,0.4]) for r in races])
-
-# Credit score with disparities 
-credit_scores = []
-for r in races:
-    if r == 'White': credit_scores.append(np.random.normal(725, 50))
-    elif r == 'Black': credit_scores.append(np.random.normal(612, 60))
-    else: credit_scores.append(np.random.normal(661, 55))
-credit_scores = np.clip(credit_scores, 300, 850)
-
-# Eviction history
-eviction_history = (np.random.rand(n) < (0.1 + 0.2*voucher)).astype(int)
-
-# Income stability
-income_stability = np.clip(np.random.normal(80 - 15*voucher - 10*(races=='Black') - 5*(races=='Hispanic'), 10), 0, 100)
-
-# Criminal history
-criminal_history = (np.random.rand(n) < 0.1).astype(int)
-
-employment_years = np.clip(np.random.normal(5 + 2*(voucher==0), 2, n), 0, 40)
-
-savings_ratio = np.clip(np.random.normal(0.1 + 0.05*(income_stability/100), 0.05, n), 0, 1)
-
-rental_history_years = np.clip(np.random.normal(3 + 0.5*income_stability/100, 2, n), 0, 20)
-
-# Monthly income based on race benchmarks (USD)
-race_base_income = np.where(
-    races == 'White', 6400,
-    np.where(races == 'Black', 4200, 4800)
-)
-
-monthly_income = (
-    race_base_income *
-    (income_stability / 100) *      # stability adjustment
-    (1 - 0.25 * voucher) +           # voucher penalty
-    np.random.normal(0, 600, n)      # noise
-)
-
-monthly_income = np.clip(monthly_income, 800, 20000)
-income_component = np.log(monthly_income + 1)
-income_component = (income_component - income_component.mean()) / income_component.std()
-
-# Define a score
-# Higher credit, higher income stability = better
-# Eviction or criminal history = worse
-score = (
-    0.003*(credit_scores-600) +      # normalized credit contribution
-    0.05*income_stability -           # income contribution
-    0.2*eviction_history -            # eviction penalty
-    0.2*criminal_history +              # criminal penalty
-    0.05*employment_years +       
-    0.1*savings_ratio +            
-    0.03*rental_history_years+
-    0.25 * income_component  
-)
-
-# # Introduce systemic bias
-# score[races=='Black'] -= 0.1
-# score[races=='Hispanic'] -= 0.05
-# score[voucher==1] -= 0.05
-
-# # Approve if score above threshold
-# threshold = 4.12
-# approved = (score >= threshold).astype(int)
-
-# Create DataFrame
-df = pd.DataFrame({
-    'race': races,
-    'voucher': voucher,
-    'credit_score': credit_scores,
-    'eviction_history': eviction_history,
-    'criminal_history': criminal_history,
-    'income_stability': income_stability,
-    'monthly_income': monthly_income,
-    'approved': score,
-    'employment_years' : employment_years,
-    'savings_ratio' : savings_ratio,
-    'rental_history_years':rental_history_years
-})
-
-# Split into train/test
-from sklearn.model_selection import train_test_split
-train_df, test_df = train_test_split(df, test_size=0.2, random_state=42)
-
-train_df.to_csv("tenant_data_biased_train.csv", index=False)
-test_df.to_csv("tenant_data_biased_test.csv", index=False)
-
-print("DATA created!")
-
+RACES = np.array(['White', 'Black', 'Hispanic'])
+RACE_P = [0.5, 0.3, 0.2]
+
+# per race, in RACES order
+VOUCHER_P = np.array([0.2, 0.5, 0.4])          # P(voucher = 1)
+CREDIT_MEAN = np.array([725.0, 612.0, 661.0])
+CREDIT_STD = np.array([50.0, 60.0, 55.0])
+STABILITY_PENALTY = np.array([0.0, 10.0, 5.0])
+BASE_INCOME = np.array([6400.0, 4200.0, 4800.0])  # monthly, USD
+
+COLUMNS = [
+    'race', 'voucher', 'credit_score', 'eviction_history', 'criminal_history',
+    'income_stability', 'monthly_income', 'approved', 'employment_years',
+    'savings_ratio', 'rental_history_years',
+]
+
+# rows used to pin down the log-income standardization (see income_moments)
+PILOT_ROWS = 200_000
+
+
+def chunk_rng(seed: int, chunk: int) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(0, chunk)))
+
+
+def _sample_income(rng, n):
+    # the columns monthly_income is derived from, shared with income_moments
+    race = rng.choice(len(RACES), p=RACE_P, size=n)
+    voucher = (rng.random(n) < VOUCHER_P[race]).astype(int)
+    credit_scores = np.clip(rng.normal(CREDIT_MEAN[race], CREDIT_STD[race]), 300, 850)
+
+    income_stability = np.clip(rng.normal(80 - 15 * voucher - STABILITY_PENALTY[race], 10), 0, 100)
+
+    monthly_income = (
+        BASE_INCOME[race] *
+        (income_stability / 100) *      # stability adjustment
+        (1 - 0.25 * voucher) +           # voucher penalty
+        rng.normal(0, 600, n)            # noise
+    )
+    monthly_income = np.clip(monthly_income, 800, 20000)
+
+    return race, voucher, credit_scores, income_stability, monthly_income
+
+
+def income_moments(seed: int) -> tuple[float, float]:
+    # the income component used to be standardized with the mean/std of the
+    # whole dataset; a chunk can't see the whole dataset, so every chunk uses
+    # the moments of one fixed pilot sample instead
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(1,)))
+    log_income = np.log(_sample_income(rng, PILOT_ROWS)[-1] + 1)
+    return float(log_income.mean()), float(log_income.std())
+
+
+def generate_chunk(n: int, rng: np.random.Generator, moments: tuple[float, float]) -> pd.DataFrame:
+    race, voucher, credit_scores, income_stability, monthly_income = _sample_income(rng, n)
+
+    eviction_history = (rng.random(n) < (0.1 + 0.2 * voucher)).astype(int)
+    criminal_history = (rng.random(n) < 0.1).astype(int)
+
+    employment_years = np.clip(rng.normal(5 + 2 * (voucher == 0), 2, n), 0, 40)
+    savings_ratio = np.clip(rng.normal(0.1 + 0.05 * (income_stability / 100), 0.05, n), 0, 1)
+    rental_history_years = np.clip(rng.normal(3 + 0.5 * income_stability / 100, 2, n), 0, 20)
+
+    mean, std = moments
+    income_component = (np.log(monthly_income + 1) - mean) / std
+
+    # Higher credit, higher income stability = better
+    # Eviction or criminal history = worse
+    score = (
+        0.003 * (credit_scores - 600) +   # normalized credit contribution
+        0.05 * income_stability -         # income contribution
+        0.2 * eviction_history -          # eviction penalty
+        0.2 * criminal_history +          # criminal penalty
+        0.05 * employment_years +
+        0.1 * savings_ratio +
+        0.03 * rental_history_years +
+        0.25 * income_component
+    )
+
+    return pd.DataFrame({
+        'race': RACES[race],
+        'voucher': voucher,
+        'credit_score': credit_scores,
+        'eviction_history': eviction_history,
+        'criminal_history': criminal_history,
+        'income_stability': income_stability,
+        'monthly_income': monthly_income,
+        'approved': score,
+        'employment_years': employment_years,
+        'savings_ratio': savings_ratio,
+        'rental_history_years': rental_history_years,
+    }, columns=COLUMNS)
+
+
+def build_chunk(seed: int, chunk: int, n: int, moments, test_size: float, fmt: str = 'csv'):
+    # -> (train,) or (train, test). for csv the chunk comes back already
+    # formatted: turning floats into text is the slow part, so it belongs in
+    # the worker, not in the process that writes the file
+    rng = chunk_rng(seed, chunk)
+    df = generate_chunk(n, rng, moments)
+
+    parts = (df,)
+    if test_size:
+        is_test = rng.random(n) < test_size
+        parts = (df[~is_test], df[is_test])
+
+    if fmt == 'csv':
+        return tuple((part.to_csv(index=False, header=chunk == 0), len(part)) for part in parts)
+    return parts
+
+
+class ChunkWriter:
+    """Appends chunks to one CSV (pre-formatted text) or Parquet file."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._file = None
+        self._parquet = None
+
+    def write(self, part):
+        if self.fmt == 'csv':
+            text, rows = part
+            if self._file is None:
+                self._file = open(self.path, 'w', newline='')
+            self._file.write(text)
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("--format parquet needs pyarrow (pip install pyarrow)")
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+            rows = len(part)
+        self.rows += rows
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def chunk_sizes(rows: int, chunk_size: int):
+    full, rest = divmod(rows, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
+
+
+def generate(rows: int, out: str, chunk_size: int = 500_000, fmt: str = 'csv',
+             test_size: float = 0.2, seed: int = 42, workers: int = 1) -> dict:
+    moments = income_moments(seed)
+    sizes = chunk_sizes(rows, chunk_size)
+
+    ext = 'csv' if fmt == 'csv' else 'parquet'
+    if test_size:
+        writers = [ChunkWriter(f"{out}_train.{ext}", fmt), ChunkWriter(f"{out}_test.{ext}", fmt)]
+    else:
+        writers = [ChunkWriter(f"{out}.{ext}", fmt)]
+
+    def write(parts):
+        for writer, part in zip(writers, parts):
+            writer.write(part)
+
+    try:
+        if workers <= 1:
+            for i, n in enumerate(sizes):
+                write(build_chunk(seed, i, n, moments, test_size, fmt))
+        else:
+            # bounded number of chunks in flight, written in chunk order
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for i, n in enumerate(sizes):
+                    pending.append(pool.submit(build_chunk, seed, i, n, moments, test_size, fmt))
+                    if len(pending) >= workers * 2:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        for writer in writers:
+            writer.close()
+
+    return {writer.path: writer.rows for writer in writers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--out', default='tenant_data_biased', help='output path prefix')
+    parser.add_argument('--chunk-size', type=int, default=500_000)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--test-size', type=float, default=0.2, help='0 writes one file without a split')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = generate(args.rows, args.out, args.chunk_size, args.format, args.test_size, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+
+    for path, count in written.items():
+        print(f"{path}: {count} rows")
+    print(f"DATA created! ({args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
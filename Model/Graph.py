@@ -1,108 +1,106 @@
-import pandas as pd
-import numpy as np # for handling and vector on data
-import matplotlib.pyplot as plt # graphing
-import seaborn as sns # Plotting
-
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-
-# Load data
-train_df = pd.read_csv("tenant_data_biased_train.csv")
-test_df  = pd.read_csv("tenant_data_biased_test.csv")
-
-# change the race to num to correlate with data
-race_map = {'White': 0, 'Black': 1, 'Hispanic': 2}
-test_df['race_encoded'] = test_df['race'].map(race_map)
-
-y_train = train_df['approved'] # the out column of the data
-y_test  = test_df['approved']
-
-# the good and bad model
-
-# Model A
-features_A = ['credit_score','eviction_history','criminal_history','income_stability','voucher']
-
-# copies the feature into a new data frame
-X_train_A = train_df[features_A].copy()
-X_test_A  = test_df[features_A].copy()
-
-scaler_A = StandardScaler()
-X_train_A[['credit_score','income_stability']] = scaler_A.fit_transform(X_train_A[['credit_score','income_stability']])
-X_test_A[['credit_score','income_stability']] = scaler_A.transform(X_test_A[['credit_score','income_stability']])
-
-model_A = LinearRegression()
-model_A.fit(X_train_A, y_train)
-
-test_df['pred_A'] = model_A.predict(X_test_A)
-
-# Metrics for Model A
-corr_A = np.corrcoef(test_df['pred_A'], test_df['race_encoded'])[0,1] 
-
-# ----- MODEL B: without credit score -----
-features_B = ['eviction_history','criminal_history','income_stability','voucher','employment_years','savings_ratio','rental_history_years']
-
-X_train_B = train_df[features_B].copy()
-X_test_B  = test_df[features_B].copy()
-
-scaler_B = StandardScaler()
-columns_to_scale = ['income_stability', 'employment_years', 'savings_ratio', 'rental_history_years']
-
-X_train_B[columns_to_scale] = scaler_B.fit_transform(X_train_B[columns_to_scale])
-X_test_B[columns_to_scale] = scaler_B.transform(X_test_B[columns_to_scale])
-
-model_B = LinearRegression()
-model_B.fit(X_train_B, y_train)
-
-test_df['pred_B'] = model_B.predict(X_test_B)
-
-# Metrics for Model B
-corr_B = np.corrcoef(test_df['pred_B'], test_df['race_encoded'])[0,1]
-
-# --------------------------
-# 3. PRINT RESULTS
-# --------------------------
-print("\n=== MODEL RESULTS (Score-based) ===")
-print("Model A (with credit score)")
-print(" Correlation with race:", round(corr_A, 3))
-
-print("\nModel B (without credit score)")
-print(" Correlation with race:", round(corr_B, 3))
-
-# --------------------------
-# 4. GRAPH RACIAL DISPARITIES (with correlation)
-# --------------------------
-approval_A = test_df.groupby('race')['pred_A'].mean()
-approval_B = test_df.groupby('race')['pred_B'].mean()
-
-fig, axes = plt.subplots(1, 2, figsize=(12,5))
-
-# --- Model A ---
-sns.barplot(x=approval_A.index, y=approval_A.values, ax=axes[0])
-axes[0].set_title("Model A: With Credit Score")
-axes[0].set_ylabel("Predicted Score")
-
-axes[0].text(
-    0.5, 0.9,
-    f"Corr with race = {corr_A:.3f}",
-    transform=axes[0].transAxes,
-    ha='center',
-    fontsize=11,
-    bbox=dict(facecolor='white', alpha=0.7)
-)
-
-# --- Model B ---
-sns.barplot(x=approval_B.index, y=approval_B.values, ax=axes[1])
-axes[1].set_title("Model B: Without Credit Score")
-axes[1].set_ylabel("Predicted Score")
-
-axes[1].text(
-    0.5, 0.9,
-    f"Corr with race = {corr_B:.3f}",
-    transform=axes[1].transAxes,
-    ha='center',
-    fontsize=11,
-    bbox=dict(facecolor='white', alpha=0.7)
-)
-
-plt.tight_layout()
-plt.show()
+"""Plot a fairness report from audit.py.
+
+    python Graph.py                         # audit the legacy test data, then plot
+    python Graph.py report.json             # plot a saved report
+    python Graph.py report.json --save disparities.png
+
+All the numbers come from the report; this script only draws them, so the
+audit itself never needs matplotlib. On the legacy data that is Model A (with
+credit score) next to Model B (the legacy model, without it).
+"""
+import argparse
+import json
+import os
+
+# audit.py scorer -> panel title
+LABELS = {
+    "credit": "Model A: With Credit Score",
+    "legacy": "Model B: Without Credit Score",
+    "fairtenant": "FairTenant",
+}
+# what the original comparison ran on
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tenant_data_biased_test.csv")
+ORDER = ("credit", "legacy", "fairtenant")
+
+
+def plot_report(report: dict, save: str = None):
+    try:
+        import matplotlib
+        if save:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt # graphing
+        import seaborn as sns # Plotting
+    except ImportError:
+        raise SystemExit("plotting needs matplotlib and seaborn (pip install matplotlib seaborn)")
+
+    scorers = dict(sorted(report["scorers"].items(), key=lambda item: ORDER.index(item[0])
+                          if item[0] in ORDER else len(ORDER)))
+    cutoffs = report["cutoffs"]
+    fig, axes = plt.subplots(2, len(scorers), figsize=(6 * len(scorers), 9), squeeze=False)
+
+    for col, (name, result) in enumerate(scorers.items()):
+        groups = list(result["groups"])
+        means = [g["mean_score"] for g in result["groups"].values()]
+
+        # mean score per group
+        ax = axes[0][col]
+        sns.barplot(x=groups, y=means, ax=ax)
+        ax.set_title(f"{LABELS.get(name, name)}: mean score by {report['group_column']}")
+        ax.set_ylabel("Score (0-100)")
+        ax.set_ylim(0, 100)
+        ax.text(
+            0.5, 0.9,
+            f"eta = {result['eta']:.3f}, gap = {result['mean_gap']:.1f}",
+            transform=ax.transAxes,
+            ha='center',
+            fontsize=11,
+            bbox=dict(facecolor='white', alpha=0.7)
+        )
+
+        # approval rate per group at each risk cutoff
+        ax = axes[1][col]
+        rows = [
+            (group, f"{level} (>= {cutoffs[level]})", rate)
+            for group, g in result["groups"].items()
+            for level, rate in g["approval_rate"].items()
+        ]
+        sns.barplot(x=[r[0] for r in rows], y=[r[2] for r in rows], hue=[r[1] for r in rows], ax=ax)
+        ax.set_title(f"{LABELS.get(name, name)}: share at or above each cutoff")
+        ax.set_ylabel("Approval rate")
+        ax.set_ylim(0, 1)
+        gaps = ", ".join(f"{level} {gap:.1%}" for level, gap in result["approval_gap"].items())
+        ax.text(
+            0.5, 0.9,
+            f"gap: {gaps}",
+            transform=ax.transAxes,
+            ha='center',
+            fontsize=11,
+            bbox=dict(facecolor='white', alpha=0.7)
+        )
+
+    plt.tight_layout()
+    if save:
+        fig.savefig(save)
+    else:
+        plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("report", nargs="?", help="JSON report from audit.py (default: run the audit now)")
+    parser.add_argument("--save", help="write the figure to this file instead of showing it")
+    args = parser.parse_args()
+
+    if args.report:
+        with open(args.report) as f:
+            report = json.load(f)
+    else:
+        import audit
+        report = audit.audit([DEFAULT_DATA])
+        audit.print_report(report)
+
+    plot_report(report, args.save)
+
+
+if __name__ == "__main__":
+    main()
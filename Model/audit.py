@@ -0,0 +1,421 @@
+"""Streaming fairness audit of the FairTenant scorer and the legacy model.
+
+    python audit.py                                   # backend/data/synthetic_train.csv
+    python audit.py big.csv more.parquet --workers 8 -o report.json
+
+Every input file is split into pieces (row ranges of a CSV's memory-mapped
+column cache, see app/services/columnar.py, or byte ranges of the CSV text
+with --no-cache; row groups of a Parquet file) that are read and scored one
+at a time, optionally on a process
+pool. A piece only contributes per-group running sums (count, sum, sum of
+squares, rows over each cutoff); those simply add up, so memory does not
+depend on the dataset size and the result does not depend on the piece size
+or worker count (beyond float rounding). The report is JSON; Graph.py plots it.
+
+A scorer runs on a file if its inputs can be found there:
+
+- fairtenant: monthly income and rent (monthly_income / monthly_income_gross,
+  monthly_rent / rent_monthly); liquid_savings (or savings_buffer_months x
+  rent) and monthly_debt count as 0 when absent
+- legacy: the legacy feature columns themselves (Data_genrators.py output),
+  or else the same inputs as fairtenant, adapted like /api/score/compare does
+- credit: the legacy model with credit_score ("Model A" in Graph.py): a
+  linear regression on CREDIT_FEATURES fit to the legacy training data and
+  rescaled to 0-100 the same way; needs those columns in the file
+
+CSV pieces are cut at newlines, so quoted fields must not contain newlines.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.config.constants import LOW_RISK_SCORE, MEDIUM_RISK_SCORE
+from app.legacy.input import DATA_PATH, FEATURES, get_kernel
+from app.services.batch import adapt_to_legacy_features_batch, compute_features_batch, score_features_batch
+from app.services.columnar import load_columns
+from app.services.history import IncomeHistories
+
+DEFAULT_DATA = os.path.join(BACKEND_DIR, "data", "synthetic_train.csv")
+
+# the credit-score model the legacy one is compared against
+CREDIT_FEATURES = ["credit_score", "eviction_history", "criminal_history", "income_stability", "voucher"]
+
+# tenant input -> accepted source column names, first match wins
+INPUT_COLUMNS = {
+    "monthly_income": ("monthly_income", "monthly_income_gross"),
+    "monthly_rent": ("monthly_rent", "rent_monthly"),
+    "liquid_savings": ("liquid_savings",),
+    "monthly_debt": ("monthly_debt",),
+}
+SAVINGS_MONTHS_COLUMN = "savings_buffer_months"
+
+# rows per task when reading a CSV through the column cache
+CACHE_PIECE_ROWS = 1_000_000
+
+CUTOFFS = {"low": LOW_RISK_SCORE, "medium": MEDIUM_RISK_SCORE}
+
+# per group: rows, sum, sum of squares, then rows >= each cutoff
+N, SUM, SUMSQ = 0, 1, 2
+WIDTH = 3 + len(CUTOFFS)
+
+
+class GroupSums:
+    """Mergeable per-group running sums of one scorer's scores."""
+
+    def __init__(self):
+        self.groups = {}   # group -> float array of WIDTH
+
+    def add(self, groups, scores):
+        codes, names = pd.factorize(groups, use_na_sentinel=False)
+        k = len(names)
+        columns = [
+            np.bincount(codes, minlength=k),
+            np.bincount(codes, weights=scores, minlength=k),
+            np.bincount(codes, weights=scores * scores, minlength=k),
+        ]
+        columns += [np.bincount(codes, weights=scores >= cutoff, minlength=k) for cutoff in CUTOFFS.values()]
+        table = np.column_stack(columns).astype(float)
+        for name, row in zip(names, table):
+            self._add_row(str(name), row)
+
+    def _add_row(self, group, row):
+        if group in self.groups:
+            self.groups[group] += row
+        else:
+            self.groups[group] = row.copy()
+
+    def merge(self, other: "GroupSums"):
+        for group, row in other.groups.items():
+            self._add_row(group, row)
+        return self
+
+    def summary(self) -> dict:
+        names = sorted(self.groups)
+        table = np.array([self.groups[g] for g in names]).reshape(-1, WIDTH)
+        n = table[:, N]
+        total = n.sum()
+        if not total:
+            return {"rows": 0, "groups": {}}
+
+        mean = table[:, SUM] / n
+        var = np.maximum(table[:, SUMSQ] / n - mean * mean, 0.0)
+        rates = {name: table[:, 3 + i] / n for i, name in enumerate(CUTOFFS)}
+
+        overall_mean = table[:, SUM].sum() / total
+        overall_var = max(table[:, SUMSQ].sum() / total - overall_mean ** 2, 0.0)
+        share = n / total
+
+        # correlation of the score with membership in each group (one-hot,
+        # point-biserial), and the correlation ratio eta over all groups
+        with np.errstate(divide="ignore", invalid="ignore"):
+            membership_r = (mean - overall_mean) * np.sqrt(share / (1 - share)) / np.sqrt(overall_var)
+        between = (share * (mean - overall_mean) ** 2).sum()
+        eta = float(np.sqrt(between / overall_var)) if overall_var > 0 else 0.0
+
+        def gap(values):
+            return float(values.max() - values.min())
+
+        def ratio(values):
+            # lowest group rate over the highest (the "four-fifths" ratio)
+            return float(values.min() / values.max()) if values.max() > 0 else None
+
+        return {
+            "rows": int(total),
+            "mean_score": float(overall_mean),
+            "std_score": float(np.sqrt(overall_var)),
+            "groups": {
+                g: {
+                    "rows": int(n[i]),
+                    "mean_score": float(mean[i]),
+                    "std_score": float(np.sqrt(var[i])),
+                    "approval_rate": {name: float(r[i]) for name, r in rates.items()},
+                    "correlation": None if not np.isfinite(membership_r[i]) else float(membership_r[i]),
+                }
+                for i, g in enumerate(names)
+            },
+            "mean_gap": gap(mean),
+            "approval_gap": {name: gap(r) for name, r in rates.items()},
+            "approval_ratio": {name: ratio(r) for name, r in rates.items()},
+            "eta": eta,
+        }
+
+
+def resolve_inputs(columns) -> dict:
+    """Which scorers can run on a file with these columns, and from what.
+
+    -> {"columns": [...to read], "tenant": {input: column}, "scorers":
+    {name: how}, "skipped": {name: reason}}
+    """
+    columns = set(columns)
+    tenant = {}
+    for name, candidates in INPUT_COLUMNS.items():
+        found = next((c for c in candidates if c in columns), None)
+        if found:
+            tenant[name] = found
+    if "liquid_savings" not in tenant and SAVINGS_MONTHS_COLUMN in columns:
+        tenant["liquid_savings"] = SAVINGS_MONTHS_COLUMN
+
+    has_tenant = "monthly_income" in tenant and "monthly_rent" in tenant
+    scorers, skipped = {}, {}
+
+    if has_tenant:
+        scorers["fairtenant"] = "tenant"
+    else:
+        skipped["fairtenant"] = "needs monthly income and rent columns"
+
+    if columns.issuperset(FEATURES):
+        scorers["legacy"] = "features"
+    elif has_tenant:
+        scorers["legacy"] = "tenant"
+    else:
+        skipped["legacy"] = "needs the legacy feature columns or monthly income and rent"
+
+    if columns.issuperset(CREDIT_FEATURES):
+        scorers["credit"] = "features"
+    else:
+        skipped["credit"] = f"needs {', '.join(CREDIT_FEATURES)}"
+
+    read = set()
+    if has_tenant:
+        read.update(tenant.values())
+    if scorers.get("legacy") == "features":
+        read.update(FEATURES)
+    if "credit" in scorers:
+        read.update(CREDIT_FEATURES)
+
+    return {"columns": sorted(read), "tenant": tenant, "scorers": scorers, "skipped": skipped}
+
+
+def tenant_columns_from(frame: pd.DataFrame, tenant: dict) -> dict:
+    # the column dict app.services.batch works on, from a raw data frame
+    n = len(frame)
+    out = {name: frame[tenant[name]].to_numpy(dtype=float) if name in tenant else np.zeros(n)
+           for name in INPUT_COLUMNS}
+    if tenant.get("liquid_savings") == SAVINGS_MONTHS_COLUMN:
+        out["liquid_savings"] = out["liquid_savings"] * out["monthly_rent"]
+    out["income_history"] = IncomeHistories(np.empty(0), np.zeros(n + 1, dtype=np.int64))
+    return out
+
+
+_CREDIT_MODEL = None
+
+
+def credit_model():
+    """(weights, bias) of the credit-score model on the 0-100 scale.
+
+    Ordinary least squares of approved on CREDIT_FEATURES over the legacy
+    training data, rescaled by its min/max like the legacy artifact.
+    (Standardizing columns first, as the original script did, gives the
+    same predictions.) Fit once per process.
+    """
+    global _CREDIT_MODEL
+    if _CREDIT_MODEL is None:
+        from app.services.columnar import read_frame
+
+        train = read_frame(DATA_PATH, CREDIT_FEATURES + ["approved"])
+        X = train[CREDIT_FEATURES].to_numpy(dtype=float)
+        y = train["approved"].to_numpy(dtype=float)
+        coef, *_ = np.linalg.lstsq(np.column_stack([X, np.ones(len(X))]), y, rcond=None)
+        span = y.max() - y.min()
+        _CREDIT_MODEL = (coef[:-1] * 100 / span, (coef[-1] - y.min()) * 100 / span)
+    return _CREDIT_MODEL
+
+
+def score_frame(frame: pd.DataFrame, plan: dict) -> dict:
+    # -> {scorer: scores array}
+    scores = {}
+    columns = tenant_columns_from(frame, plan["tenant"]) if "tenant" in plan["scorers"].values() else None
+
+    if "fairtenant" in plan["scorers"]:
+        features = compute_features_batch(columns)
+        scores["fairtenant"] = score_features_batch(features)["score"].astype(float)
+
+    how = plan["scorers"].get("legacy")
+    if how == "features":
+        scores["legacy"] = get_kernel().score_many(frame[FEATURES].to_numpy(dtype=float))
+    elif how == "tenant":
+        scores["legacy"] = get_kernel().score_many(adapt_to_legacy_features_batch(columns))
+
+    if "credit" in plan["scorers"]:
+        weights, bias = credit_model()
+        scores["credit"] = np.clip(frame[CREDIT_FEATURES].to_numpy(dtype=float) @ weights + bias, 0.0, 100.0)
+
+    return scores
+
+
+def audit_frame(frame: pd.DataFrame, plan: dict, group_column: str) -> dict:
+    groups = frame[group_column].array
+    out = {}
+    for name, scores in score_frame(frame, plan).items():
+        sums = GroupSums()
+        sums.add(groups, scores)
+        out[name] = sums
+    return out
+
+
+# ---- pieces: what one task reads ----
+
+def csv_pieces(path: str, piece_bytes: int):
+    # (path, start, end) byte ranges, each ending on a line boundary, after
+    # the header line
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + piece_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            yield ("csv", path, start, end)
+            start = end
+
+
+def read_header(path: str) -> list[str]:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def file_pieces(path: str, piece_bytes: int, cache: bool = True):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return [("parquet", path, i, None) for i in range(pq.ParquetFile(path).num_row_groups)]
+    if cache:
+        try:
+            rows = len(load_columns(path))   # converts the csv on first use
+        except OSError:
+            pass    # cache not writable, parse the text instead
+        else:
+            return [("columns", path, start, min(start + CACHE_PIECE_ROWS, rows))
+                    for start in range(0, rows, CACHE_PIECE_ROWS)]
+    return list(csv_pieces(path, piece_bytes))
+
+
+def read_piece(piece, header, columns) -> pd.DataFrame:
+    kind, path, start, end = piece
+    if kind == "columns":
+        return load_columns(path).frame(columns, start, end)
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).read_row_group(start, columns=columns).to_pandas()
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=columns)
+
+
+def audit_piece(piece, header, plan, group_column) -> tuple[int, dict]:
+    frame = read_piece(piece, header, plan["columns"] + [group_column])
+    return len(frame), audit_frame(frame, plan, group_column)
+
+
+def init_worker():
+    # load the models once per process, not once per piece
+    get_kernel()
+    credit_model()
+
+
+def audit(paths: list[str], group_column: str = "race", workers: int = 1,
+          piece_bytes: int = 64 << 20, cache: bool = True) -> dict:
+    start = time.perf_counter()
+    totals = {}
+    rows = 0
+    sources = []
+    tasks = []
+
+    for path in paths:
+        header = read_header(path)
+        if group_column not in header:
+            raise SystemExit(f"{path}: no {group_column!r} column")
+        plan = resolve_inputs(header)
+        sources.append({
+            "path": path,
+            "scorers": plan["scorers"],
+            "inputs": plan["tenant"],
+            "skipped": plan["skipped"],
+        })
+        tasks.extend((piece, header, plan, group_column) for piece in file_pieces(path, piece_bytes, cache))
+
+    def collect(result):
+        nonlocal rows
+        count, partial = result
+        rows += count
+        for name, sums in partial.items():
+            totals.setdefault(name, GroupSums()).merge(sums)
+
+    if workers <= 1:
+        init_worker()
+        for task in tasks:
+            collect(audit_piece(*task))
+    else:
+        # pieces come back in any order; the sums don't care
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(audit_piece, *task))
+                if len(pending) >= workers * 2:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+
+    return {
+        "sources": sources,
+        "rows": rows,
+        "group_column": group_column,
+        "cutoffs": CUTOFFS,
+        "legacy_model": get_kernel().fingerprint,
+        "scorers": {name: totals[name].summary() for name in sorted(totals)},
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def print_report(report: dict):
+    print(f"{report['rows']:,} rows in {report['seconds']:.2f}s, grouped by {report['group_column']}")
+    for source in report["sources"]:
+        for name, reason in source["skipped"].items():
+            print(f"  {source['path']}: {name} skipped ({reason})")
+
+    for name, result in report["scorers"].items():
+        print(f"\n== {name} ==  eta {result['eta']:.3f}, mean gap {result['mean_gap']:.2f}")
+        print(f"  {'group':12s} {'rows':>10s} {'mean':>7s} {'>=low':>7s} {'>=med':>7s} {'corr':>7s}")
+        for group, g in result["groups"].items():
+            corr = f"{g['correlation']:+.3f}" if g["correlation"] is not None else ""
+            rate = g["approval_rate"]
+            print(f"  {group:12s} {g['rows']:10,d} {g['mean_score']:7.2f} {rate['low']:7.1%} {rate['medium']:7.1%} {corr:>7s}")
+        gaps = result["approval_gap"]
+        print(f"  approval gap: low {gaps['low']:.1%}, medium {gaps['medium']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_DATA], help="CSV or Parquet files")
+    parser.add_argument("-o", "--out", help="write the JSON report here")
+    parser.add_argument("--group", default="race", help="column to group by")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--piece-mb", type=float, default=64, help="CSV bytes per task (with --no-cache)")
+    parser.add_argument("--no-cache", action="store_true", help="parse CSV text instead of the column cache")
+    args = parser.parse_args()
+
+    report = audit(args.paths, args.group, args.workers, int(args.piece_mb * (1 << 20)), not args.no_cache)
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""Fit the FairTenant weights and risk cutoffs to labeled data.
+
+    python calibrate.py                                    # backend/data/synthetic_train.csv
+    python calibrate.py big.csv --workers 8 --candidates 512 \\
+        --registry ../backend/data/models.json --shadow   # then POST /api/models/reload
+
+Reads the tenant inputs from any CSV/Parquet file audit.py can score (see
+its docstring for the accepted columns) plus a 0/1 label column (approved)
+and a group column (race), and runs compute_features over all of it once.
+
+The search scores candidates exactly like the API does (score_features_batch:
+only the weights scored_features picks count, so the dict order matters) and
+treats "approve" as score >= the medium cutoff. That makes three numbers
+the fit: the lead weight (the first in the dict, which feature it is
+included) and the two cutoffs. Every other weight is pinned to its
+constants.py value, in constants.py order, and the version file says which
+were fitted ("calibration": {"fitted": ..., "pinned": ...}). For every candidate and
+cross-validation fold it picks the medium cutoff on the other folds: the
+best --objective among cutoffs whose lowest group approval rate is at least
+--min-ratio of the highest (the four-fifths rule by default). The low
+cutoff is then the lowest score at which --low-precision of the approved
+rows are labeled positive. Candidates are ranked by their held-out
+objective; a candidate with a fold where no cutoff is fair enough, or where
+the fitted cutoff falls short of --min-ratio on the held-out rows, is out.
+
+Round one samples the lead weight log-uniformly within --spread of
+constants.py's (plus those weights themselves), later rounds sample around
+the best so far with a narrower spread. Scores are whole numbers 0-100, so a pass over
+the data only has to count rows per (fold, group, label, score) for each
+candidate; the cutoff and fold arithmetic then runs on those small tables.
+Candidates are split across --workers processes, which memory-map the
+feature matrix, and each evaluates all folds of its candidates.
+
+The result is a model version file the API loads as is: name, weights,
+cutoffs and a "calibration" block saying how it was made. --registry adds
+it to a registry file (backend/data/models.json); POST /api/models/reload
+or a restart picks it up, ?model=<name> serves it.
+"""
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from audit import BACKEND_DIR, DEFAULT_DATA, file_pieces, read_header, read_piece, resolve_inputs, tenant_columns_from
+
+from app.config.constants import LOW_RISK_SCORE, MEDIUM_RISK_SCORE, WEIGHTS
+from app.legacy.artifact import csv_hash
+from app.services.batch import compute_features_batch, scored_features
+
+# the features a version can weight, in constants.py order
+FEATURE_NAMES = list(WEIGHTS)
+
+# scores are whole numbers 0-100; cutoff 101 approves nobody
+SCORES = 101
+
+# rows per matrix product inside a task
+BLOCK_ROWS = 1_000_000
+
+OBJECTIVES = ("accuracy", "balanced_accuracy")
+
+# set in each worker by init_worker: memory-mapped arrays from load()
+_DATA = {}
+
+
+# ---- data ----
+
+def load(paths: list[str], label: str, group: str) -> dict:
+    """Feature matrix (rows x FEATURE_NAMES), labels and group codes of all
+    rows of all files with a label."""
+    features, labels, groups, sources = [], [], [], []
+    for path in paths:
+        header = read_header(path)
+        for column in (label, group):
+            if column not in header:
+                raise SystemExit(f"{path}: no {column!r} column")
+        plan = resolve_inputs(header)
+        if "fairtenant" not in plan["scorers"]:
+            raise SystemExit(f"{path}: {plan['skipped']['fairtenant']}")
+
+        rows = 0
+        columns = sorted(set(plan["columns"]) | {label, group})
+        for piece in file_pieces(path, 64 << 20):
+            frame = read_piece(piece, header, columns)
+            frame = frame[pd.to_numeric(frame[label], errors="coerce").notna()]
+            computed = compute_features_batch(tenant_columns_from(frame, plan["tenant"]))
+            features.append(np.column_stack([computed[name] for name in FEATURE_NAMES]))
+            labels.append(pd.to_numeric(frame[label]).to_numpy() > 0)
+            groups.append(frame[group].astype(str).to_numpy())
+            rows += len(frame)
+        sources.append({"path": path, "rows": rows, "inputs": plan["tenant"], "sha256": csv_hash(path)})
+
+    codes, names = pd.factorize(np.concatenate(groups))
+    return {
+        "features": np.concatenate(features),
+        "labels": np.concatenate(labels).astype(np.int64),
+        "groups": codes.astype(np.int64),
+        "group_names": [str(name) for name in names],
+        "sources": sources,
+    }
+
+
+def save_arrays(data: dict, folds: int, seed: int, directory: str) -> dict:
+    # what the workers read: the features, and per row the offset of its
+    # (fold, group, label) block in a candidate's count table
+    n = len(data["labels"])
+    fold = np.random.default_rng(seed).permutation(n) % folds
+    cells = ((fold * len(data["group_names"]) + data["groups"]) * 2 + data["labels"]) * SCORES
+    np.save(os.path.join(directory, "features.npy"), data["features"])
+    np.save(os.path.join(directory, "cells.npy"), cells)
+    return {"directory": directory, "folds": folds, "groups": len(data["group_names"])}
+
+
+def init_worker(layout: dict):
+    _DATA.update(layout)
+    _DATA["features"] = np.load(os.path.join(layout["directory"], "features.npy"), mmap_mode="r")
+    _DATA["cells"] = np.load(os.path.join(layout["directory"], "cells.npy"), mmap_mode="r")
+
+
+# ---- candidates ----
+
+def sample_candidates(rng, center: dict, n: int, spread: float, leads: list[str]) -> list[dict]:
+    # weight dicts around `center`: each puts one of `leads` first (what
+    # scored_features sees) and scales every weight that then counts by a
+    # log-uniform factor within [1 / spread, spread]; the rest stay at
+    # constants.py's values, which score_features_batch never reads
+    out = []
+    for _ in range(n):
+        lead = leads[rng.integers(len(leads))]
+        weights = {name: WEIGHTS[name] for name in [lead] + [f for f in FEATURE_NAMES if f != lead]}
+        for name in scored_features(weights):
+            weights[name] = round(center[name] * math.exp(rng.uniform(-math.log(spread), math.log(spread))), 4)
+        out.append(weights)
+    return out
+
+
+def effective_weights(candidates: list[dict]) -> np.ndarray:
+    # candidates x FEATURE_NAMES, zero where score_features_batch ignores a weight
+    matrix = np.zeros((len(candidates), len(FEATURE_NAMES)))
+    for i, weights in enumerate(candidates):
+        for name in scored_features(weights):
+            matrix[i, FEATURE_NAMES.index(name)] = weights[name]
+    return matrix
+
+
+# ---- cutoffs ----
+
+def cutoff_metrics(table, min_group_rows: int) -> dict:
+    """Everything about "approve if score >= c", for every c in 0..101.
+
+    table: row counts by (group, label, score) -> arrays over c.
+    """
+    at_least = np.zeros(table.shape[:-1] + (SCORES + 1,))
+    at_least[..., :SCORES] = table[..., ::-1].cumsum(-1)[..., ::-1]
+
+    negatives, positives = table[:, 0].sum(), table[:, 1].sum()
+    tp = at_least[:, 1].sum(0)
+    fp = at_least[:, 0].sum(0)
+    tn = negatives - fp
+    approved = tp + fp
+
+    group_rows = table.sum((1, 2))
+    counted = group_rows >= min_group_rows
+    if not counted.any():
+        counted = group_rows > 0
+    rates = at_least[counted].sum(1) / group_rows[counted, None]
+    highest, lowest = rates.max(0), rates.min(0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "accuracy": (tp + tn) / (positives + negatives),
+            "balanced_accuracy": ((tp / positives if positives else 1.0) + (tn / negatives if negatives else 1.0)) / 2,
+            "approval_rate": approved / (positives + negatives),
+            # nobody approved is no disparity
+            "approval_ratio": np.where(highest > 0, lowest / np.where(highest > 0, highest, 1), 1.0),
+            "precision": np.where(approved > 0, tp / np.where(approved > 0, approved, 1), 0.0),
+            "approved": approved,
+        }
+
+
+def fit_cutoffs(table, settings: dict):
+    # -> (medium, low) for these row counts, None if no cutoff is fair enough
+    metrics = cutoff_metrics(table, settings["min_group_rows"])
+    fair = metrics["approval_ratio"] >= settings["min_ratio"]
+    if not fair.any():
+        return None
+    medium = int(np.argmax(np.where(fair, metrics[settings["objective"]], -np.inf)))
+    confident = (metrics["precision"] >= settings["low_precision"]) & (metrics["approved"] > 0)
+    confident[:medium] = False
+    low = int(np.argmax(confident)) if confident.any() else SCORES
+    return medium, low
+
+
+def summarize(table, medium: int, low: int, group_names: list[str], min_group_rows: int) -> dict:
+    # metrics of one set of cutoffs on these row counts
+    metrics = cutoff_metrics(table, min_group_rows)
+    group_rows = table.sum((1, 2))
+    at_medium = table[..., medium:].sum((1, 2))
+    return {
+        "medium_risk_score": medium,
+        "low_risk_score": low,
+        **{name: float(metrics[name][medium]) for name in
+           ("accuracy", "balanced_accuracy", "approval_rate", "approval_ratio", "precision")},
+        "low_risk_share": float(metrics["approved"][low] / group_rows.sum()),
+        "low_risk_precision": float(metrics["precision"][low]),
+        "group_approval_rate": {
+            name: float(at_medium[i] / group_rows[i]) for i, name in enumerate(group_names) if group_rows[i]
+        },
+    }
+
+
+# ---- search ----
+
+def count_scores(weights: np.ndarray) -> np.ndarray:
+    # candidates x folds x groups x labels x scores row counts, in a worker
+    features, cells = _DATA["features"], _DATA["cells"]
+    size = _DATA["folds"] * _DATA["groups"] * 2 * SCORES
+    offsets = np.arange(len(weights)) * size
+    counts = np.zeros(len(weights) * size, dtype=np.int64)
+    for start in range(0, len(cells), BLOCK_ROWS):
+        raw = features[start:start + BLOCK_ROWS] @ weights.T
+        # score_features_batch's normalization
+        scores = np.clip(np.trunc(raw * 100), 0, 100).astype(np.int64)
+        index = scores + cells[start:start + BLOCK_ROWS, None] + offsets
+        counts += np.bincount(index.ravel(), minlength=len(counts))
+    return counts.reshape(len(weights), _DATA["folds"], _DATA["groups"], 2, SCORES)
+
+
+def evaluate_chunk(weights: np.ndarray, settings: dict) -> list[tuple]:
+    """Cross-validate candidates, in a worker: -> per candidate (held-out
+    summary or None if some fold has no fair cutoff, all-rows table)."""
+    out = []
+    for folds in count_scores(weights):
+        total = folds.sum(0)
+        held_out = []
+        for fold in folds:
+            cutoffs = fit_cutoffs(total - fold, settings)
+            if cutoffs is None:
+                held_out = None
+                break
+            metrics = cutoff_metrics(fold, settings["min_group_rows"])
+            held_out.append((metrics[settings["objective"]][cutoffs[0]], metrics["approval_ratio"][cutoffs[0]]))
+
+        if held_out is None:
+            out.append((None, total))
+            continue
+        scores, ratios = np.array(held_out).T
+        out.append(({
+            "objective": float(scores.mean()),
+            "objective_std": float(scores.std()),
+            "approval_ratio_mean": float(ratios.mean()),
+            "approval_ratio_min": float(ratios.min()),
+        }, total))
+    return out
+
+
+def held_out_fair(candidate: dict, settings: dict) -> bool:
+    cv = candidate["cv"]
+    return cv is not None and cv["approval_ratio_min"] >= settings["min_ratio"]
+
+
+def search(layout: dict, settings: dict, rounds: int, candidates: int, spread: float,
+           seed: int, workers: int) -> tuple[dict, list]:
+    # -> (best, every evaluated candidate); each is {"weights", "cv", "table"}
+    rng = np.random.default_rng(seed)
+    tried = {}
+    center = dict(WEIGHTS)
+    leads = [name for name, weight in WEIGHTS.items() if weight > 0]   # a negative lead scores everyone 0
+
+    pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(layout,)) if workers > 1 else None
+    if pool is None:
+        init_worker(layout)
+    try:
+        for round_ in range(rounds):
+            batch = sample_candidates(rng, center, candidates, spread, leads)
+            if round_ == 0:
+                batch.insert(0, dict(WEIGHTS))
+            fresh = {}
+            for weights in batch:
+                fresh.setdefault(tuple(weights.items()), weights)
+            fresh = [weights for key, weights in fresh.items() if key not in tried]
+
+            chunks = [c for c in np.array_split(np.arange(len(fresh)), max(1, workers * 4)) if len(c)]
+            matrix = effective_weights(fresh)
+            parts = [matrix[chunk] for chunk in chunks]
+            if pool is None:
+                results = [evaluate_chunk(part, settings) for part in parts]
+            else:
+                results = pool.map(evaluate_chunk, parts, repeat(settings))
+            for chunk, result in zip(chunks, results):
+                for i, (cv, table) in zip(chunk, result):
+                    tried[tuple(fresh[i].items())] = {"weights": fresh[i], "cv": cv, "table": table}
+
+            # fair on the training folds isn't enough, it has to hold out too
+            ranked = [c for c in tried.values() if held_out_fair(c, settings)]
+            if not ranked:
+                raise SystemExit(f"no candidate has an approval ratio >= {settings['min_ratio']} "
+                                 f"in every fold, training and held out")
+            best = max(ranked, key=lambda c: (c["cv"]["objective"], c["cv"]["approval_ratio_mean"]))
+            print(f"round {round_ + 1}: {len(fresh)} candidates, best held-out "
+                  f"{settings['objective']} {best['cv']['objective']:.4f}")
+
+            # narrow in on the best so far
+            center, leads, spread = best["weights"], [next(iter(best["weights"]))], math.sqrt(spread)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return best, list(tried.values())
+
+
+# ---- output ----
+
+def calibrate(paths: list[str], name: str, label: str = "approved", group: str = "race",
+              objective: str = "balanced_accuracy", min_ratio: float = 0.8, low_precision: float = 0.97,
+              min_group_rows: int = 30, folds: int = 5, rounds: int = 3, candidates: int = 256,
+              spread: float = 4.0, seed: int = 0, workers: int = os.cpu_count() or 1) -> dict:
+    """-> model version spec (the registry's format) with a "calibration" block."""
+    start = time.perf_counter()
+    data = load(paths, label, group)
+    settings = {"objective": objective, "min_ratio": min_ratio, "low_precision": low_precision,
+                "min_group_rows": min_group_rows}
+
+    with tempfile.TemporaryDirectory(prefix="calibrate-") as directory:
+        layout = save_arrays(data, folds, seed, directory)
+        best, tried = search(layout, settings, rounds, candidates, spread, seed, workers)
+
+    medium, low = fit_cutoffs(best["table"], settings)
+    fitted = scored_features(best["weights"])
+    baseline = next(c for c in tried if c["weights"] == WEIGHTS and list(c["weights"]) == FEATURE_NAMES)
+    names = data["group_names"]
+    return {
+        "name": name,
+        "weights": best["weights"],
+        "low_risk_score": low,
+        "medium_risk_score": medium,
+        "calibration": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "sources": data["sources"],
+            "rows": int(len(data["labels"])),
+            "label": label,
+            "group": group,
+            "objective": objective,
+            "min_ratio": min_ratio,
+            "low_precision": low_precision,
+            "folds": folds,
+            "seed": seed,
+            # the only numbers the search moves; "pinned" weights are constants.py's
+            "fitted": [f"weights.{name}" for name in fitted] + ["low_risk_score", "medium_risk_score"],
+            "pinned": [name for name in best["weights"] if name not in fitted],
+            "candidates": len(tried),
+            # fair cutoffs on every training split, not on some held-out fold
+            "unfair_held_out": sum(c["cv"] is not None and not held_out_fair(c, settings) for c in tried),
+            "cross_validation": best["cv"],
+            "fit": summarize(best["table"], medium, low, names, min_group_rows),
+            # constants.py as it is, on the same rows
+            "baseline": summarize(baseline["table"], math.ceil(MEDIUM_RISK_SCORE), math.ceil(LOW_RISK_SCORE),
+                                  names, min_group_rows),
+            "seconds": round(time.perf_counter() - start, 3),
+        },
+    }
+
+
+def register(spec_path: str, registry_path: str, name: str, shadow: bool):
+    # add the version file to a registry file (created if missing)
+    registry = {}
+    if os.path.exists(registry_path):
+        with open(registry_path) as f:
+            registry = json.load(f)
+    entry = os.path.relpath(spec_path, os.path.dirname(os.path.abspath(registry_path)))
+    versions = registry.setdefault("versions", [])
+    if entry not in versions:
+        versions.append(entry)
+    if shadow and name not in registry.setdefault("shadow", []):
+        registry["shadow"].append(name)
+    with open(registry_path, "w") as f:
+        json.dump(registry, f, indent=2)
+        f.write("\n")
+
+
+def print_report(spec: dict):
+    report = spec["calibration"]
+    cv = report["cross_validation"]
+    print(f"\n{report['rows']:,} rows, {report['candidates']} candidates "
+          f"({report['unfair_held_out']} fair only on the training folds), {report['seconds']:.1f}s")
+    fitted = [name.removeprefix("weights.") for name in report["fitted"] if name.startswith("weights.")]
+    print(f"fitted: weights {({name: spec['weights'][name] for name in fitted})} and both cutoffs; "
+          f"{', '.join(report['pinned'])} pinned to constants.py (not scored)")
+    print(f"cutoffs low {spec['low_risk_score']}, medium {spec['medium_risk_score']}")
+    print(f"held-out {report['objective']} {cv['objective']:.4f} +- {cv['objective_std']:.4f}, "
+          f"approval ratio >= {cv['approval_ratio_min']:.3f}")
+    print(f"\n{'':10s} {'accuracy':>9s} {'balanced':>9s} {'approved':>9s} {'ratio':>7s} {'low share':>10s}")
+    for which in ("baseline", "fit"):
+        m = report[which]
+        print(f"{which:10s} {m['accuracy']:9.4f} {m['balanced_accuracy']:9.4f} {m['approval_rate']:9.1%} "
+              f"{m['approval_ratio']:7.3f} {m['low_risk_share']:10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_DATA], help="CSV or Parquet files")
+    parser.add_argument("--name", help="version name (default calibrated-<UTC time>)")
+    parser.add_argument("-o", "--out", help="version file to write (default backend/data/<name>.json)")
+    parser.add_argument("--registry", help="also list the version in this registry file")
+    parser.add_argument("--shadow", action="store_true", help="with --registry: shadow-score it too")
+    parser.add_argument("--label", default="approved", help="0/1 outcome column")
+    parser.add_argument("--group", default="race", help="column the fairness bound is over")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="balanced_accuracy")
+    parser.add_argument("--min-ratio", type=float, default=0.8,
+                        help="lowest group approval rate over the highest, at least")
+    parser.add_argument("--low-precision", type=float, default=0.97,
+                        help="share of positives the low-risk band must reach")
+    parser.add_argument("--min-group-rows", type=int, default=30,
+                        help="smaller groups don't count towards the ratio")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=256, help="per round")
+    parser.add_argument("--spread", type=float, default=4.0, help="first round's weight range, as a factor")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    name = args.name or datetime.now(timezone.utc).strftime("calibrated-%Y%m%d-%H%M%S")
+    spec = calibrate(args.paths, name, args.label, args.group, args.objective, args.min_ratio,
+                     args.low_precision, args.min_group_rows, args.folds, args.rounds, args.candidates,
+                     args.spread, args.seed, args.workers)
+    print_report(spec)
+
+    out = args.out or os.path.join(BACKEND_DIR, "data", f"{name}.json")
+    with open(out, "w") as f:
+        json.dump(spec, f, indent=1)
+        f.write("\n")
+    print(f"\nwrote {out}")
+    if args.registry:
+        register(out, args.registry, name, args.shadow)
+        print(f"listed in {args.registry}; POST /api/models/reload to serve it as ?model={name}")
+
+
+if __name__ == "__main__":
+    main()
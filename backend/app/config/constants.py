@@ -1,3 +1,6 @@
+import os
+from pathlib import Path
+
 MAX_SAVINGS_RUNWAY = 12 # max num of month the tenant pay rent using savings
 
 # scoring weights
@@ -20,3 +23,119 @@ LOW_STRESS_PSI = 0.35
 # assumptions for imapct
 MAX_MISSED_MONTHS_PER_YEAR = 3.0   # worst case
 DEFAULT_LEASE_MONTHS = 12
+
+# largest what-if grid POST /api/score/sensitivity evaluates in one call
+MAX_SENSITIVITY_POINTS = 10_000
+
+# result cache for /api/score and /api/score/compare
+RESULT_CACHE_SIZE = 4096
+RESULT_CACHE_TTL_SECONDS = 300
+
+# threads reserved for legacy scoring in /api/score/compare
+LEGACY_EXECUTOR_WORKERS = 4
+
+# FAIRTENANT_LEGACY_BACKEND=process moves that legacy scoring into a pool of
+# worker processes (app/services/legacy_pool.py). tenants arriving within
+# the batch window share one round trip to a worker; past the queue limit
+# /compare answers 503 instead of queueing more
+LEGACY_BACKEND = os.environ.get("FAIRTENANT_LEGACY_BACKEND", "thread")
+LEGACY_POOL_WORKERS = int(os.environ.get("FAIRTENANT_LEGACY_POOL_WORKERS", os.cpu_count() or 1))
+LEGACY_BATCH_WINDOW_MS = float(os.environ.get("FAIRTENANT_LEGACY_BATCH_WINDOW_MS", "1"))
+LEGACY_MAX_BATCH = int(os.environ.get("FAIRTENANT_LEGACY_MAX_BATCH", "256"))
+LEGACY_MAX_QUEUE = int(os.environ.get("FAIRTENANT_LEGACY_MAX_QUEUE", "10000"))
+
+# admission control (app/services/admission.py): per route, at most `limit`
+# requests run at once and up to `queue` more wait, none longer than
+# `deadline` seconds; the rest get 503 + Retry-After straight away. "legacy"
+# is the legacy scoring inside /api/score/compare. FAIRTENANT_ADMISSION_LIMITS
+# takes JSON overrides, e.g. {"/api/score/compare": {"limit": 16}};
+# FAIRTENANT_ADMISSION=0 turns it all off
+ADMISSION_ENABLED = os.environ.get("FAIRTENANT_ADMISSION", "1") != "0"
+ADMISSION_LIMITS = {
+    "/api/score/compare": {"limit": 64, "queue": 256, "deadline": 2.0},
+    "/api/score/batch": {"limit": 4, "queue": 16, "deadline": 5.0},
+    "/api/score/sensitivity": {"limit": 4, "queue": 16, "deadline": 5.0},
+    "/api/impact/portfolio": {"limit": 2, "queue": 8, "deadline": 10.0},
+    "legacy": {"limit": 16, "queue": 64, "deadline": 0.5},
+}
+ADMISSION_OVERRIDES = os.environ.get("FAIRTENANT_ADMISSION_LIMITS", "{}")
+
+# with the legacy budget used up, /compare answers with the new model alone
+# ("legacy_model": null, "degraded": true) instead of a 503
+COMPARE_DEGRADE = os.environ.get("FAIRTENANT_COMPARE_DEGRADE", "0") == "1"
+
+# per-stage timings + counters served at /api/metrics; FAIRTENANT_METRICS=0
+# turns instrumentation off completely
+METRICS_ENABLED = os.environ.get("FAIRTENANT_METRICS", "1") != "0"
+
+# /api/score* send their dicts straight to the JSON encoder instead of
+# re-validating them against the response models; same bytes either way.
+# FAIRTENANT_FAST_RESPONSES=0 goes back through FastAPI's serialization
+FAST_RESPONSES = os.environ.get("FAIRTENANT_FAST_RESPONSES", "1") != "0"
+
+# named scoring versions beyond the constants above (app/services/registry.py);
+# a missing file just means the constants are the only version
+MODEL_REGISTRY_PATH = Path(os.environ.get(
+    "FAIRTENANT_MODEL_REGISTRY",
+    Path(__file__).resolve().parents[2] / "data" / "models.json",
+))
+
+# requests waiting to be shadow-scored; past this they are dropped, never
+# waited on
+SHADOW_QUEUE_SIZE = 10_000
+# most requests the shadow thread scores in one batch
+SHADOW_CHUNK = 512
+
+# every decision /api/score, /batch and /compare serve goes to an
+# append-only log (app/services/decision_log.py): SQLite files in WAL mode
+# under DECISION_LOG_DIR, written by a background thread that commits
+# whatever has queued up as one transaction. a new file is started past
+# DECISION_LOG_SEGMENT_MB or DECISION_LOG_SEGMENT_SECONDS.
+# FAIRTENANT_DECISION_LOG=0 turns it off. the app won't start if the log is
+# on and the directory isn't writable. on Vercel only /tmp is, and only for
+# the life of the instance: point FAIRTENANT_DECISION_LOG_DIR at storage
+# that lasts to keep the log
+DECISION_LOG_ENABLED = os.environ.get("FAIRTENANT_DECISION_LOG", "1") != "0"
+DECISION_LOG_DIR = Path(os.environ.get(
+    "FAIRTENANT_DECISION_LOG_DIR",
+    Path("/tmp/fairtenant-decisions") if os.environ.get("VERCEL")
+    else Path(__file__).resolve().parents[2] / "data" / "decisions",
+))
+DECISION_LOG_QUEUE = 50_000
+# what happens to a decision when the queue is full: "block" waits up to
+# DECISION_LOG_BLOCK_SECONDS for room (nothing lost unless the disk can't
+# keep up for that long), "drop_newest" drops it, "drop_oldest" drops the
+# oldest queued one instead. drops are counted in /api/decisions/stats
+DECISION_LOG_OVERFLOW = os.environ.get("FAIRTENANT_DECISION_LOG_OVERFLOW", "block")
+DECISION_LOG_BLOCK_SECONDS = 1.0
+# the writer waits this long after a decision arrives before committing, so
+# the ones right behind it share the commit; most decisions per commit
+DECISION_LOG_LINGER_MS = float(os.environ.get("FAIRTENANT_DECISION_LOG_LINGER_MS", "10"))
+DECISION_LOG_BATCH = 2048
+DECISION_LOG_SEGMENT_MB = float(os.environ.get("FAIRTENANT_DECISION_LOG_SEGMENT_MB", "64"))
+DECISION_LOG_SEGMENT_SECONDS = float(os.environ.get("FAIRTENANT_DECISION_LOG_SEGMENT_SECONDS", "3600"))
+# sqlite's synchronous pragma: FULL fsyncs every commit (one per batch),
+# NORMAL leaves the last commits to the OS if the machine loses power
+DECISION_LOG_SYNCHRONOUS = os.environ.get("FAIRTENANT_DECISION_LOG_SYNC", "FULL")
+# most rows GET /api/decisions returns
+DECISION_QUERY_LIMIT = 10_000
+
+# score monitor (app/services/monitoring.py), per served model version:
+# histograms of both models' scores and /compare's band pairs, kept in
+# MONITOR_BUCKET_SECONDS slices for the last MONITOR_BUCKETS slices and
+# rolled up into MONITOR_WINDOWS (seconds) plus a total since start
+MONITOR_BUCKET_SECONDS = 60
+MONITOR_BUCKETS = 60
+MONITOR_WINDOWS = {"5m": 300, "1h": 3600}
+MONITOR_QUANTILES = (5, 25, 50, 75, 95)
+# legacy scores are fractional; histogram bins per score point
+MONITOR_LEGACY_BINS_PER_POINT = 10
+# population stability index reference: both models' scores for this CSV's
+# applicants (income / rent columns as Model/audit.py reads them)
+MONITOR_REFERENCE_PATH = Path(os.environ.get(
+    "FAIRTENANT_MONITOR_REFERENCE",
+    Path(__file__).resolve().parents[2] / "data" / "synthetic_train.csv",
+))
+# PSI past these reads as a moderate / major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
@@ -0,0 +1,100 @@
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+from app.legacy.input import BACKEND_DIR, DATA_PATH, FEATURES, NUMERIC_COLS, train_model
+
+# bump when the artifact layout changes so old files get rebuilt
+ARTIFACT_VERSION = 1
+ARTIFACT_PATH = BACKEND_DIR / "data" / "legacy_model.json"
+
+
+def csv_hash(path=DATA_PATH) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_artifact(path=DATA_PATH) -> dict:
+    from app.legacy.online import stats_for_csv
+
+    model, scaler, min_score, max_score = train_model(path)
+    source = csv_hash(path)
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "source_sha256": source,
+        "features": FEATURES,
+        "numeric_cols": NUMERIC_COLS,
+        "coef": [float(c) for c in model.coef_],
+        "intercept": float(model.intercept_),
+        "scaler_mean": [float(m) for m in scaler.mean_],
+        "scaler_var": [float(v) for v in scaler.var_],
+        "scaler_scale": [float(s) for s in scaler.scale_],
+        "n_samples": int(scaler.n_samples_seen_),
+        "min_score": float(min_score),
+        "max_score": float(max_score),
+        # what python -m app.legacy.online --update folds new csvs into
+        "source_hashes": [source],
+        "training_stats": stats_for_csv(path).to_dict(),
+    }
+
+
+def save_artifact(artifact: dict, path=ARTIFACT_PATH):
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(artifact, indent=1))
+    tmp.replace(path)   # atomic, readers never see half a file
+
+
+def load_artifact(path=ARTIFACT_PATH):
+    try:
+        artifact = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+    if artifact.get("version") != ARTIFACT_VERSION:
+        return None
+    if artifact.get("features") != FEATURES or artifact.get("numeric_cols") != NUMERIC_COLS:
+        return None
+
+    return artifact
+
+
+def is_fresh(artifact, data_path=DATA_PATH) -> bool:
+    return artifact is not None and artifact["source_sha256"] == csv_hash(data_path)
+
+
+def load_or_build(data_path=DATA_PATH, artifact_path=ARTIFACT_PATH) -> dict:
+    artifact = load_artifact(artifact_path)
+    if is_fresh(artifact, data_path):
+        return artifact
+
+    # missing or trained on an older csv -> retrain once and persist
+    artifact = build_artifact(data_path)
+    try:
+        save_artifact(artifact, artifact_path)
+    except OSError:
+        pass    # read-only filesystem (e.g. serverless), keep it in memory
+
+    return artifact
+
+
+if __name__ == "__main__":
+    # build step: python -m app.legacy.artifact  (run from backend/)
+    parser = argparse.ArgumentParser(description="Train the legacy model and save its artifact")
+    parser.add_argument("--data", default=str(DATA_PATH), help="training csv")
+    parser.add_argument("--out", default=str(ARTIFACT_PATH), help="artifact json path")
+    parser.add_argument("--force", action="store_true", help="retrain even if the artifact is fresh")
+    args = parser.parse_args()
+
+    current = load_artifact(args.out)
+    if not args.force and is_fresh(current, args.data):
+        print(f"{args.out} is up to date ({current['source_sha256'][:12]})")
+    else:
+        artifact = build_artifact(args.data)
+        save_artifact(artifact, args.out)
+        print(f"wrote {args.out} ({artifact['source_sha256'][:12]})")
@@ -1,8 +1,9 @@
-import pandas as pd
-import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
 from pathlib import Path
+import threading
+
+# pandas / numpy / sklearn are imported inside the functions that need them:
+# serving from the saved artifact needs none of them, and importing them
+# costs seconds of cold start
 
 # # -----------------------------
 # # 1. LOAD DATA AND TRAIN MODEL
@@ -46,8 +47,13 @@ BACKEND_DIR = Path(__file__).resolve().parents[2]   # .../backend
 DATA_PATH = BACKEND_DIR / "data" / "tenant_data_biased_train.csv"
 
 def train_model(path=DATA_PATH):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.linear_model import LinearRegression
+    from app.services.columnar import read_frame
+
     path = Path(path)
-    train_df = pd.read_csv(path)
+    # parsed once into a memory-mapped column cache, see app/services/columnar.py
+    train_df = read_frame(path, FEATURES + ['approved'])
 
     X_train = train_df[FEATURES].copy()
     y_train = train_df['approved'] # continous score
@@ -62,7 +68,71 @@ def train_model(path=DATA_PATH):
 
     return model, scaler, y_train.min(), y_train.max()
 
-MODEL, SCALER, MIN_SCORE, MAX_SCORE = train_model()
+
+# the fitted model is loaded from the saved artifact on first use instead of
+# being trained at import time (see app/legacy/artifact.py)
+_LOADED = {}
+_LOAD_LOCK = threading.RLock()
+
+
+def model_from_artifact(artifact):
+    import numpy as np
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.linear_model import LinearRegression
+
+    model = LinearRegression()
+    model.coef_ = np.array(artifact["coef"])
+    model.intercept_ = artifact["intercept"]
+    model.n_features_in_ = len(FEATURES)
+    model.feature_names_in_ = np.array(FEATURES, dtype=object)
+
+    scaler = StandardScaler()
+    scaler.mean_ = np.array(artifact["scaler_mean"])
+    scaler.var_ = np.array(artifact["scaler_var"])
+    scaler.scale_ = np.array(artifact["scaler_scale"])
+    scaler.n_samples_seen_ = artifact["n_samples"]
+    scaler.n_features_in_ = len(NUMERIC_COLS)
+    scaler.feature_names_in_ = np.array(NUMERIC_COLS, dtype=object)
+
+    return model, scaler, artifact["min_score"], artifact["max_score"]
+
+
+def _loaded(key, build):
+    if key not in _LOADED:
+        with _LOAD_LOCK:
+            if key not in _LOADED:
+                _LOADED[key] = build()
+    return _LOADED[key]
+
+
+def get_artifact():
+    from app.legacy.artifact import load_or_build
+
+    return _loaded("artifact", load_or_build)
+
+
+def get_model():
+    # sklearn objects, only needed by the old predict_tenant path
+    return _loaded("model", lambda: model_from_artifact(get_artifact()))
+
+
+def loaded_kernel():
+    # the kernel if it is already in memory, else None (never loads)
+    return _LOADED.get("kernel")
+
+
+def get_kernel():
+    from app.legacy.kernel import LegacyKernel
+
+    return _loaded("kernel", lambda: LegacyKernel(get_artifact()))
+
+
+def __getattr__(name):
+    # keep MODEL / SCALER / MIN_SCORE / MAX_SCORE importable, but lazy
+    names = ("MODEL", "SCALER", "MIN_SCORE", "MAX_SCORE")
+    if name in names:
+        return get_model()[names.index(name)]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # def get_user_input():
@@ -90,6 +160,8 @@ MODEL, SCALER, MIN_SCORE, MAX_SCORE = train_model()
 #     return data
 
 def preprocess_data(data):
+    import pandas as pd
+
     df = pd.DataFrame([{
         'credit_score': data["credit_score"],
         'income_stability': data["income_stability"],
@@ -108,6 +180,8 @@ def preprocess_data(data):
 # 3. PREDICTION FUNCTION
 # -----------------------------
 def predict_tenant(model, scaler, df, min_score, max_score):
+    import numpy as np
+
     # Scale numeric columns
     data_scaled = df.copy()
     data_scaled[NUMERIC_COLS] = scaler.transform(data_scaled[NUMERIC_COLS])
@@ -131,17 +205,9 @@ def predict_tenant(model, scaler, df, min_score, max_score):
 #     user_data = get_user_input()
 #     predict_tenant(user_data)
 
-def score_tenant(tenant_request):
-
-    df = preprocess_data(tenant_request)
-    df = df[FEATURES] # order will become same
-
-    score = predict_tenant(
-        MODEL,
-        SCALER,
-        df,
-        MIN_SCORE,
-        MAX_SCORE
-    )
+def score_tenant(tenant_request, kernel=None):
+    # same result as preprocess_data + predict_tenant, without the DataFrame;
+    # kernel is a registry version's own baseline, default the app's
+    score = (kernel or get_kernel()).score(tenant_request)
 
     return {"score": round(score, 2)}
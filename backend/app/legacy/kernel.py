@@ -0,0 +1,48 @@
+import hashlib
+
+from app.legacy.input import FEATURES
+
+# these go through int() in preprocess_data, keep that for parity
+BINARY_COLS = {"eviction_history", "criminal_history", "voucher"}
+
+
+class LegacyKernel:
+    """The legacy model folded into one affine map onto the 0-100 scale.
+
+    StandardScaler, LinearRegression and the min/max rescale are all linear,
+    so score = clip(x . weights + bias, 0, 100) with x in FEATURES order.
+    """
+
+    def __init__(self, artifact: dict):
+        mean = dict(zip(artifact["numeric_cols"], artifact["scaler_mean"]))
+        scale = dict(zip(artifact["numeric_cols"], artifact["scaler_scale"]))
+        span = artifact["max_score"] - artifact["min_score"]
+
+        weights = []
+        bias = artifact["intercept"]
+        for name, coef in zip(FEATURES, artifact["coef"]):
+            if name in scale:
+                bias -= coef * mean[name] / scale[name]
+                coef = coef / scale[name]
+            weights.append(coef)
+
+        self.weights = [w * 100 / span for w in weights]
+        self.bias = (bias - artifact["min_score"]) * 100 / span
+        self.source_sha256 = artifact["source_sha256"]
+        # identifies these exact parameters, e.g. for cache keys
+        self.fingerprint = hashlib.sha256(repr((self.weights, self.bias)).encode()).hexdigest()[:16]
+        self._cols = [(name, name in BINARY_COLS) for name in FEATURES]
+
+    def score(self, data: dict) -> float:
+        raw = self.bias
+        for (name, binary), weight in zip(self._cols, self.weights):
+            value = data[name]
+            raw += weight * (int(value) if binary else value)
+        return min(max(raw, 0.0), 100.0)
+
+    def score_many(self, X):
+        # X: (n, 7) array in FEATURES order, binary columns already 0/1
+        import numpy as np
+
+        raw = np.asarray(X, dtype=float) @ np.array(self.weights) + self.bias
+        return np.clip(raw, 0.0, 100.0)
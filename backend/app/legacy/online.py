@@ -0,0 +1,249 @@
+"""Train the legacy model in one streaming pass from mergeable statistics.
+
+    python -m app.legacy.online                        # same as the artifact build
+    python -m app.legacy.online big.csv --workers 8 --out /tmp/legacy_model.json
+    python -m app.legacy.online new.csv --update --out /tmp/legacy_model.json
+
+StandardScaler and LinearRegression only need the row count, the means and
+the centered co-moment matrix of [FEATURES..., approved], plus min/max of
+approved for the 0-100 rescale. TrainingStats keeps exactly that. Chunks fold
+in with update(), shards computed elsewhere combine with merge() (the
+pairwise update of Chan et al.), and to_artifact() returns the same dict
+app.legacy.artifact.build_artifact writes, so nothing is ever held in memory
+but one chunk.
+
+The artifact keeps the stats ("training_stats") and the hashes of the CSVs
+they came from ("source_hashes"), so --update folds new labeled files into
+an existing artifact without reading the old ones again; the result is the
+artifact a full run over all the files would write.
+
+The API checks artifact freshness against DATA_PATH, so an artifact trained
+on other data belongs somewhere other than the default --out.
+"""
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from app.legacy.input import DATA_PATH, FEATURES, NUMERIC_COLS
+
+TARGET = "approved"
+CHUNK_ROWS = 1_000_000
+
+
+class TrainingStats:
+    """Running moments of [FEATURES..., approved]; mergeable across shards."""
+
+    def __init__(self):
+        width = len(FEATURES) + 1
+        self.n = 0
+        self.mean = np.zeros(width)
+        self.comoment = np.zeros((width, width))   # sum of outer(z - mean, z - mean)
+        self.y_min = np.inf
+        self.y_max = -np.inf
+
+    @classmethod
+    def from_arrays(cls, X, y) -> "TrainingStats":
+        stats = cls()
+        # a single row may come as a flat X and a scalar y
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        Z = np.column_stack([X, y])
+        if not len(Z):
+            return stats
+        stats.n = len(Z)
+        stats.mean = Z.mean(axis=0)
+        centered = Z - stats.mean
+        stats.comoment = centered.T @ centered
+        stats.y_min = float(Z[:, -1].min())
+        stats.y_max = float(Z[:, -1].max())
+        return stats
+
+    def update(self, X, y) -> "TrainingStats":
+        # fold in a chunk of rows: X is (n, len(FEATURES)) in FEATURES order,
+        # or one row of len(FEATURES) with a scalar y
+        return self.merge(TrainingStats.from_arrays(X, y))
+
+    def merge(self, other: "TrainingStats") -> "TrainingStats":
+        if not other.n:
+            return self
+        if not self.n:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+        else:
+            n = self.n + other.n
+            delta = other.mean - self.mean
+            self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n)
+            self.mean = self.mean + delta * (other.n / n)
+            self.n = n
+        self.y_min = min(self.y_min, other.y_min)
+        self.y_max = max(self.y_max, other.y_max)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "features": FEATURES,
+            "n": int(self.n),
+            "mean": [float(m) for m in self.mean],
+            "comoment": [[float(c) for c in row] for row in self.comoment],
+            "y_min": float(self.y_min),
+            "y_max": float(self.y_max),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TrainingStats":
+        if data.get("features") != FEATURES:
+            raise ValueError(f"training stats are for features {data.get('features')}, not {FEATURES}")
+        stats = cls()
+        mean = np.asarray(data["mean"], dtype=float)
+        comoment = np.asarray(data["comoment"], dtype=float)
+        if mean.shape != stats.mean.shape or comoment.shape != stats.comoment.shape:
+            raise ValueError("training stats have the wrong shape")
+        stats.n, stats.mean, stats.comoment = int(data["n"]), mean, comoment
+        stats.y_min, stats.y_max = float(data["y_min"]), float(data["y_max"])
+        return stats
+
+    def to_artifact(self, source_hashes: list[str]) -> dict:
+        from app.legacy.artifact import ARTIFACT_VERSION
+
+        if self.n < 2:
+            raise ValueError("need at least two rows to train")
+
+        k = len(FEATURES)
+        numeric = [FEATURES.index(c) for c in NUMERIC_COLS]
+
+        # StandardScaler: population variance, zero variance scales by 1
+        var = np.diag(self.comoment)[:k] / self.n
+        scale = np.sqrt(var)
+        scale[scale < 10 * np.finfo(float).eps] = 1.0
+
+        # least squares on the centered data, solved from its Gram matrix;
+        # lstsq keeps the minimum-norm answer LinearRegression gives when
+        # features are collinear
+        Sxx = self.comoment[:k, :k]
+        Sxy = self.comoment[:k, k]
+        beta = np.linalg.lstsq(Sxx, Sxy, rcond=None)[0]
+
+        # the model was fit on standardized numeric columns: rescale their
+        # coefficients, and their column means are 0 after scaling
+        coef = beta.copy()
+        coef[numeric] *= scale[numeric]
+        scaled_mean = self.mean[:k].copy()
+        scaled_mean[numeric] = 0.0
+        intercept = self.mean[k] - coef @ scaled_mean
+
+        return {
+            "version": ARTIFACT_VERSION,
+            "source_sha256": combined_hash(source_hashes),
+            "features": FEATURES,
+            "numeric_cols": NUMERIC_COLS,
+            "coef": [float(c) for c in coef],
+            "intercept": float(intercept),
+            "scaler_mean": [float(self.mean[i]) for i in numeric],
+            "scaler_var": [float(var[i]) for i in numeric],
+            "scaler_scale": [float(scale[i]) for i in numeric],
+            "n_samples": int(self.n),
+            "min_score": float(self.y_min),
+            "max_score": float(self.y_max),
+            "source_hashes": list(source_hashes),
+            "training_stats": self.to_dict(),
+        }
+
+
+def combined_hash(hashes: list[str]) -> str:
+    # a single csv keeps its own hash, so the API sees the artifact as fresh
+    return hashes[0] if len(hashes) == 1 else hashlib.sha256("".join(hashes).encode()).hexdigest()
+
+
+def _row_ranges(rows: int, chunk_rows: int):
+    return [(start, min(start + chunk_rows, rows)) for start in range(0, rows, chunk_rows)]
+
+
+def stats_for_rows(path, start: int, stop: int) -> TrainingStats:
+    # one shard: rows start:stop of the csv's column cache
+    from app.services.columnar import load_columns
+
+    table = load_columns(path)
+    X = np.column_stack([table.column(name, start, stop) for name in FEATURES])
+    return TrainingStats.from_arrays(X, table.column(TARGET, start, stop))
+
+
+def stats_for_csv(path, chunk_rows: int = CHUNK_ROWS, workers: int = 1) -> TrainingStats:
+    """One pass over a training csv, in chunks, optionally on a process pool."""
+    from app.services.columnar import load_columns
+
+    try:
+        rows = len(load_columns(path))
+    except OSError:
+        # no writable cache: stream the text instead
+        import pandas as pd
+
+        stats = TrainingStats()
+        for chunk in pd.read_csv(path, usecols=FEATURES + [TARGET], chunksize=chunk_rows):
+            stats.update(chunk[FEATURES].to_numpy(dtype=float), chunk[TARGET].to_numpy(dtype=float))
+        return stats
+
+    ranges = _row_ranges(rows, chunk_rows)
+    stats = TrainingStats()
+    if workers <= 1:
+        for start, stop in ranges:
+            stats.merge(stats_for_rows(path, start, stop))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard in pool.map(stats_for_rows, [path] * len(ranges), *zip(*ranges)):
+                stats.merge(shard)
+    return stats
+
+
+def train_artifact(paths, chunk_rows: int = CHUNK_ROWS, workers: int = 1) -> dict:
+    from app.legacy.artifact import csv_hash
+
+    paths = [Path(p) for p in paths]
+    stats = TrainingStats()
+    for path in paths:
+        stats.merge(stats_for_csv(path, chunk_rows, workers))
+    return stats.to_artifact([csv_hash(p) for p in paths])
+
+
+def update_artifact(artifact: dict, paths, chunk_rows: int = CHUNK_ROWS, workers: int = 1) -> dict:
+    """The artifact with new training csvs folded in; only those are read."""
+    from app.legacy.artifact import csv_hash
+
+    if "training_stats" not in artifact:
+        raise ValueError("the artifact has no training_stats, retrain it from all its csvs once")
+    stats = TrainingStats.from_dict(artifact["training_stats"])
+    hashes = list(artifact.get("source_hashes") or [artifact["source_sha256"]])
+    for path in map(Path, paths):
+        digest = csv_hash(path)
+        if digest in hashes:
+            raise ValueError(f"{path} is already in the artifact")
+        stats.merge(stats_for_csv(path, chunk_rows, workers))
+        hashes.append(digest)
+    return stats.to_artifact(hashes)
+
+
+if __name__ == "__main__":
+    from app.legacy.artifact import ARTIFACT_PATH, load_artifact, save_artifact
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data", nargs="*", default=[str(DATA_PATH)], help="training csv files")
+    parser.add_argument("--out", default=str(ARTIFACT_PATH), help="artifact json path")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--update", action="store_true",
+                        help="fold the csvs into the artifact at --out instead of training from scratch")
+    args = parser.parse_args()
+
+    if args.update:
+        current = load_artifact(args.out)
+        if current is None:
+            raise SystemExit(f"{args.out} is missing or not a usable artifact")
+        try:
+            artifact = update_artifact(current, args.data, args.chunk_rows, args.workers)
+        except ValueError as e:
+            raise SystemExit(f"{args.out}: {e}")
+    else:
+        artifact = train_artifact(args.data, args.chunk_rows, args.workers)
+    save_artifact(artifact, args.out)
+    print(f"wrote {args.out} ({artifact['n_samples']:,} rows, {artifact['source_sha256'][:12]})")
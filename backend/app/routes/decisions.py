@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query
+
+from app.config.constants import DECISION_QUERY_LIMIT
+from app.services.decision_log import DECISIONS
+
+router = APIRouter(prefix="/api/decisions", tags=["Decisions"])
+
+
+def _seconds(moment: Optional[datetime]) -> Optional[float]:
+    # times without an offset are taken as UTC
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+@router.get("")
+def list_decisions(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    risk_level: Optional[Literal["low", "medium", "high"]] = None,
+    route: Optional[str] = None,
+    model: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=DECISION_QUERY_LIMIT),
+):
+    # logged decisions with start <= time < end, oldest first
+    decisions = DECISIONS.query(_seconds(start), _seconds(end), risk_level, route, model, limit)
+    for decision in decisions:
+        decision["time"] = datetime.fromtimestamp(decision["ts"], timezone.utc).isoformat()
+    return {"count": len(decisions), "truncated": len(decisions) == limit, "decisions": decisions}
+
+
+@router.get("/stats")
+def decision_stats():
+    return DECISIONS.stats()
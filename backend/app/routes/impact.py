@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from app.schemas.portfolio import PortfolioRequest, PortfolioResponse
+from app.services.formats import (
+    ARROW, NPZ, NegotiatedRoute, binary_body, binary_openapi, json_body, media_type, read_columns, read_json,
+)
+from app.services.metrics import METRICS
+from app.services.responses import respond
+
+router = APIRouter(prefix="/api/impact", tags=["Impact"], route_class=NegotiatedRoute)
+
+ROUTE = "/api/impact/portfolio"
+
+
+def _impact(columns: dict, percentiles: list, lease_months: int):
+    # numpy only gets imported once somebody asks for a portfolio
+    from app.services.portfolio import portfolio_impact as impact, portfolio_scores
+
+    with METRICS.stage(ROUTE, "score"):
+        scores = portfolio_scores(columns)
+    with METRICS.stage(ROUTE, "impact"):
+        result = impact(columns, percentiles, lease_months, scores=scores)
+    return respond(result)
+
+
+def _json_columns(body: bytes):
+    # (columns, options) straight from the JSON, or None for FastAPI to parse
+    from app.services.batch import tenant_columns_from_json
+
+    try:
+        payload = read_json(body)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("tenants"), list):
+        return None
+    try:
+        # everything but the tenants, validated as usual
+        options = PortfolioRequest.model_validate({**payload, "tenants": []})
+    except ValidationError:
+        return None
+    with METRICS.stage(ROUTE, "features"):
+        columns = tenant_columns_from_json(payload["tenants"])
+    return None if columns is None else (columns, options)
+
+
+async def _json_portfolio(http: Request):
+    # plain JSON pools skip TenantInput per row (NegotiatedRoute); anything
+    # unusual goes through portfolio_impact for FastAPI to validate
+    body = await http.body()
+
+    def run():
+        parsed = _json_columns(body)
+        if parsed is None:
+            return None
+        columns, options = parsed
+        return _impact(columns, options.percentiles, options.lease_months)
+
+    return await run_in_threadpool(run)
+
+
+async def _binary_portfolio(http: Request):
+    # an Arrow IPC stream or .npz body as for /api/score/batch;
+    # ?percentiles=50&percentiles=90&lease_months=12 for the rest
+    query = http.query_params
+    options = {"tenants": []}
+    if "percentiles" in query:
+        options["percentiles"] = query.getlist("percentiles")
+    if "lease_months" in query:
+        options["lease_months"] = query["lease_months"]
+    try:
+        options = PortfolioRequest.model_validate(options)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("query", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+
+    body, content_type = await http.body(), media_type(http.headers.get("content-type"))
+
+    def run():
+        with METRICS.stage(ROUTE, "features"):
+            columns = read_columns(body, content_type)
+        return _impact(columns, options.percentiles, options.lease_months)
+
+    return await run_in_threadpool(run)
+
+
+@router.post("/portfolio", response_model=PortfolioResponse, openapi_extra=binary_openapi((ARROW, NPZ), ()))
+@binary_body(_binary_portfolio)
+@json_body(_json_portfolio)
+def portfolio_impact(request: PortfolioRequest):
+    from app.services.batch import tenant_columns
+
+    with METRICS.stage(ROUTE, "features"):
+        columns = tenant_columns(request.tenants)
+    return _impact(columns, request.percentiles, request.lease_months)
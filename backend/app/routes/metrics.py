@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.admission import GATES
+from app.services.cache import RESULT_CACHE
+from app.services.metrics import METRICS
+
+router = APIRouter(prefix="/api", tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    if not METRICS.enabled:
+        return PlainTextResponse("# metrics disabled (FAIRTENANT_METRICS=0)\n")
+
+    cache = RESULT_CACHE.stats()
+    return PlainTextResponse(
+        METRICS.render({
+            "cache_hits": cache["hits"],
+            "cache_misses": cache["misses"],
+            "cache_coalesced": cache["coalesced"],
+            "cache_size": cache["size"],
+            "admission_active": sum(gate.active for gate in GATES.values()),
+            "admission_queued": sum(gate.queued for gate in GATES.values()),
+        }),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.get("/admission")
+def admission_stats():
+    # per gate: limits, running / waiting right now, admitted and shed counts
+    return {name: gate.stats() for name, gate in GATES.items()}
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+
+from app.services.registry import REGISTRY, SHADOW
+
+router = APIRouter(prefix="/api/models", tags=["Models"])
+
+
+@router.get("")
+def list_models():
+    return {**REGISTRY.describe(), "shadow_stats": SHADOW.stats()}
+
+
+@router.post("/reload")
+def reload_models():
+    # re-read the registry file; if it is broken the old versions keep serving
+    try:
+        return REGISTRY.reload()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
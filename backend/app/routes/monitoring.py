@@ -0,0 +1,18 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from app.services.monitoring import MONITOR
+from app.services.registry import REGISTRY
+
+router = APIRouter(prefix="/api/monitoring", tags=["Monitoring"])
+
+
+@router.get("/scores")
+def score_monitor(model: Optional[str] = None):
+    # served score distribution per window against the reference scores
+    try:
+        version = REGISTRY.get(model)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"unknown model version {model!r}")
+    return MONITOR.report(version)
@@ -1,58 +1,288 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from app.services.impact import calculate_impact
-from app.services.legacy_score import score_legacy
-from fastapi import APIRouter 
+from typing import Annotated, Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from app.schemas.tenant import TenantInput 
 from app.schemas.score import ScoreResponse
+from app.schemas.sensitivity import SensitivityRequest, SensitivityResponse
 # from app.services import Input
 from app.services.features import compute_features
-from app.services.score import score_features
 from app.services.explain import explain_features
+from app.services.cache import RESULT_CACHE, tenant_key
+from app.services.registry import REGISTRY, SHADOW, ModelVersion
+from app.services.ratios import base_ratios
+from app.config.constants import COMPARE_DEGRADE, LEGACY_BACKEND, LEGACY_EXECUTOR_WORKERS
+from app.services.metrics import METRICS
+from app.services.formats import (
+    ARROW, BATCH_FORMATS, JSON, MSGPACK, NPZ, RECORD_FORMATS, NegotiatedRoute, binary_body, binary_openapi,
+    columns_response, media_type, negotiate, read_columns, read_record, record_response,
+)
+from app.services.responses import respond
+from app.legacy.input import FEATURES, score_tenant as legacy_score
+from app.services.legacy_pool import get_legacy_pool, loaded_legacy_pool
+from app.services.admission import Overloaded, admitted
+from app.services.decision_log import DECISIONS
+from app.services.monitoring import MONITOR
+from app.services.legacy_score import adapt_to_legacy_features
 
-router = APIRouter(prefix="/api/score", tags=["Score"])
+router = APIRouter(prefix="/api/score", tags=["Score"], route_class=NegotiatedRoute)
 
-@router.post("", response_model=ScoreResponse)
-def get_score(request: TenantInput):
+LEGACY_EXECUTOR = ThreadPoolExecutor(max_workers=LEGACY_EXECUTOR_WORKERS, thread_name_prefix="legacy")
+
+def _version(name: Optional[str]) -> ModelVersion:
+    # ?model=<name> picks a registry version, default is the registry's own
+    try:
+        return REGISTRY.get(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"unknown model version {name!r}")
+
+
+async def _binary_score(http: Request):
+    # a MessagePack body (NegotiatedRoute); the rest is get_score
+    request = read_record(await http.body(), media_type(http.headers.get("content-type")))
+    return await run_in_threadpool(get_score, request, http.query_params.get("model"), http.headers.get("accept"))
+
+
+@router.post("", response_model=ScoreResponse, openapi_extra=binary_openapi((MSGPACK,), (MSGPACK,)))
+@binary_body(_binary_score)
+def get_score(request: TenantInput, model: Optional[str] = None, accept: Annotated[Optional[str], Header()] = None):
+    version = _version(model)
+    response_format = negotiate(accept, RECORD_FORMATS)
+    key = ("score", tenant_key(request), version.fingerprint)
+    # the features are cached with the result for the decision log
+    result, features = RESULT_CACHE.get_or_compute(key, lambda: _score(request, version))
+    METRICS.count("risk_level", route="/api/score", model="new", level=result["risk_level"])
+    SHADOW.submit(version, request, result)
+    MONITOR.observe(version, result)
+    DECISIONS.record("/api/score", version.name, request, result, features)
+    return record_response(result, response_format)
+
+
+def _score(request: TenantInput, version: ModelVersion):
+    route = "/api/score"
 
     # calc fincial ftrs
-    features = compute_features(request)
+    with METRICS.stage(route, "features"):
+        features = compute_features(request)
 
     # eval risk based on features
-    score_result = score_features(features)
+    with METRICS.stage(route, "score"):
+        score_result = version.score(features)
 
     # gen explaintion
-    explaintions = explain_features(features)
+    with METRICS.stage(route, "explain"):
+        explaintions = explain_features(features)
 
 
     return {
         "score": score_result["score"],
         "risk_level": score_result["risk_level"],
         "breakdown": explaintions
-    }
+    }, features
 
-@router.post("/compare")
-def compare_score(request: TenantInput):
+async def _binary_batch(http: Request):
+    # an Arrow IPC stream or .npz body (NegotiatedRoute): decoded straight
+    # into tenant_columns, no TenantInput per row
+    version = _version(http.query_params.get("model"))
+    response_format = negotiate(http.headers.get("accept"), BATCH_FORMATS)
+    body, content_type = await http.body(), media_type(http.headers.get("content-type"))
+    return await run_in_threadpool(lambda: _score_columns(read_columns(body, content_type), version, response_format))
 
-    # new
-    features = compute_features(request)
-    score_result = score_features(features)
-    explaintions = explain_features(features)
-    rent = request.monthly_rent
 
-    new_impact = calculate_impact(score_result["score"], rent)
+@router.post("/batch", response_model=list[ScoreResponse],
+             openapi_extra=binary_openapi((ARROW, NPZ), (ARROW, NPZ)))
+@binary_body(_binary_batch)
+def get_score_batch(requests: list[TenantInput], model: Optional[str] = None,
+                    accept: Annotated[Optional[str], Header()] = None):
+    # numpy only gets imported once somebody actually sends a batch
+    from app.services.batch import tenant_columns
 
+    version = _version(model)
+    return _score_columns(tenant_columns(requests), version, negotiate(accept, BATCH_FORMATS))
 
-    legacy = score_legacy(request)
-    legacy_impact = calculate_impact(legacy["score"], rent)
 
-    return {
-        "new_model": {
-            "score": score_result["score"],
-            "risk_level": score_result["risk_level"],
-            "breakdown": explaintions,
-            "impact": new_impact
-        },
-        "legacy_model": {
-            "score": legacy["score"],
-            "impact": legacy_impact
+def _score_columns(columns: dict, version: ModelVersion, response_format: str):
+    from app.services.batch import breakdown_columns, compute_features_batch, explain_features_batch
+
+    # same pipeline as get_score, one array op per stage for the whole pool
+    route = "/api/score/batch"
+    with METRICS.stage(route, "features"):
+        features = compute_features_batch(columns)
+    with METRICS.stage(route, "score"):
+        score_result = version.score_batch(features)
+    SHADOW.submit_batch(version, features, score_result)
+    MONITOR.observe_batch(version, score_result["score"])
+    DECISIONS.record_batch(route, version.name, columns, score_result, features)
+
+    if response_format != JSON:
+        # the breakdown as value / status columns instead of text per tenant
+        with METRICS.stage(route, "explain"):
+            breakdown = breakdown_columns(features)
+        return columns_response({**score_result, **breakdown}, response_format)
+
+    with METRICS.stage(route, "explain"):
+        explaintions = explain_features_batch(features)
+    return respond([
+        {
+            "score": score,
+            "risk_level": risk_level,
+            "breakdown": breakdown
         }
+        for score, risk_level, breakdown in zip(
+            score_result["score"].tolist(),
+            score_result["risk_level"].tolist(),
+            explaintions,
+        )
+    ])
+
+async def _binary_compare(http: Request):
+    # a MessagePack body (NegotiatedRoute); the rest is compare_score
+    request = read_record(await http.body(), media_type(http.headers.get("content-type")))
+    return await compare_score(request, http.query_params.get("model"), http.headers.get("accept"))
+
+
+@router.post("/compare", openapi_extra=binary_openapi((MSGPACK,), (MSGPACK,)))
+@binary_body(_binary_compare)
+async def compare_score(request: TenantInput, model: Optional[str] = None,
+                        accept: Annotated[Optional[str], Header()] = None):
+    version = _version(model)
+    response_format = negotiate(accept, RECORD_FORMATS)
+    kernel = version.loaded_kernel()
+    if kernel is None:
+        # first call reads the artifact (or retrains), keep that off the loop
+        kernel = await asyncio.get_running_loop().run_in_executor(LEGACY_EXECUTOR, version.get_kernel)
+
+    # the process pool only holds the app's own legacy model; versions with
+    # their own artifact stay on the threads
+    pool = None
+    if LEGACY_BACKEND == "process" and version.legacy_artifact is None:
+        pool = loaded_legacy_pool()
+        if pool is None:
+            pool = await asyncio.get_running_loop().run_in_executor(LEGACY_EXECUTOR, get_legacy_pool)
+
+    # retraining the legacy model changes its fingerprint -> new keys
+    key = ("compare", tenant_key(request), version.fingerprint, kernel.fingerprint)
+    try:
+        result, features = await RESULT_CACHE.get_or_compute_async(key, lambda: _compare(request, version, kernel, pool))
+    except Overloaded:
+        # legacy budget used up: 503 (main.py), or the new model on its own
+        if not COMPARE_DEGRADE:
+            raise
+        result, features = _degraded(request, version)
+    METRICS.count("risk_level", route=COMPARE_ROUTE, model="new", level=result["new_model"]["risk_level"])
+    SHADOW.submit(version, request, result["new_model"])
+    MONITOR.observe(version, result)
+    await DECISIONS.record_async(COMPARE_ROUTE, version.name, request, result, features)
+    return record_response(result, response_format)
+
+
+COMPARE_ROUTE = "/api/score/compare"
+
+
+def _new_model(request: TenantInput, ratios: dict, version: ModelVersion):
+    with METRICS.stage(COMPARE_ROUTE, "features"):
+        features = compute_features(request, ratios)
+    with METRICS.stage(COMPARE_ROUTE, "score"):
+        score_result = version.score(features)
+    with METRICS.stage(COMPARE_ROUTE, "explain"):
+        explaintions = explain_features(features)
+    with METRICS.stage(COMPARE_ROUTE, "impact"):
+        impact = calculate_impact(score_result["score"], request.monthly_rent)
+
+    return {
+        "score": score_result["score"],
+        "risk_level": score_result["risk_level"],
+        "breakdown": explaintions,
+        "impact": impact
+    }, features
+
+
+def _legacy_model(request: TenantInput, ratios: dict, kernel):
+    # score_legacy, split up so each step gets its own timing
+    with METRICS.stage(COMPARE_ROUTE, "legacy_features"):
+        legacy_tenant = adapt_to_legacy_features(request, ratios)
+    with METRICS.stage(COMPARE_ROUTE, "legacy_predict"):
+        legacy = legacy_score(legacy_tenant, kernel)
+    with METRICS.stage(COMPARE_ROUTE, "legacy_impact"):
+        impact = calculate_impact(legacy["score"], request.monthly_rent)
+
+    return {
+        "score": legacy["score"],
+        "impact": impact
+    }
+
+
+async def _pooled_legacy_model(request: TenantInput, ratios: dict, pool):
+    # _legacy_model with the prediction done in a worker process
+    with METRICS.stage(COMPARE_ROUTE, "legacy_features"):
+        legacy_tenant = adapt_to_legacy_features(request, ratios)
+    with METRICS.stage(COMPARE_ROUTE, "legacy_predict"):
+        score = await pool.score([legacy_tenant[name] for name in FEATURES])
+    with METRICS.stage(COMPARE_ROUTE, "legacy_impact"):
+        impact = calculate_impact(score, request.monthly_rent)
+
+    return {
+        "score": score,
+        "impact": impact
     }
+
+
+async def _compare(request: TenantInput, version: ModelVersion, kernel, pool=None):
+    # ratios both models need, worked out once
+    with METRICS.stage(COMPARE_ROUTE, "ratios"):
+        ratios = base_ratios(request)
+
+    # a slot in the legacy budget first (Overloaded if there is none in
+    # time); legacy then goes to its own executor (or the process pool) and
+    # the cheap new-model branch runs here in the meantime
+    async with admitted("legacy"):
+        if pool is not None:
+            legacy = asyncio.ensure_future(_pooled_legacy_model(request, ratios, pool))
+        else:
+            legacy = asyncio.get_running_loop().run_in_executor(LEGACY_EXECUTOR, _legacy_model, request, ratios, kernel)
+        new_model, features = _new_model(request, ratios, version)
+        legacy_model = await legacy
+
+    return {
+        "new_model": new_model,
+        "legacy_model": legacy_model
+    }, features
+
+
+def _degraded(request: TenantInput, version: ModelVersion):
+    # new model only; not cached, the next request tries legacy again
+    METRICS.count("degraded", route=COMPARE_ROUTE)
+    new_model, features = _new_model(request, base_ratios(request), version)
+    return {
+        "new_model": new_model,
+        "legacy_model": None,
+        "degraded": True
+    }, features
+
+
+@router.post("/sensitivity", response_model=SensitivityResponse)
+def score_sensitivity(request: SensitivityRequest, model: Optional[str] = None):
+    # numpy only gets imported once somebody asks for a grid
+    from app.services.sensitivity import band_boundaries, grid_axes, sensitivity_grid
+
+    route = "/api/score/sensitivity"
+    version = _version(model)
+    axes = grid_axes(request.ranges)
+    with METRICS.stage(route, "grid"):
+        grid = sensitivity_grid(request.tenant, axes, version, request.include_legacy)
+    with METRICS.stage(route, "boundaries"):
+        boundaries = band_boundaries(request.tenant, version.weights, version.low_risk_score,
+                                     version.medium_risk_score)
+
+    return respond({
+        "axes": [{"name": name, "values": values.tolist()} for name, values in axes.items()],
+        **grid,
+        "boundaries": boundaries,
+    })
+
+
+@router.get("/cache")
+def cache_stats():
+    return RESULT_CACHE.stats()
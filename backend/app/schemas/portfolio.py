@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.config.constants import DEFAULT_LEASE_MONTHS
+from app.schemas.tenant import TenantInput
+
+
+class PortfolioRequest(BaseModel):
+    tenants: List[TenantInput]
+    # percentiles of per-tenant expected annual loss, 0-100
+    percentiles: List[float] = Field(default=[50, 90, 95, 99])
+    lease_months: int = Field(default=DEFAULT_LEASE_MONTHS, ge=1)
+
+    @model_validator(mode="after")
+    def check_percentiles(self):
+        if any(not 0 <= p <= 100 for p in self.percentiles):
+            raise ValueError("percentiles must be between 0 and 100")
+        return self
+
+
+class BandImpact(BaseModel):
+    tenants: int
+    expected_annual_loss: float
+    expected_missed_months: float
+    mean_score: Optional[float]   # None for an empty band
+
+
+class ModelImpact(BaseModel):
+    expected_annual_loss: float
+    expected_lease_loss: float
+    expected_missed_months: float
+    mean_score: float
+    loss_percentiles: Dict[str, float]   # "p50", "p90", ...
+    by_risk_level: Dict[str, BandImpact]
+
+
+class ImpactDifference(BaseModel):
+    # new model minus legacy
+    expected_annual_loss: float
+    expected_missed_months: float
+    tenants_lower_loss: int
+    tenants_higher_loss: int
+
+
+class PortfolioResponse(BaseModel):
+    tenants: int
+    lease_months: int
+    new_model: ModelImpact
+    legacy_model: ModelImpact
+    difference: ImpactDifference
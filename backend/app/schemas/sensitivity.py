@@ -0,0 +1,54 @@
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.config.constants import MAX_SENSITIVITY_POINTS
+from app.schemas.tenant import TenantInput
+
+GridField = Literal["monthly_rent", "monthly_income", "liquid_savings", "monthly_debt"]
+
+
+class GridRange(BaseModel):
+    start: float
+    stop: float
+    steps: int = Field(default=21, ge=1)   # evenly spaced, both ends included
+
+
+class SensitivityRequest(BaseModel):
+    tenant: TenantInput
+    ranges: Dict[GridField, GridRange]   # one axis (1-D) or two (2-D grid)
+    include_legacy: bool = False
+
+    @model_validator(mode="after")
+    def check_grid(self):
+        if not 1 <= len(self.ranges) <= 2:
+            raise ValueError("give one or two ranges")
+        points = 1
+        for grid in self.ranges.values():
+            points *= grid.steps
+        if points > MAX_SENSITIVITY_POINTS:
+            raise ValueError(f"grid has {points} points, the limit is {MAX_SENSITIVITY_POINTS}")
+        return self
+
+
+class GridAxis(BaseModel):
+    name: str
+    values: List[float]
+
+
+class BandBoundary(BaseModel):
+    # the input value where the risk band changes, the other inputs held at
+    # the tenant's own values. None = that band can't be reached this way
+    low: Optional[float]
+    medium: Optional[float]
+    direction: str   # "max" (at or below this value) or "min" (at or above)
+
+
+class SensitivityResponse(BaseModel):
+    axes: List[GridAxis]
+    score: list            # [i] for one axis, [i][j] for two
+    risk_level: list
+    legacy_score: Optional[list] = None
+    # closed-form band edges for inputs the score depends on; inputs it
+    # doesn't depend on are left out. None when the model has no closed form
+    boundaries: Optional[Dict[str, BandBoundary]] = None
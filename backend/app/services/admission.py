@@ -0,0 +1,164 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi.responses import JSONResponse
+
+from app.config.constants import ADMISSION_ENABLED, ADMISSION_LIMITS, ADMISSION_OVERRIDES
+from app.services.metrics import METRICS
+
+
+class Overloaded(Exception):
+    # turned into 503 + Retry-After by overloaded_response
+    status_code = 503
+
+    def __init__(self, detail: str, retry_after: int = 1):
+        super().__init__(detail)
+        self.retry_after = retry_after
+
+
+class Gate:
+    """At most `limit` holders at once, up to `queue` more waiting in order.
+
+    A newcomer is refused straight away when the queue is full or when the
+    wait its place in line implies (from the average time a slot is held)
+    would pass `deadline`; one that does wait gives up at the deadline.
+    Lives on the event loop, no locking.
+    """
+
+    def __init__(self, name: str, limit: int, queue: int, deadline: float):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.deadline = deadline
+        self.active = 0
+        self.service_time = 0.0   # moving average of seconds a slot is held
+        self._waiters = deque()   # futures, first come first served
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "deadline": 0, "timeout": 0}
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _expected_wait(self, position: int) -> float:
+        return (position + 1) * self.service_time / max(self.limit, 1)
+
+    def _refuse(self, reason: str, position: int) -> Overloaded:
+        self.shed[reason] += 1
+        METRICS.count("shed", gate=self.name, reason=reason)
+        retry_after = max(1, math.ceil(self._expected_wait(position)))
+        return Overloaded(f"{self.name} is over capacity ({reason.replace('_', ' ')})", retry_after)
+
+    async def acquire(self) -> float:
+        # -> start time, for release(); raises Overloaded
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return time.perf_counter()
+
+        position = len(self._waiters)
+        if position >= self.queue:
+            raise self._refuse("queue_full", position)
+        if self._expected_wait(position) > self.deadline:
+            raise self._refuse("deadline", position)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, self.deadline)
+        except asyncio.TimeoutError:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            raise self._refuse("timeout", position)
+        except asyncio.CancelledError:
+            # the client went away; hand on a slot we were just given
+            if future.done() and not future.cancelled():
+                self.release(time.perf_counter())
+            elif future in self._waiters:
+                self._waiters.remove(future)
+            raise
+
+        self.admitted += 1
+        return time.perf_counter()
+
+    def release(self, started: float):
+        self.service_time += 0.1 * ((time.perf_counter() - started) - self.service_time)
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)   # the slot passes straight on
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue_limit": self.queue,
+            "deadline_seconds": self.deadline,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "mean_service_seconds": round(self.service_time, 6),
+        }
+
+
+def build_gates() -> dict:
+    # name -> Gate from ADMISSION_LIMITS plus FAIRTENANT_ADMISSION_LIMITS
+    if not ADMISSION_ENABLED:
+        return {}
+    limits = {name: dict(config) for name, config in ADMISSION_LIMITS.items()}
+    for name, override in json.loads(ADMISSION_OVERRIDES).items():
+        limits[name] = {**limits.get(name, ADMISSION_LIMITS["/api/score/compare"]), **override}
+    return {name: Gate(name, **config) for name, config in limits.items()}
+
+
+GATES = build_gates()
+
+
+@asynccontextmanager
+async def admitted(name: str):
+    # async with admitted("legacy"): ...  (a no-op without that gate)
+    gate = GATES.get(name)
+    if gate is None:
+        yield
+        return
+    started = await gate.acquire()
+    try:
+        yield
+    finally:
+        gate.release(started)
+
+
+def overloaded_response(e: Overloaded) -> JSONResponse:
+    return JSONResponse({"detail": str(e)}, status_code=503, headers={"Retry-After": str(e.retry_after)})
+
+
+class AdmissionMiddleware:
+    """Gates the routes in GATES by path before FastAPI even reads the body,
+    so a refused request costs next to nothing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        gate = GATES.get(scope["path"]) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            started = await gate.acquire()
+        except Overloaded as e:
+            METRICS.count("requests", route=scope["path"], status=503)
+            await overloaded_response(e)(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(started)
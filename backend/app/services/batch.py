@@ -0,0 +1,198 @@
+from itertools import chain
+
+import numpy as np
+
+from app.config.constants import (
+    GOOD_INCOME_TO_RENT, GOOD_SAVINGS_RUNWAY, LOW_RISK_SCORE, LOW_STRESS_PSI,
+    MAX_SAVINGS_RUNWAY, MEDIUM_RISK_SCORE, WEIGHTS,
+)
+from app.schemas.tenant import TenantInput
+from app.services.explain import INCOME_TO_RENT, PAYMENT_STRESS, SAVINGS_RUNWAY
+from app.services.history import IncomeHistories
+
+# score_features returns from inside its loop, so only the first weighted
+# feature ever counts. use the same effective weights so a batch scores
+# exactly like /api/score does one tenant at a time
+def scored_features(weights: dict) -> list[str]:
+    return list(weights)[:1]
+
+
+SCORED_FEATURES = scored_features(WEIGHTS)
+
+
+# column-wise view of many tenants, what every *_batch function works on
+def tenant_columns(tenants: list[TenantInput]) -> dict:
+    return {
+        "monthly_income": np.array([t.monthly_income for t in tenants], dtype=float),
+        "monthly_rent": np.array([t.monthly_rent for t in tenants], dtype=float),
+        "liquid_savings": np.array([t.liquid_savings for t in tenants], dtype=float),
+        "monthly_debt": np.array([t.monthly_debt for t in tenants], dtype=float),
+        "income_history": IncomeHistories.from_lists([t.income_history for t in tenants]),
+    }
+
+
+_NUMBERS = {int, float}
+
+
+def tenant_columns_from_json(tenants: list):
+    """tenant_columns from parsed JSON objects, without a TenantInput each.
+
+    None unless every row is what TenantInput takes as is (numbers, a list
+    of numbers or null for income_history), so anything it would coerce or
+    reject -- a missing field, null, a string, a bool -- is left to it.
+    """
+    try:
+        columns = {}
+        for name in ("monthly_income", "monthly_rent", "liquid_savings", "monthly_debt"):
+            values = [t[name] for t in tenants]
+            if not set(map(type, values)) <= _NUMBERS:
+                return None
+            columns[name] = np.array(values, dtype=float)
+
+        histories = [t.get("income_history") for t in tenants]
+        if not set(map(type, histories)) <= {list, type(None)}:
+            return None
+        if not set(map(type, chain.from_iterable(h or () for h in histories))) <= _NUMBERS:
+            return None
+        columns["income_history"] = IncomeHistories.from_lists(histories)
+    except (KeyError, TypeError, AttributeError, OverflowError):
+        return None
+    return columns
+
+
+def _ratio(num, den, mask, default):
+    # num / den where mask holds, default elsewhere, without divide warnings
+    out = np.full(num.shape, default, dtype=float)
+    np.divide(num, den, out=out, where=mask)
+    return out
+
+
+# compute_features over whole columns
+def compute_features_batch(columns: dict) -> dict:
+    income = columns["monthly_income"]
+    rent = columns["monthly_rent"]
+    savings = columns["liquid_savings"]
+    debt = columns["monthly_debt"]
+
+    has_rent = rent > 0
+    disposal_after_debt = income - debt
+
+    history = columns["income_history"].stats()
+
+    return {
+        "income_to_rent": _ratio(income, rent, has_rent, 0.0),
+        "post_rent_income": income - rent,
+        "savings_runway_months": np.minimum(_ratio(savings, rent, has_rent, 0.0), MAX_SAVINGS_RUNWAY),
+        "debt_to_income": _ratio(debt, income, income > 0, 0.0),
+        "payment_stress_index": _ratio(rent, disposal_after_debt, disposal_after_debt > 0, 1.0),
+        "income_volatility": history["volatility"],
+        "income_trend": history["trend"],
+    }
+
+
+def adapt_to_legacy_features_batch(columns: dict):
+    # adapt_to_legacy_features over whole columns, as an (n, len(FEATURES))
+    # matrix in the order LegacyKernel.score_many expects
+    from app.legacy.input import FEATURES
+
+    income = columns["monthly_income"]
+    rent = columns["monthly_rent"]
+    savings = columns["liquid_savings"]
+
+    has_rent = rent > 0
+    income_to_rent = _ratio(income, rent, has_rent, 0.0)
+    savings_runway = _ratio(savings, rent, has_rent, 0.0)   # not capped
+    history_years = np.minimum(5, savings_runway)
+
+    legacy = {
+        "income_stability": np.minimum(100, income_to_rent * 30),
+        "eviction_history": (savings_runway < 1).astype(float),
+        "criminal_history": np.zeros(len(income)),
+        "voucher": (income_to_rent < 2).astype(float),
+        "employment_years": history_years,
+        "savings_ratio": np.minimum(1.0, _ratio(savings, income * 6, income > 0, 0.0)),
+        "rental_history_years": history_years,
+    }
+    return np.column_stack([legacy[name] for name in FEATURES])
+
+
+def risk_levels(scores, low_risk_score=LOW_RISK_SCORE, medium_risk_score=MEDIUM_RISK_SCORE):
+    return np.select(
+        [scores >= low_risk_score, scores >= medium_risk_score],
+        ["low", "medium"],
+        default="high",
+    )
+
+
+def score_features_batch(features: dict, weights: dict = WEIGHTS,
+                         low_risk_score=LOW_RISK_SCORE, medium_risk_score=MEDIUM_RISK_SCORE) -> dict:
+    scored = SCORED_FEATURES if weights is WEIGHTS else scored_features(weights)
+    matrix = np.column_stack([features[name] for name in scored])
+    weights = np.array([weights[name] for name in scored])
+
+    raw = matrix @ weights
+    scores = np.clip(np.trunc(raw * 100), 0, 100).astype(int)
+
+    return {
+        "score": scores,
+        "risk_level": risk_levels(scores, low_risk_score, medium_risk_score),
+    }
+
+
+def _rows(variants, values: list[str], good) -> zip:
+    # (value, status, explanation) per tenant for one breakdown entry
+    _, (good_status, good_text), (bad_status, bad_text) = variants
+    return zip(
+        values,
+        np.where(good, good_status, bad_status).tolist(),
+        np.where(good, good_text, bad_text).tolist(),
+    )
+
+
+def _benchmarks(features: dict) -> tuple:
+    # which tenants pass each breakdown entry's benchmark
+    return (
+        features["income_to_rent"] >= GOOD_INCOME_TO_RENT,
+        features["savings_runway_months"] >= GOOD_SAVINGS_RUNWAY,
+        features["payment_stress_index"] <= LOW_STRESS_PSI,
+    )
+
+
+def explain_features_batch(features: dict) -> list[list[dict]]:
+    itr = features["income_to_rent"]
+    savings = features["savings_runway_months"]
+    psi = features["payment_stress_index"]
+
+    itr_good, savings_good, psi_good = _benchmarks(features)
+
+    # statuses come from vectorized thresholds, the display values still get
+    # formatted one by one to match explain_features character for character
+    itr_rows = _rows(INCOME_TO_RENT, [f"{int(100 / v)}%" if v > 0 else "N/A" for v in itr.tolist()], itr_good)
+    savings_rows = _rows(SAVINGS_RUNWAY, [f"{int(v)} months" for v in savings.tolist()], savings_good)
+    psi_rows = _rows(PAYMENT_STRESS, [f"{round(v, 2)}" for v in psi.tolist()], psi_good)
+
+    names = (INCOME_TO_RENT[0], SAVINGS_RUNWAY[0], PAYMENT_STRESS[0])
+    return [
+        [
+            {"name": name, "value": value, "status": status, "explanation": explanation}
+            for name, (value, status, explanation) in zip(names, row)
+        ]
+        for row in zip(itr_rows, savings_rows, psi_rows)
+    ]
+
+
+# explain_features_batch as columns, for the binary batch formats: each
+# breakdown entry's feature value and status. the explanation text only
+# depends on the status (app/services/explain.py) and the display value is
+# the feature formatted, so neither gets built per tenant
+def breakdown_columns(features: dict) -> dict:
+    columns = {}
+    for (name, variants), good in zip(
+        (("income_to_rent", INCOME_TO_RENT), ("savings_runway_months", SAVINGS_RUNWAY),
+         ("payment_stress_index", PAYMENT_STRESS)),
+        _benchmarks(features),
+    ):
+        _, (good_status, _), (bad_status, _) = variants
+        columns[name] = features[name]
+        columns[f"{name}_status"] = np.where(good, good_status, bad_status)
+    return columns
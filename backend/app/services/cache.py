@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from app.config import constants
+from app.schemas.tenant import TenantInput
+
+
+def _fingerprint(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+
+def scoring_fingerprint(weights: dict, low_risk_score, medium_risk_score) -> str:
+    # everything that can change a score, band, explanation or impact;
+    # editing any of it changes the key, so stale entries are never hit
+    return _fingerprint(
+        weights,
+        low_risk_score,
+        medium_risk_score,
+        constants.MAX_SAVINGS_RUNWAY,
+        constants.GOOD_INCOME_TO_RENT,
+        constants.GOOD_SAVINGS_RUNWAY,
+        constants.LOW_STRESS_PSI,
+        constants.MAX_MISSED_MONTHS_PER_YEAR,
+    )
+
+
+# the constants.py model; registry versions carry their own
+SCORING_FINGERPRINT = scoring_fingerprint(constants.WEIGHTS, constants.LOW_RISK_SCORE, constants.MEDIUM_RISK_SCORE)
+
+
+def _number(x: float) -> float:
+    return float(x) + 0.0    # folds -0.0 into 0.0
+
+
+def tenant_key(tenant: TenantInput) -> tuple:
+    history = tenant.income_history
+    if history:
+        packed = struct.pack(f"<{len(history)}d", *map(_number, history))
+        history = hashlib.blake2b(packed, digest_size=16).hexdigest()
+    else:
+        history = None   # None and [] score the same
+
+    return (
+        _number(tenant.monthly_income),
+        _number(tenant.monthly_rent),
+        _number(tenant.liquid_savings),
+        _number(tenant.monthly_debt),
+        history,
+    )
+
+
+class ResultCache:
+    """Bounded LRU cache with a TTL that coalesces identical in-flight calls.
+
+    While one caller computes a key, the others with the same key wait for
+    its result instead of computing it again. Failures are not cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._inflight = {}             # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        # -> (value, None) on a hit, (None, future) to wait on, or (None, None)
+        # when the caller has to compute. call with the lock held
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], None
+            del self._entries[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return None, future
+
+        self.misses += 1
+        self._inflight[key] = Future()
+        return None, None
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            future = self._inflight.pop(key)
+        future.set_result(value)
+
+    def _fail(self, key, error):
+        with self._lock:
+            future = self._inflight.pop(key)
+        future.set_exception(error)
+
+    def get_or_compute(self, key, compute):
+        if self.maxsize <= 0:
+            return compute()
+
+        with self._lock:
+            value, future = self._lookup(key)
+        if future is not None:
+            return future.result()
+        if value is not None:
+            return value
+
+        try:
+            value = compute()
+        except BaseException as e:
+            self._fail(key, e)
+            raise
+        self._store(key, value)
+        return value
+
+    async def get_or_compute_async(self, key, compute):
+        # same as get_or_compute, for a coroutine function; waiting on
+        # another caller's computation does not block the event loop
+        if self.maxsize <= 0:
+            return await compute()
+
+        with self._lock:
+            value, future = self._lookup(key)
+        if future is not None:
+            return await asyncio.wrap_future(future)
+        if value is not None:
+            return value
+
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._fail(key, e)
+            raise
+        self._store(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+            }
+
+
+RESULT_CACHE = ResultCache(constants.RESULT_CACHE_SIZE, constants.RESULT_CACHE_TTL_SECONDS)
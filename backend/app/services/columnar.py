@@ -0,0 +1,299 @@
+"""Columnar binary cache for CSV datasets.
+
+A CSV is parsed once into one .npy file per column plus a manifest.json
+(dtypes, row count, categories, source size/mtime/sha256). Later loads
+memory-map the .npy files, so no text is parsed and nothing is copied until
+a column is actually read. String columns are stored as integer codes with
+their categories in the manifest (-1 = missing).
+
+The cache lives in a .columns/ directory next to the CSV (or under
+FAIRTENANT_COLUMN_CACHE) and is rebuilt only when the CSV's content changes:
+a size/mtime match is trusted, otherwise the sha256 decides.
+
+Each build writes a new data folder that is never modified afterwards; the
+manifest names the current one and is swapped in with a single rename, so
+readers (in any process) see either the old build or the new one. The
+previous build is kept for readers that read the manifest just before the
+swap, older ones are removed (tables map all their files when opened).
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# bump when the cache layout changes so old caches get rebuilt
+CACHE_VERSION = 2
+CACHE_ENV = "FAIRTENANT_COLUMN_CACHE"
+CSV_CHUNK_ROWS = 500_000
+
+_BUILD_LOCK = threading.Lock()
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_dir(source) -> Path:
+    source = Path(source).resolve()
+    root = os.environ.get(CACHE_ENV)
+    root = Path(root) if root else source.parent / ".columns"
+    # the path hash keeps same-named files from different folders apart
+    tag = hashlib.blake2b(str(source).encode(), digest_size=4).hexdigest()
+    return root / f"{source.stem}-{tag}"
+
+
+class ColumnTable:
+    """Memory-mapped columns of one cached CSV."""
+
+    def __init__(self, directory: Path, manifest: dict):
+        self.directory = directory      # this build's folder
+        self.manifest = manifest
+        self.rows = manifest["rows"]
+        self.names = [c["name"] for c in manifest["columns"]]
+        self._specs = {c["name"]: c for c in manifest["columns"]}
+        # mapped up front (no data is read yet): a mapping outlives a later
+        # build removing this one's files
+        self._arrays = {c["name"]: np.load(self.directory / c["file"], mmap_mode="r")
+                        for c in manifest["columns"]}
+
+    def __len__(self):
+        return self.rows
+
+    def raw(self, name: str) -> np.ndarray:
+        # stored array as is (codes for string columns), memory-mapped
+        return self._arrays[name]
+
+    def categories(self, name: str):
+        return self._specs[name]["categories"]
+
+    def column(self, name: str, start: int = 0, stop: int = None):
+        # numeric columns stay zero-copy views; string columns come back as a
+        # pandas Categorical over their codes
+        values = self.raw(name)[start:stop]
+        categories = self.categories(name)
+        if categories is None:
+            return values
+
+        import pandas as pd
+        return pd.Categorical.from_codes(np.asarray(values), categories)
+
+    def frame(self, columns: list = None, start: int = 0, stop: int = None):
+        import pandas as pd
+
+        columns = self.names if columns is None else columns
+        return pd.DataFrame({name: self.column(name, start, stop) for name in columns}, copy=False)
+
+
+def _stat(path: Path) -> tuple:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def read_manifest(directory: Path):
+    try:
+        manifest = json.loads((directory / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == CACHE_VERSION else None
+
+
+def write_manifest(directory: Path, manifest: dict):
+    tmp = directory / f"manifest.json.tmp-{os.getpid()}-{threading.get_ident()}"
+    tmp.write_text(json.dumps(manifest, indent=1))
+    tmp.replace(directory / "manifest.json")   # atomic, readers never see half a file
+
+
+def is_fresh(manifest, source: Path, directory: Path = None) -> bool:
+    if manifest is None:
+        return False
+    size, mtime_ns = _stat(source)
+    if manifest["source_size"] == size and manifest["source_mtime_ns"] == mtime_ns:
+        return True
+    # touched or checked out again: only a content change counts
+    if manifest["source_size"] != size or manifest["source_sha256"] != file_sha256(source):
+        return False
+    if directory is not None:
+        # remember the new mtime so the next load skips the hash
+        try:
+            write_manifest(directory, dict(manifest, source_mtime_ns=mtime_ns))
+        except OSError:
+            pass    # read-only cache, hash again next time
+    return True
+
+
+class _ColumnWriter:
+    """Appends one column's chunks to a raw temp file, upcasting if needed."""
+
+    def __init__(self, directory: Path, index: int, name: str):
+        self.name = name
+        self.file = f"{index:03d}.npy"
+        self.path = directory / f"{index:03d}.raw"
+        self.dtype = None
+        self.categories = None   # value -> code, for string columns
+        self.rows = 0
+
+    def append(self, series):
+        import pandas as pd
+
+        if self.dtype is None:
+            is_string = not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series))
+            self.categories = {} if is_string else None
+
+        if self.categories is not None:
+            values = self._codes(series)
+        elif not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+            raise ValueError(f"column {self.name!r} mixes numbers and text")
+        else:
+            values = series.to_numpy()
+
+        if self.dtype is None:
+            self.dtype = values.dtype
+        elif values.dtype != self.dtype:
+            dtype = np.result_type(self.dtype, values.dtype)
+            if dtype != self.dtype:
+                # e.g. ints so far, then a chunk with a missing value
+                np.fromfile(self.path, dtype=self.dtype).astype(dtype).tofile(self.path)
+                self.dtype = dtype
+            values = values.astype(dtype)
+
+        with open(self.path, "ab") as f:
+            np.ascontiguousarray(values).tofile(f)
+        self.rows += len(values)
+
+    def _codes(self, series) -> np.ndarray:
+        import pandas as pd
+
+        codes, uniques = pd.factorize(series)
+        lookup = np.empty(len(uniques) + 1, dtype=np.int32)
+        lookup[-1] = -1   # factorize marks missing values with -1
+        for i, value in enumerate(uniques):
+            lookup[i] = self.categories.setdefault(str(value), len(self.categories))
+        return lookup[codes]
+
+    def finish(self) -> dict:
+        # .npy header, then the raw data streamed in behind it
+        dtype = self.dtype if self.dtype is not None else np.dtype(float)
+        with open(self.path.with_name(self.file), "wb") as out:
+            np.lib.format.write_array_header_1_0(out, {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (self.rows,),
+            })
+            if self.path.exists():
+                with open(self.path, "rb") as raw:
+                    shutil.copyfileobj(raw, out, 1 << 20)
+        self.path.unlink(missing_ok=True)
+
+        return {
+            "name": self.name,
+            "file": self.file,
+            "dtype": dtype.str,
+            "categories": list(self.categories) if self.categories is not None else None,
+        }
+
+
+def build_cache(source, directory: Path = None) -> ColumnTable:
+    import pandas as pd
+
+    source = Path(source)
+    directory = Path(directory) if directory else cache_dir(source)
+    size, mtime_ns = _stat(source)
+    sha256 = file_sha256(source)
+
+    data = f"{sha256[:12]}-{os.getpid()}-{time.time_ns():x}"
+    tmp = directory / f"{data}.tmp"
+    tmp.mkdir(parents=True)
+    try:
+        writers = None
+        for chunk in pd.read_csv(source, chunksize=CSV_CHUNK_ROWS):
+            if writers is None:
+                writers = [_ColumnWriter(tmp, i, name) for i, name in enumerate(chunk.columns)]
+            for writer, name in zip(writers, chunk.columns):
+                writer.append(chunk[name])
+        if writers is None:   # header only
+            writers = [_ColumnWriter(tmp, i, name) for i, name in enumerate(pd.read_csv(source, nrows=0).columns)]
+
+        manifest = {
+            "version": CACHE_VERSION,
+            "source": source.name,
+            "source_size": size,
+            "source_mtime_ns": mtime_ns,
+            "source_sha256": sha256,
+            "data": data,
+            "rows": writers[0].rows if writers else 0,
+            "columns": [writer.finish() for writer in writers],
+        }
+        # mapped first: once renamed, a concurrent build may sweep it
+        table = ColumnTable(tmp, manifest)
+        tmp.rename(directory / data)
+        table.directory = directory / data
+
+        # point the manifest at the finished build; nothing a reader may be
+        # using is deleted or rewritten in place
+        previous = read_manifest(directory) or {}
+        write_manifest(directory, manifest)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    keep = {data, previous.get("data")}
+    for entry in directory.iterdir():
+        # unfinished builds of other processes end in .tmp; one swept between
+        # its rename and its manifest write is simply rebuilt by the next load
+        if entry.name in keep or entry.suffix == ".tmp" or entry.name.startswith("manifest.json"):
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            entry.unlink(missing_ok=True)   # loose files are the old layout
+
+    return table
+
+
+def _open(directory: Path, manifest: dict):
+    try:
+        return ColumnTable(directory / manifest["data"], manifest)
+    except FileNotFoundError:
+        return None     # removed by a concurrent build, rebuild it
+
+
+def load_columns(source, rebuild: bool = False) -> ColumnTable:
+    """The cached columns of a CSV, converting it first if needed.
+
+    Raises OSError if the cache is stale and cannot be written (e.g. a
+    read-only filesystem); callers fall back to reading the CSV.
+    """
+    source = Path(source)
+    directory = cache_dir(source)
+
+    manifest = None if rebuild else read_manifest(directory)
+    if is_fresh(manifest, source, directory):
+        table = _open(directory, manifest)
+        if table is not None:
+            return table
+
+    with _BUILD_LOCK:
+        manifest = None if rebuild else read_manifest(directory)
+        if is_fresh(manifest, source, directory):
+            table = _open(directory, manifest)
+            if table is not None:
+                return table
+        return build_cache(source, directory)
+
+
+def read_frame(source, columns: list = None):
+    """A DataFrame of the CSV's columns via the cache, or pd.read_csv if the
+    cache can't be written."""
+    try:
+        return load_columns(source).frame(columns)
+    except OSError:
+        import pandas as pd
+        return pd.read_csv(source, usecols=columns)
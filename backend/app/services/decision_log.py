@@ -0,0 +1,395 @@
+import asyncio
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from app.config.constants import (
+    DECISION_LOG_BATCH, DECISION_LOG_BLOCK_SECONDS, DECISION_LOG_DIR, DECISION_LOG_ENABLED,
+    DECISION_LOG_LINGER_MS, DECISION_LOG_OVERFLOW, DECISION_LOG_QUEUE, DECISION_LOG_SEGMENT_MB,
+    DECISION_LOG_SEGMENT_SECONDS, DECISION_LOG_SYNCHRONOUS,
+)
+from app.services.legacy_score import adapt_to_legacy_features
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,           -- unix seconds, when the decision was served
+    route TEXT NOT NULL,
+    model TEXT NOT NULL,        -- registry version
+    score REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    legacy_score REAL,          -- /compare only, null when degraded
+    input TEXT NOT NULL,        -- json: the TenantInput
+    features TEXT NOT NULL,     -- json: compute_features, as scored
+    legacy_features TEXT,       -- json: adapt_to_legacy_features, /compare only
+    result TEXT NOT NULL        -- json: the response body (/batch: score and risk_level)
+);
+CREATE INDEX IF NOT EXISTS decisions_ts ON decisions (ts);
+CREATE INDEX IF NOT EXISTS decisions_risk_ts ON decisions (risk_level, ts);
+"""
+_COLUMNS = ("ts", "route", "model", "score", "risk_level", "legacy_score",
+            "input", "features", "legacy_features", "result")
+_JSON_COLUMNS = ("input", "features", "legacy_features", "result")
+_INSERT = f"INSERT INTO decisions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+# put on the queue by close(): finish the open segment
+_CLOSE = object()
+
+
+def _json(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _row(item) -> tuple:
+    # queue item -> table row; everything slow about a decision happens here,
+    # on the writer thread
+    ts, route, model, tenant, result, features = item
+    new = result.get("new_model", result)    # /compare nests the new model
+    legacy = result.get("legacy_model")
+    return (
+        ts, route, model, new["score"], new["risk_level"],
+        legacy["score"] if legacy else None,
+        tenant.model_dump_json(),
+        _json(features),
+        _json(adapt_to_legacy_features(tenant)) if legacy else None,
+        _json(result),
+    )
+
+
+class _Batch(NamedTuple):
+    # one /batch request, turned into a row per tenant on the writer thread
+    ts: float
+    route: str
+    model: str
+    columns: dict       # tenant_columns
+    result: dict        # score_batch
+    features: dict      # compute_features_batch
+
+
+def _batch_rows(item: _Batch) -> list[tuple]:
+    names = ("monthly_income", "monthly_rent", "liquid_savings", "monthly_debt")
+    inputs = [item.columns[name].tolist() for name in names]
+    histories = item.columns["income_history"]
+    values, offsets = histories.values.tolist(), histories.offsets.tolist()
+    # nan is how the batch spells compute_features' None
+    features = {name: [v if v == v else None for v in column.tolist()] for name, column in item.features.items()}
+    scores, levels = item.result["score"].tolist(), item.result["risk_level"].tolist()
+
+    rows = []
+    for i, (score, level) in enumerate(zip(scores, levels)):
+        tenant = {name: column[i] for name, column in zip(names, inputs)}
+        tenant["income_history"] = values[offsets[i]:offsets[i + 1]] or None
+        rows.append((
+            item.ts, item.route, item.model, score, level, None,
+            _json(tenant),
+            _json({name: column[i] for name, column in features.items()}),
+            None,
+            _json({"score": score, "risk_level": level}),
+        ))
+    return rows
+
+
+def _rows(item) -> list[tuple]:
+    return _batch_rows(item) if isinstance(item, _Batch) else [_row(item)]
+
+
+def _size(item) -> int:
+    # decisions in a queue item
+    return len(item.result["score"]) if isinstance(item, _Batch) else 1
+
+
+def segment_start(path: Path) -> float:
+    # decisions-<unix ms>.sqlite -> unix seconds the segment was started
+    return int(path.stem.partition("-")[2]) / 1000
+
+
+class DecisionLog:
+    """Append-only log of every served decision, written off the request path.
+
+    record() only stamps the time and puts the decision on a bounded queue.
+    A background thread waits `linger` seconds after the first decision
+    arrives, takes whatever has queued up by then (up to `batch`), turns it
+    into rows and commits them in one transaction, so a burst costs one
+    commit rather than one per request. The rows go to segment files
+    (decisions-<start ms>.sqlite, WAL mode) in `directory`; a new segment is
+    started once the current one is past segment_bytes or segment_seconds.
+
+    When the queue is full, `overflow` decides: "block" waits up to
+    block_seconds for room, "drop_newest" drops the new decision,
+    "drop_oldest" drops the oldest queued one. Every drop is counted.
+    """
+
+    def __init__(self, directory: Path = DECISION_LOG_DIR, enabled: bool = DECISION_LOG_ENABLED,
+                 maxsize: int = DECISION_LOG_QUEUE, overflow: str = DECISION_LOG_OVERFLOW,
+                 block_seconds: float = DECISION_LOG_BLOCK_SECONDS, batch: int = DECISION_LOG_BATCH,
+                 linger: float = DECISION_LOG_LINGER_MS / 1000,
+                 segment_bytes: int = int(DECISION_LOG_SEGMENT_MB * 1024 * 1024),
+                 segment_seconds: float = DECISION_LOG_SEGMENT_SECONDS,
+                 synchronous: str = DECISION_LOG_SYNCHRONOUS):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, not {overflow!r}")
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.overflow = overflow
+        self.block_seconds = block_seconds
+        self.batch = batch
+        self.linger = linger
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.synchronous = synchronous
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        # owned by the writer thread
+        self._conn = None
+        self._segment = None
+        self._opened = 0.0
+        self.written = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="decision-log", daemon=True)
+                self._thread.start()
+                # whatever is still queued at exit gets written
+                atexit.register(self.close)
+
+    def _drop(self, n: int = 1):
+        with self._lock:
+            self.dropped += n
+
+    def _offer(self, item) -> bool:
+        # put without waiting; False means it is up to the caller to block
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        if self.overflow == "block":
+            return False
+        if self.overflow == "drop_oldest":
+            try:
+                oldest = self._queue.get_nowait()
+                self._queue.task_done()
+                if oldest is _CLOSE:
+                    self._queue.put_nowait(_CLOSE)
+                else:
+                    self._drop(_size(oldest))
+                self._queue.put_nowait(item)
+                return True
+            except (queue.Empty, queue.Full):
+                pass
+        self._drop(_size(item))
+        return True
+
+    def _wait_for_room(self, item):
+        try:
+            self._queue.put(item, timeout=self.block_seconds)
+        except queue.Full:
+            self._drop(_size(item))
+
+    def check_writable(self):
+        """Raise RuntimeError if the log is on and can't write to its
+        directory, so a misconfigured deploy fails at startup rather than
+        losing every decision on the writer thread."""
+        if not self.enabled:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            probe = self.directory / f".probe-{os.getpid()}"
+            probe.write_bytes(b"")
+            probe.unlink()
+        except OSError as e:
+            raise RuntimeError(
+                f"decision log directory {self.directory} is not writable ({e}); point "
+                f"FAIRTENANT_DECISION_LOG_DIR at a writable directory or set FAIRTENANT_DECISION_LOG=0"
+            ) from e
+
+    def record(self, route: str, model: str, tenant, result: dict, features: dict):
+        # one served decision: the TenantInput, the handler's result dict and
+        # the compute_features it was scored on (neither is mutated)
+        if not self.enabled:
+            return
+        item = (time.time(), route, model, tenant, result, features)
+        if not self._offer(item):
+            self._wait_for_room(item)
+
+    def record_batch(self, route: str, model: str, columns: dict, result: dict, features: dict):
+        # one /batch request as a single queue item: tenant_columns, the
+        # score_batch arrays and compute_features_batch (none are mutated)
+        if not self.enabled:
+            return
+        item = _Batch(time.time(), route, model, columns, result, features)
+        if not self._offer(item):
+            self._wait_for_room(item)
+
+    async def record_async(self, route: str, model: str, tenant, result: dict, features: dict):
+        # record() for the event loop: a "block" wait happens on a thread
+        if not self.enabled:
+            return
+        item = (time.time(), route, model, tenant, result, features)
+        if not self._offer(item):
+            await asyncio.get_running_loop().run_in_executor(None, self._wait_for_room, item)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            if self.linger and items[0] is not _CLOSE:
+                time.sleep(self.linger)    # let the batch fill up
+            while len(items) < self.batch and items[-1] is not _CLOSE:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if items[-1] is _CLOSE:
+                    if len(items) > 1:
+                        self._write(items[:-1])
+                    self._close_segment()
+                else:
+                    self._write(items)
+            except Exception as e:
+                with self._lock:
+                    self.errors += sum(_size(item) for item in items if item is not _CLOSE)
+                    self.last_error = f"{type(e).__name__}: {e}"
+                self._close_segment()
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _open_segment(self):
+        import sqlite3
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        started = int(time.time() * 1000)
+        while (self.directory / f"decisions-{started:013d}.sqlite").exists():
+            started += 1
+        path = self.directory / f"decisions-{started:013d}.sqlite"
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.executescript(_SCHEMA)
+        self._conn, self._segment, self._opened = conn, path, started / 1000
+
+    def _close_segment(self):
+        conn, self._conn, self._segment = self._conn, None, None
+        if conn is not None:
+            try:
+                # a finished segment is only ever read: fold the WAL back in
+                # and leave a single plain file
+                conn.execute("PRAGMA journal_mode=DELETE")
+                conn.close()
+            except Exception:
+                pass
+
+    def _segment_size(self) -> int:
+        wal = self._segment.with_name(self._segment.name + "-wal")
+        return self._segment.stat().st_size + (wal.stat().st_size if wal.exists() else 0)
+
+    def _write(self, items):
+        if self._conn is not None and (
+            time.time() - self._opened >= self.segment_seconds
+            or self._segment_size() >= self.segment_bytes
+        ):
+            self._close_segment()
+        if self._conn is None:
+            self._open_segment()
+
+        rows = [row for item in items for row in _rows(item)]
+        with self._conn:    # one transaction, one commit for the lot
+            self._conn.executemany(_INSERT, rows)
+        with self._lock:
+            self.written += len(rows)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(rows))
+
+    def flush(self):
+        # block until everything recorded so far is committed
+        self._queue.join()
+
+    def close(self):
+        # flush and close the current segment; later records open a new one
+        if self._thread is not None:
+            self._queue.put(_CLOSE)
+            self._queue.join()
+
+    def segments(self) -> list[Path]:
+        # oldest first
+        return sorted(self.directory.glob("decisions-*.sqlite"))
+
+    def query(self, start: float = None, end: float = None, risk_level: str = None,
+              route: str = None, model: str = None, limit: int = 100) -> list[dict]:
+        """Logged decisions with start <= ts < end (unix seconds), oldest
+        first, at most `limit`. Only what has been committed shows up."""
+        import sqlite3
+
+        where, args = [], []
+        for clause, value in (("ts >= ?", start), ("ts < ?", end), ("risk_level = ?", risk_level),
+                              ("route = ?", route), ("model = ?", model)):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        sql = (f"SELECT {', '.join(_COLUMNS)} FROM decisions"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY ts LIMIT ?")
+
+        rows = []
+        segments = self.segments()
+        for i, path in enumerate(segments):
+            # everything in a segment was written before the next one was
+            # started, so one started before `start` can be skipped
+            if start is not None and i + 1 < len(segments) and segment_start(segments[i + 1]) <= start:
+                continue
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                rows += conn.execute(sql, [*args, limit - len(rows)]).fetchall()
+            finally:
+                conn.close()
+            if len(rows) >= limit:
+                break
+
+        # a decision queued during a rotation can land in the later segment
+        rows.sort(key=lambda row: row[0])
+        decisions = []
+        for row in rows:
+            decision = dict(zip(_COLUMNS, row))
+            for column in _JSON_COLUMNS:
+                if decision[column] is not None:
+                    decision[column] = json.loads(decision[column])
+            decisions.append(decision)
+        return decisions
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "directory": str(self.directory),
+                "overflow": self.overflow,
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "mean_batch": round(self.written / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "segments": len(self.segments()),
+                "current_segment": self._segment.name if self._segment is not None else None,
+            }
+
+
+DECISIONS = DecisionLog()
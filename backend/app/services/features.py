@@ -1,28 +1,35 @@
 from app.schemas import tenant
 from app.schemas.tenant import TenantInput
 from app.config.constants import MAX_SAVINGS_RUNWAY
+from app.services.ratios import base_ratios
 import statistics
 
 
+# the keys compute_features returns; the income history ones are None
+# without at least three months of history
+FEATURE_NAMES = (
+    "income_to_rent", "post_rent_income", "savings_runway_months", "debt_to_income",
+    "payment_stress_index", "income_volatility", "income_trend",
+)
+OPTIONAL_FEATURES = ("income_volatility", "income_trend")
+
+
 # convert the landlord input into financial facts
-def compute_features(tenant: TenantInput):
+def compute_features(tenant: TenantInput, ratios: dict = None):
 
     income = tenant.monthly_income
     rent = tenant.monthly_rent
-    savings = tenant.liquid_savings
     debt = tenant.monthly_debt
 
+    if ratios is None:
+        ratios = base_ratios(tenant)
+
     # affordability
-    income_to_rent = 0
-    if rent > 0:
-        income_to_rent = income/rent
+    income_to_rent = ratios["income_to_rent"]
 
     post_rent_income = income - rent
 
-    savings_runway = 0
-    if rent > 0:
-        savings_runway = savings / rent
-        savings_runway = min(savings_runway, MAX_SAVINGS_RUNWAY)
+    savings_runway = min(ratios["savings_runway"], MAX_SAVINGS_RUNWAY)
 
     debt_to_income = 0
     if income > 0:
@@ -0,0 +1,303 @@
+import io
+import json
+
+from fastapi import HTTPException, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic import ValidationError
+
+from app.schemas.tenant import TenantInput
+from app.services.metrics import METRICS, InstrumentedRoute, _timed_endpoint
+from app.services.responses import respond
+
+try:
+    import msgpack
+except ImportError:     # optional, MessagePack bodies get a 415 without it
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:     # optional, json parses the same documents
+    orjson = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+NPZ = "application/x-npz"
+
+# single tenants: JSON or MessagePack; batches: JSON, an Arrow IPC stream or
+# a NumPy .npz archive, one array per column
+RECORD_FORMATS = (JSON, MSGPACK)
+BATCH_FORMATS = (JSON, ARROW, NPZ)
+BINARY_FORMATS = (MSGPACK, ARROW, NPZ)
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+# the TenantInput fields as batch columns
+FLOAT_COLUMNS = ("monthly_income", "monthly_rent", "liquid_savings", "monthly_debt")
+
+
+def media_type(header: str = None) -> str:
+    # "Application/MsgPack; charset=x" -> "application/msgpack"
+    if not header:
+        return None
+    media = header.partition(";")[0].strip().lower()
+    return _ALIASES.get(media, media)
+
+
+def available(media: str) -> bool:
+    if media == MSGPACK:
+        return msgpack is not None
+    if media == ARROW:
+        from importlib.util import find_spec
+
+        return find_spec("pyarrow") is not None
+    return True
+
+
+def negotiate(accept: str, offered: tuple) -> str:
+    """The response format for an Accept header: the highest-q offered
+    format that is installed. Anything else, no header or */* -> JSON,
+    as before there was a choice."""
+    if not accept or accept == "*/*" or accept == JSON:
+        return JSON
+    choices = []
+    for position, part in enumerate(accept.split(",")):
+        media, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        choices.append((-q, position, _ALIASES.get(media.strip().lower(), media.strip().lower())))
+    for negative_q, _, media in sorted(choices):
+        if negative_q < 0 and media in offered and available(media):
+            return media
+    return JSON
+
+
+def _unsupported(media: str, offered: tuple):
+    if media in offered and not available(media):
+        package = "msgpack" if media == MSGPACK else "pyarrow"
+        return HTTPException(status_code=415, detail=f"{media} needs the {package} package on the server")
+    return HTTPException(status_code=415, detail=f"unsupported Content-Type {media!r}, use one of {', '.join(offered)}")
+
+
+def _invalid(message: str, loc: tuple = ()):
+    # the same shape FastAPI gives a malformed JSON body
+    return RequestValidationError([{"type": "value_error", "loc": ("body", *loc), "msg": message, "input": None}])
+
+
+def read_record(body: bytes, media: str) -> TenantInput:
+    # one tenant from a MessagePack map, validated like a JSON body
+    if media != MSGPACK or msgpack is None:
+        raise _unsupported(media, RECORD_FORMATS)
+    try:
+        data = msgpack.unpackb(body)
+    except Exception as e:
+        raise _invalid(f"invalid MessagePack body: {e}")
+    try:
+        return TenantInput.model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+
+
+def read_json(body: bytes):
+    # orjson when it can; json for what only it accepts (NaN, ints past 64
+    # bits), as FastAPI's own parsing does. ValueError if neither can
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(body)
+
+
+def _float_column(name: str, values, rows: int = None):
+    import numpy as np
+
+    values = np.asarray(values)
+    if values.ndim != 1 or values.dtype.kind not in "iuf":
+        raise _invalid(f"column {name!r} must be a 1-d array of numbers, got {values.dtype} {values.shape}", (name,))
+    if rows is not None and len(values) != rows:
+        raise _invalid(f"column {name!r} has {len(values)} rows, expected {rows}", (name,))
+    return values.astype(float, copy=False)
+
+
+def _histories(values, offsets, rows: int):
+    # IncomeHistories from a flat values array and rows + 1 offsets
+    import numpy as np
+    from app.services.history import IncomeHistories
+
+    if values is None:
+        return IncomeHistories(np.empty(0), np.zeros(rows + 1, dtype=np.int64))
+    values = _float_column("income_history", values)
+    offsets = np.asarray(offsets)
+    if (offsets.ndim != 1 or offsets.dtype.kind not in "iu" or len(offsets) != rows + 1
+            or offsets[0] != 0 or offsets[-1] != len(values) or (np.diff(offsets) < 0).any()):
+        raise _invalid("income_history offsets must be rows + 1 non-decreasing integers "
+                       "from 0 to the number of values", ("income_history",))
+    return IncomeHistories(values, offsets)
+
+
+def _arrow_columns(body: bytes) -> dict:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except Exception as e:
+        raise _invalid(f"invalid Arrow IPC stream: {e}")
+
+    columns = {}
+    for name in FLOAT_COLUMNS:
+        if name not in table.column_names:
+            raise _invalid(f"missing column {name!r}", (name,))
+        column = table.column(name)
+        if column.null_count:
+            raise _invalid(f"column {name!r} has nulls", (name,))
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            raise _invalid(f"column {name!r} must be numeric, got {column.type}", (name,))
+        columns[name] = _float_column(name, column.to_numpy(), table.num_rows)
+
+    values = offsets = None
+    if "income_history" in table.column_names:
+        history = table.column("income_history")
+        if not (pa.types.is_list(history.type) or pa.types.is_large_list(history.type)):
+            raise _invalid(f"income_history must be a list column, got {history.type}", ("income_history",))
+        # a null history is an empty one, like None in JSON
+        lengths = pc.fill_null(pc.list_value_length(history), 0).to_numpy()
+        flat = pc.list_flatten(history)
+        if flat.null_count:
+            raise _invalid("income_history has null values", ("income_history",))
+        values = flat.to_numpy()
+        offsets = np.zeros(table.num_rows + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+    columns["income_history"] = _histories(values, offsets, table.num_rows)
+    return columns
+
+
+def _npz_columns(body: bytes) -> dict:
+    import numpy as np
+
+    try:
+        archive = np.load(io.BytesIO(body), allow_pickle=False)
+        arrays = {name: archive[name] for name in archive.files}
+    except Exception as e:
+        raise _invalid(f"invalid .npz body: {e}")
+
+    columns, rows = {}, None
+    for name in FLOAT_COLUMNS:
+        if name not in arrays:
+            raise _invalid(f"missing array {name!r}", (name,))
+        columns[name] = _float_column(name, arrays[name], rows)
+        rows = len(columns[name])
+
+    # income_history_values + income_history_offsets (rows + 1), as
+    # IncomeHistories keeps them; both or neither
+    values, offsets = arrays.get("income_history_values"), arrays.get("income_history_offsets")
+    if (values is None) != (offsets is None):
+        raise _invalid("send income_history_values and income_history_offsets together", ("income_history",))
+    columns["income_history"] = _histories(values, offsets, rows)
+    return columns
+
+
+def read_columns(body: bytes, media: str) -> dict:
+    """tenant_columns (app.services.batch) straight from an Arrow IPC stream
+    or a .npz archive, no TenantInput per row. 422 on anything tenant_columns
+    could not have produced from valid JSON."""
+    if media not in (ARROW, NPZ) or not available(media):
+        raise _unsupported(media, BATCH_FORMATS)
+    return _arrow_columns(body) if media == ARROW else _npz_columns(body)
+
+
+def record_response(content: dict, media: str):
+    if media == MSGPACK:
+        return Response(content=msgpack.packb(content), media_type=MSGPACK)
+    return respond(content)
+
+
+def columns_response(columns: dict, media: str) -> Response:
+    # equal-length numpy arrays as an Arrow IPC stream or a .npz archive
+    if media == ARROW:
+        import pyarrow as pa
+
+        table = pa.table(columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW)
+
+    import numpy as np
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **columns)
+    return Response(content=buffer.getvalue(), media_type=NPZ)
+
+
+def binary_openapi(request_formats: tuple, response_formats: tuple) -> dict:
+    # openapi_extra for a route taking / giving the binary formats too;
+    # FastAPI merges it into the generated JSON schema
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    return {
+        "requestBody": {"content": {media: binary for media in request_formats}},
+        "responses": {"200": {"content": {media: binary for media in response_formats}}},
+    }
+
+
+def binary_body(handler):
+    """Mark an endpoint as also taking binary bodies: with NegotiatedRoute,
+    a request whose Content-Type is one of BINARY_FORMATS goes to
+    `await handler(request)` instead of FastAPI's JSON parsing."""
+    def mark(endpoint):
+        endpoint.binary_handler = handler
+        return endpoint
+    return mark
+
+
+def json_body(handler):
+    """Mark an endpoint as having a faster path for JSON bodies: with
+    NegotiatedRoute, `await handler(request)` sees them first, and returning
+    None hands the request on to FastAPI's parsing and validation (and its
+    error responses)."""
+    def mark(endpoint):
+        endpoint.json_handler = handler
+        return endpoint
+    return mark
+
+
+class _BinaryBodies(APIRoute):
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        binary = getattr(self.endpoint, "binary_handler", None)
+        fast_json = getattr(self.endpoint, "json_handler", None)
+        if binary is None and fast_json is None:
+            return handler
+        if METRICS.enabled:
+            binary = binary and _timed_endpoint(binary)
+            fast_json = fast_json and _timed_endpoint(fast_json)
+
+        async def negotiated(request):
+            media = media_type(request.headers.get("content-type"))
+            if binary is not None and media in BINARY_FORMATS:
+                return await binary(request)
+            if fast_json is not None and media in (JSON, None):
+                # the body is cached on the request, a fallback reads it again
+                response = await fast_json(request)
+                if response is not None:
+                    return response
+            return await handler(request)
+
+        return negotiated
+
+
+class NegotiatedRoute(InstrumentedRoute, _BinaryBodies):
+    """InstrumentedRoute for endpoints marked with @binary_body / @json_body:
+    FastAPI documents their JSON body as usual, binary bodies go to the
+    endpoint's handler, JSON bodies to its fast path first. Every other
+    Content-Type behaves as it always has."""
@@ -0,0 +1,114 @@
+from itertools import chain
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# compute_features needs at least this many months to say anything
+MIN_HISTORY_POINTS = 3
+
+
+def _ratio(num, den, mask, default):
+    out = np.full(np.shape(num), default, dtype=float)
+    np.divide(num, den, out=out, where=mask)
+    return out
+
+
+def _segment_index(src_starts, dst_starts, counts):
+    # flat source index for every slot of segments laid out at dst_starts
+    return np.repeat(src_starts - dst_starts, counts) + np.arange(counts.sum())
+
+
+class IncomeHistories:
+    """Many tenants' income histories as one flat values array plus offsets.
+
+    History i is values[offsets[i]:offsets[i + 1]]; an empty or missing
+    history is just a zero-length slice.
+    """
+
+    def __init__(self, values, offsets):
+        self.values = np.asarray(values, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.lengths = np.diff(self.offsets)
+
+    @classmethod
+    def from_lists(cls, histories) -> "IncomeHistories":
+        lengths = [len(h) if h else 0 for h in histories]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.fromiter(chain.from_iterable(h or () for h in histories), dtype=float, count=int(offsets[-1]))
+        return cls(values, offsets)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def stats(self, min_points: int = MIN_HISTORY_POINTS) -> dict:
+        """mean, stdev, volatility and half-split trend for every history.
+
+        Same definitions as compute_features; nan where a history has fewer
+        than min_points values (compute_features returns None there).
+        """
+        n = len(self)
+        out = {name: np.full(n, np.nan) for name in ("mean", "stdev", "volatility", "trend")}
+
+        used = np.flatnonzero(self.lengths >= min_points)
+        if not len(used):
+            return out
+
+        counts = self.lengths[used]
+        flat_starts = np.cumsum(counts) - counts
+        # reduceat needs the used histories back to back, gather them if
+        # some were too short
+        if len(used) == n:
+            values = self.values
+        else:
+            values = self.values[_segment_index(self.offsets[used], flat_starts, counts)]
+
+        mean = np.add.reduceat(values, flat_starts) / counts
+        deviation = values - np.repeat(mean, counts)
+        stdev = np.sqrt(np.add.reduceat(deviation * deviation, flat_starts) / (counts - 1))
+
+        midpoint = counts // 2
+        halves = np.add.reduceat(values, np.column_stack([flat_starts, flat_starts + midpoint]).ravel())
+        first_half = halves[0::2] / midpoint
+        second_half = halves[1::2] / (counts - midpoint)
+
+        out["mean"][used] = mean
+        out["stdev"][used] = stdev
+        out["volatility"][used] = _ratio(stdev, mean, mean > 0, 0.0)
+        out["trend"][used] = _ratio(second_half - first_half, first_half, first_half > 0, 0.0)
+        return out
+
+    def rolling(self, window: int) -> dict:
+        """Volatility and least-squares slope over every full window.
+
+        Returns flat "volatility" and "slope" arrays plus "offsets", laid out
+        like the histories themselves: tenant i's windows are
+        offsets[i]:offsets[i + 1] (len - window + 1 of them, or none).
+        """
+        if window < 2:
+            raise ValueError("window must be at least 2")
+
+        counts = np.maximum(self.lengths - window + 1, 0)
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        if offsets[-1] == 0:
+            empty = np.empty(0)
+            return {"volatility": empty, "slope": empty, "offsets": offsets}
+
+        # every window over the flat array is a zero-copy view; keep the ones
+        # that start and end inside the same history
+        starts = _segment_index(self.offsets[:-1], offsets[:-1], counts)
+        windows = sliding_window_view(self.values, window)[starts]
+
+        mean = windows.mean(axis=1)
+        stdev = windows.std(axis=1, ddof=1)
+
+        t = np.arange(window) - (window - 1) / 2
+        slope = windows @ t / (t @ t)
+
+        return {
+            "volatility": _ratio(stdev, mean, mean > 0, 0.0),
+            "slope": slope,
+            "offsets": offsets,
+        }
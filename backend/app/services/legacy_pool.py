@@ -0,0 +1,151 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config.constants import (
+    LEGACY_BACKEND, LEGACY_BATCH_WINDOW_MS, LEGACY_MAX_BATCH, LEGACY_MAX_QUEUE, LEGACY_POOL_WORKERS,
+)
+from app.legacy.input import FEATURES
+from app.services.admission import Overloaded
+
+# set in each worker process by _init_worker
+_KERNEL = None
+
+
+def _init_worker(artifact: dict):
+    global _KERNEL
+    from app.legacy.kernel import LegacyKernel
+
+    _KERNEL = LegacyKernel(artifact)
+
+
+def _ready(_) -> int:
+    return os.getpid()
+
+
+def kernel_scores(rows: list) -> list[float]:
+    # runs in a worker: rows are FEATURES-ordered values, scored one at a
+    # time exactly like score_tenant so the numbers are the same
+    return [round(_KERNEL.score(dict(zip(FEATURES, row))), 2) for row in rows]
+
+
+class PoolFull(Overloaded):
+    pass
+
+
+class LegacyPool:
+    """Legacy scoring in pre-started worker processes, micro-batched.
+
+    score() is called from the event loop. Tenants that arrive within
+    window seconds of each other (up to max_batch) go to a worker in one
+    round trip; with max_queue tenants waiting or in flight, score() raises
+    PoolFull instead of queueing more.
+
+    scorer runs in the workers on a list of rows; it must be a module-level
+    function so it can be pickled.
+    """
+
+    def __init__(self, artifact: dict, workers: int = LEGACY_POOL_WORKERS,
+                 window: float = LEGACY_BATCH_WINDOW_MS / 1000, max_batch: int = LEGACY_MAX_BATCH,
+                 max_queue: int = LEGACY_MAX_QUEUE, scorer=kernel_scores):
+        self.workers = workers
+        self.window = window
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._scorer = scorer
+        # spawn, not fork: the server process has threads running
+        self._executor = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(artifact,),
+        )
+        # start every worker now rather than on the first requests
+        self.pids = sorted(set(self._executor.map(_ready, range(workers))))
+
+        self._pending = []   # (row, future) waiting for the next flush
+        self._timer = None
+        self.queued = 0      # tenants waiting or in flight
+        self.batches = 0
+        self.scored = 0
+
+    async def score(self, row: list) -> float:
+        if self.queued >= self.max_queue:
+            raise PoolFull(f"{self.queued} legacy scores already queued")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        self.queued += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush, loop)
+
+        try:
+            return await future
+        finally:
+            self.queued -= 1
+
+    def _flush(self, loop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.batches += 1
+        self.scored += len(batch)
+        done = loop.run_in_executor(self._executor, self._scorer, [row for row, _ in batch])
+        done.add_done_callback(lambda done: self._deliver(batch, done))
+
+    @staticmethod
+    def _deliver(batch, done):
+        error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+        scores = done.result() if error is None else [None] * len(batch)
+        for (_, future), score in zip(batch, scores):
+            if future.done():       # the request went away meanwhile
+                continue
+            if error is None:
+                future.set_result(score)
+            else:
+                future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "batches": self.batches,
+            "scored": self.scored,
+            "mean_batch": round(self.scored / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def loaded_legacy_pool():
+    # the pool if it has been started, else None (never starts it)
+    return _POOL
+
+
+def get_legacy_pool():
+    """The app's pool, started on first use; None unless
+    FAIRTENANT_LEGACY_BACKEND=process. Blocks while the workers start."""
+    global _POOL
+    if LEGACY_BACKEND != "process":
+        return None
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                from app.legacy.input import get_artifact
+
+                _POOL = LegacyPool(get_artifact())
+    return _POOL
@@ -1,6 +1,7 @@
 from app.legacy.input import score_tenant as legacy_score
 from app.schemas.tenant import TenantInput
 from app.services.impact import calculate_impact
+from app.services.ratios import base_ratios
 
 #FEATURES = [
 #    'income_stability',
@@ -12,18 +13,15 @@ from app.services.impact import calculate_impact
 #    'rental_history_years'
 #]
 
-def adapt_to_legacy_features(tenant: TenantInput) -> dict:
+def adapt_to_legacy_features(tenant: TenantInput, ratios: dict = None) -> dict:
     income = tenant.monthly_income
-    rent = tenant.monthly_rent
     savings = tenant.liquid_savings
 
-    income_to_rent = 0
-    if rent > 0:
-        income_to_rent = income / rent
+    if ratios is None:
+        ratios = base_ratios(tenant)
 
-    savings_runway = 0
-    if rent > 0:
-         savings_runway = savings / rent
+    income_to_rent = ratios["income_to_rent"]
+    savings_runway = ratios["savings_runway"]
 
     eviction_history = 0
     if savings_runway < 1:
@@ -50,8 +48,8 @@ def adapt_to_legacy_features(tenant: TenantInput) -> dict:
         "monthly_income": income
     }
 
-def score_legacy(tenant_request):
-    legacy_tenant = adapt_to_legacy_features(tenant_request)
+def score_legacy(tenant_request, ratios: dict = None):
+    legacy_tenant = adapt_to_legacy_features(tenant_request, ratios)
     result = legacy_score(legacy_tenant)
 
     score = result["score"]
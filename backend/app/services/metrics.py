@@ -0,0 +1,198 @@
+import asyncio
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from app.config.constants import METRICS_ENABLED
+
+# histogram bucket upper bounds, seconds (10us .. 2.5s)
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+_NOOP = nullcontext()
+
+# per-request slot the wrapped endpoint writes its own run time into
+_HANDLER_TIME = contextvars.ContextVar("handler_time", default=None)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(BUCKETS, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Stage:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metrics:
+    """In-process counters and latency histograms, rendered for Prometheus."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages = {}      # (route, stage) -> Histogram
+        self.requests = {}    # route -> Histogram
+        self.counters = {}    # (name, labels) -> int
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, key):
+        histogram = table.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(key, Histogram())
+        return histogram
+
+    def stage(self, route: str, name: str):
+        # with METRICS.stage(route, "features"): ...
+        if not self.enabled:
+            return _NOOP
+        return _Stage(self._histogram(self.stages, (route, name)))
+
+    def observe_stage(self, route: str, name: str, seconds: float):
+        if self.enabled:
+            self._histogram(self.stages, (route, name)).observe(seconds)
+
+    def observe_request(self, route: str, seconds: float):
+        if self.enabled:
+            self._histogram(self.requests, route).observe(seconds)
+
+    def count(self, name: str, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def render(self, extra_gauges: dict = None) -> str:
+        lines = []
+
+        def labels(pairs):
+            return ",".join(f'{k}="{v}"' for k, v in pairs)
+
+        by_name = {}
+        for (name, pairs), value in sorted(self.counters.items()):
+            by_name.setdefault(name, []).append((pairs, value))
+        for name, rows in by_name.items():
+            lines.append(f"# TYPE fairtenant_{name}_total counter")
+            lines.extend(f"fairtenant_{name}_total{{{labels(pairs)}}} {value}" for pairs, value in rows)
+
+        for metric, table, label_names in (
+            ("request_seconds", self.requests, ("route",)),
+            ("stage_seconds", self.stages, ("route", "stage")),
+        ):
+            lines.append(f"# TYPE fairtenant_{metric} histogram")
+            for key, histogram in sorted(table.items()):
+                base = labels(zip(label_names, key if isinstance(key, tuple) else (key,)))
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'fairtenant_{metric}_bucket{{{base},le="{bound}"}} {cumulative}')
+                lines.append(f"fairtenant_{metric}_sum{{{base}}} {histogram.sum}")
+                lines.append(f"fairtenant_{metric}_count{{{base}}} {histogram.count}")
+
+        for name, value in (extra_gauges or {}).items():
+            lines.append(f"# TYPE fairtenant_{name} gauge")
+            lines.append(f"fairtenant_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics(enabled=METRICS_ENABLED)
+
+
+def _timed_endpoint(endpoint):
+    # record how long the endpoint itself ran, so the route class can tell
+    # it apart from the framework work around it
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                slot = _HANDLER_TIME.get()
+                if slot is not None:
+                    slot[0] = time.perf_counter() - start
+    else:
+        @wraps(endpoint)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                slot = _HANDLER_TIME.get()
+                if slot is not None:
+                    slot[0] = time.perf_counter() - start
+    return timed
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that feeds request counts, errors and timings into METRICS.
+
+    Besides the total per route it records a "framework" stage: the time
+    FastAPI spends outside the endpoint (request parsing, threadpool
+    dispatch, response model validation, JSON encoding). With metrics off
+    it is a plain APIRoute.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if METRICS.enabled:
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not METRICS.enabled:
+            return handler
+
+        route = self.path_format
+
+        async def instrumented(request):
+            slot = [0.0]
+            token = _HANDLER_TIME.set(slot)
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+            except Exception as e:
+                status = getattr(e, "status_code", 422 if isinstance(e, RequestValidationError) else 500)
+                METRICS.count("requests", route=route, status=status)
+                METRICS.count("errors", route=route, status=status)
+                raise
+            finally:
+                _HANDLER_TIME.reset(token)
+
+            elapsed = time.perf_counter() - start
+            METRICS.observe_request(route, elapsed)
+            METRICS.observe_stage(route, "framework", elapsed - slot[0])
+            METRICS.count("requests", route=route, status=response.status_code)
+            if response.status_code >= 400:
+                METRICS.count("errors", route=route, status=response.status_code)
+            return response
+
+        return instrumented
@@ -0,0 +1,294 @@
+import math
+import threading
+import time
+
+from app.config.constants import (
+    MONITOR_BUCKET_SECONDS, MONITOR_BUCKETS, MONITOR_LEGACY_BINS_PER_POINT, MONITOR_QUANTILES,
+    MONITOR_REFERENCE_PATH, MONITOR_WINDOWS, PSI_MAJOR, PSI_MODERATE,
+)
+
+BANDS = ("low", "medium", "high")
+NEW_BINS = 101                                         # the new model scores whole points
+LEGACY_BINS = 100 * MONITOR_LEGACY_BINS_PER_POINT + 1
+
+# PSI compares score deciles; empty ones count as this share
+PSI_BINS = 10
+PSI_FLOOR = 1e-4
+
+
+def legacy_bin(score: float) -> int:
+    # legacy scores carry 2 decimals; the epsilon keeps 12.3 -> 123 under float error
+    return min(max(int(score * MONITOR_LEGACY_BINS_PER_POINT + 1e-6), 0), LEGACY_BINS - 1)
+
+
+def band(score: float, low_risk_score: float, medium_risk_score: float) -> str:
+    # risk_levels / score_features' banding, for a legacy score
+    if score >= low_risk_score:
+        return "low"
+    if score >= medium_risk_score:
+        return "medium"
+    return "high"
+
+
+class _Slice:
+    """Score histograms of one time slice: the new model's, the legacy
+    model's (from /compare), and how often each (new band, legacy band)
+    pair came up. Slices add up, so any window is the sum of its slices."""
+
+    __slots__ = ("start", "new", "legacy", "pairs")
+
+    def __init__(self, start: int = None):
+        self.start = start
+        self.new = [0] * NEW_BINS
+        self.legacy = [0] * LEGACY_BINS
+        self.pairs = [0] * (len(BANDS) * len(BANDS))   # new band * 3 + legacy band
+
+    def add(self, other: "_Slice"):
+        for mine, theirs in ((self.new, other.new), (self.legacy, other.legacy), (self.pairs, other.pairs)):
+            for i, count in enumerate(theirs):
+                if count:
+                    mine[i] += count
+        return self
+
+
+class _Stream:
+    # one model version's slices: a ring of the last MONITOR_BUCKETS plus a total
+    def __init__(self, buckets: int):
+        self.ring = [None] * buckets
+        self.total = _Slice()
+
+
+def _quantiles(counts: list, bins_per_point: int) -> dict:
+    # nearest-rank quantiles, to the bin (exact for the new model)
+    n = sum(counts)
+    ranks = [(f"p{q}", max(1, math.ceil(q / 100 * n))) for q in MONITOR_QUANTILES]
+    out, seen, i = {}, 0, 0
+    for name, rank in ranks:
+        while seen + counts[i] < rank:
+            seen += counts[i]
+            i += 1
+        out[name] = i / bins_per_point
+    return out
+
+
+def _band_counts(counts: list, bins_per_point: int, low_risk_score, medium_risk_score) -> list:
+    low = min(math.ceil(low_risk_score * bins_per_point), len(counts))
+    medium = min(math.ceil(medium_risk_score * bins_per_point), low)
+    return [sum(counts[low:]), sum(counts[medium:low]), sum(counts[:medium])]
+
+
+def _deciles(counts: list, bins_per_point: int) -> list:
+    shares = [0.0] * PSI_BINS
+    n = sum(counts)
+    for i, count in enumerate(counts):
+        if count:
+            shares[min(i // (10 * bins_per_point), PSI_BINS - 1)] += count / n
+    return shares
+
+
+def psi(counts: list, reference: list, bins_per_point: int) -> float:
+    # population stability index of counts against reference, over deciles
+    total = 0.0
+    for actual, expected in zip(_deciles(counts, bins_per_point), _deciles(reference, bins_per_point)):
+        actual, expected = max(actual, PSI_FLOOR), max(expected, PSI_FLOOR)
+        total += (actual - expected) * math.log(actual / expected)
+    return total
+
+
+def drift(value: float) -> str:
+    if value >= PSI_MAJOR:
+        return "major"
+    if value >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+def _model_summary(counts: list, bins_per_point: int, version, reference: list = None) -> dict:
+    n = sum(counts)
+    if not n:
+        return {"count": 0}
+    bands = _band_counts(counts, bins_per_point, version.low_risk_score, version.medium_risk_score)
+    summary = {
+        "count": n,
+        "quantiles": _quantiles(counts, bins_per_point),
+        "band_rates": {name: count / n for name, count in zip(BANDS, bands)},
+    }
+    if reference is not None and sum(reference):
+        value = psi(counts, reference, bins_per_point)
+        summary["psi"] = round(value, 6)
+        summary["drift"] = drift(value)
+    return summary
+
+
+def _disagreement(pairs: list) -> dict:
+    compared = sum(pairs)
+    same = sum(pairs[i * len(BANDS) + i] for i in range(len(BANDS)))
+    return {
+        "compared": compared,
+        "rate": (compared - same) / compared if compared else None,
+        # new band -> legacy band -> count
+        "bands": {
+            new: {legacy: pairs[i * len(BANDS) + j] for j, legacy in enumerate(BANDS)}
+            for i, new in enumerate(BANDS)
+        },
+    }
+
+
+class ScoreMonitor:
+    """Streaming score distribution per served model version, in fixed
+    memory: each request adds one to a histogram bin (scores live on 0-100,
+    so a bin per point -- or per 1/MONITOR_LEGACY_BINS_PER_POINT for the
+    legacy model -- is an exact, mergeable quantile sketch) in the current
+    time slice and in the running total. Slices older than the ring are
+    overwritten, so memory never grows with traffic.
+    """
+
+    def __init__(self, bucket_seconds: float = MONITOR_BUCKET_SECONDS, buckets: int = MONITOR_BUCKETS,
+                 reference_path=MONITOR_REFERENCE_PATH, clock=time.time):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.reference_path = reference_path
+        self._clock = clock
+        self._streams = {}      # version name -> _Stream
+        self._references = {}   # (version fingerprint, kernel fingerprint) -> _Slice
+        self._lock = threading.Lock()
+        self._reference_lock = threading.Lock()
+
+    def _slices(self, name: str) -> tuple:
+        # (current slice, total) for a version; caller holds the lock
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = _Stream(self.buckets)
+        index = int(self._clock() // self.bucket_seconds)
+        current = stream.ring[index % self.buckets]
+        if current is None or current.start != index:
+            current = stream.ring[index % self.buckets] = _Slice(index)
+        return current, stream.total
+
+    def observe(self, version, result: dict):
+        # a /api/score result, or a /compare one (legacy_model may be None)
+        new = result.get("new_model", result)
+        legacy = result.get("legacy_model")
+        new_bin = int(new["score"])
+        if legacy is not None:
+            legacy_score = legacy["score"]
+            pair = (BANDS.index(new["risk_level"]) * len(BANDS)
+                    + BANDS.index(band(legacy_score, version.low_risk_score, version.medium_risk_score)))
+        with self._lock:
+            for counts in self._slices(version.name):
+                counts.new[new_bin] += 1
+                if legacy is not None:
+                    counts.legacy[legacy_bin(legacy_score)] += 1
+                    counts.pairs[pair] += 1
+
+    def observe_batch(self, version, scores):
+        # the new model's scores for a whole /batch request (numpy ints)
+        import numpy as np
+
+        counts = np.bincount(scores, minlength=NEW_BINS).tolist()
+        with self._lock:
+            for target in self._slices(version.name):
+                for i, count in enumerate(counts):
+                    if count:
+                        target.new[i] += count
+
+    def _window(self, name: str, seconds: float) -> _Slice:
+        # the sum of the slices within `seconds` of now; caller holds the lock
+        stream = self._streams.get(name)
+        merged = _Slice()
+        if stream is None:
+            return merged
+        newest = int(self._clock() // self.bucket_seconds)
+        oldest = newest - math.ceil(seconds / self.bucket_seconds)
+        for part in stream.ring:
+            if part is not None and oldest < part.start <= newest:
+                merged.add(part)
+        return merged
+
+    def reference(self, version):
+        """Both models' score histograms over the reference CSV's
+        applicants, as /compare would score them (None without the file).
+        Built on first use per version and legacy model."""
+        kernel = version.get_kernel()
+        key = (version.fingerprint, kernel.fingerprint)
+        if key not in self._references:
+            with self._reference_lock:
+                if key not in self._references:
+                    self._references[key] = self._build_reference(version, kernel)
+        return self._references[key]
+
+    def _build_reference(self, version, kernel):
+        if not self.reference_path.is_file():
+            return None
+        import numpy as np
+        from app.services.batch import adapt_to_legacy_features_batch, compute_features_batch
+
+        columns = reference_columns(self.reference_path)
+        scores = version.score_batch(compute_features_batch(columns))["score"]
+        legacy = kernel.score_many(adapt_to_legacy_features_batch(columns))
+
+        reference = _Slice()
+        reference.new = np.bincount(scores, minlength=NEW_BINS).tolist()
+        for score in legacy.tolist():
+            # python's round, like score_tenant
+            reference.legacy[legacy_bin(round(score, 2))] += 1
+        return reference
+
+    def report(self, version) -> dict:
+        reference = self.reference(version)
+        with self._lock:
+            stream = self._streams.get(version.name)
+            windows = {name: self._window(version.name, seconds) for name, seconds in MONITOR_WINDOWS.items()}
+            windows["total"] = _Slice().add(stream.total) if stream else _Slice()
+
+        def describe(part: _Slice) -> dict:
+            return {
+                "new_model": _model_summary(part.new, 1, version, reference.new if reference else None),
+                "legacy_model": _model_summary(part.legacy, MONITOR_LEGACY_BINS_PER_POINT, version,
+                                               reference.legacy if reference else None),
+                "disagreement": _disagreement(part.pairs),
+            }
+
+        return {
+            "model": version.name,
+            "bucket_seconds": self.bucket_seconds,
+            "reference": None if reference is None else {
+                "source": str(self.reference_path),
+                "new_model": _model_summary(reference.new, 1, version),
+                "legacy_model": _model_summary(reference.legacy, MONITOR_LEGACY_BINS_PER_POINT, version),
+            },
+            "windows": {name: describe(part) for name, part in windows.items()},
+        }
+
+    def reset(self):
+        with self._lock:
+            self._streams = {}
+
+
+def reference_columns(path) -> dict:
+    # tenant columns (app.services.batch) from a CSV with income and rent
+    # columns, read the way Model/audit.py reads them
+    import numpy as np
+    from app.services.columnar import read_frame
+    from app.services.history import IncomeHistories
+
+    frame = read_frame(path)
+
+    def first(*names):
+        name = next((n for n in names if n in frame.columns), None)
+        return frame[name].to_numpy(dtype=float) if name else np.zeros(len(frame))
+
+    rent = first("monthly_rent", "rent_monthly")
+    savings = first("liquid_savings")
+    if "liquid_savings" not in frame.columns and "savings_buffer_months" in frame.columns:
+        savings = first("savings_buffer_months") * rent
+    return {
+        "monthly_income": first("monthly_income", "monthly_income_gross"),
+        "monthly_rent": rent,
+        "liquid_savings": savings,
+        "monthly_debt": first("monthly_debt"),
+        "income_history": IncomeHistories(np.empty(0), np.zeros(len(frame) + 1, dtype=np.int64)),
+    }
+
+
+MONITOR = ScoreMonitor()
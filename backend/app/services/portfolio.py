@@ -0,0 +1,102 @@
+import numpy as np
+
+from app.config.constants import (
+    DEFAULT_LEASE_MONTHS, LOW_RISK_SCORE, MAX_MISSED_MONTHS_PER_YEAR, MEDIUM_RISK_SCORE,
+)
+from app.services.batch import adapt_to_legacy_features_batch, compute_features_batch, score_features_batch
+
+BANDS = ("low", "medium", "high")
+
+
+# calculate_impact over whole columns, before its rounding
+def impact_batch(scores, rents) -> dict:
+    missed_months = (100 - scores) / 100 * MAX_MISSED_MONTHS_PER_YEAR
+    return {
+        "expected_missed_months": missed_months,
+        "expected_annual_loss": missed_months * rents,
+    }
+
+
+def portfolio_scores(columns: dict) -> dict:
+    # both models' scores for every tenant, as /api/score/compare gives them
+    from app.legacy.input import get_kernel
+
+    legacy = get_kernel().score_many(adapt_to_legacy_features_batch(columns))
+    return {
+        "new_model": score_features_batch(compute_features_batch(columns))["score"].astype(float),
+        # python's round, like score_tenant, so each tenant's loss is the
+        # one /compare reports
+        "legacy_model": np.array([round(v, 2) for v in legacy.tolist()]),
+    }
+
+
+def _summary(scores, rents, percentiles, lease_months) -> dict:
+    impact = impact_batch(scores, rents)
+    loss = impact["expected_annual_loss"]
+    months = impact["expected_missed_months"]
+
+    # band index per tenant (same cutoffs as risk_levels), then one
+    # bincount per total instead of a mask per band
+    codes = np.select([scores >= LOW_RISK_SCORE, scores >= MEDIUM_RISK_SCORE], [0, 1], 2)
+    count = np.bincount(codes, minlength=len(BANDS))
+    band_loss = np.bincount(codes, weights=loss, minlength=len(BANDS))
+    band_months = np.bincount(codes, weights=months, minlength=len(BANDS))
+    band_score = np.bincount(codes, weights=scores, minlength=len(BANDS))
+
+    total_loss = float(loss.sum())
+    values = np.percentile(loss, percentiles) if len(loss) else [0.0] * len(percentiles)
+
+    return {
+        "expected_annual_loss": round(total_loss, 2),
+        "expected_lease_loss": round(total_loss * lease_months / 12, 2),
+        "expected_missed_months": round(float(months.sum()), 2),
+        "mean_score": round(float(scores.mean()), 2) if len(scores) else 0.0,
+        "loss_percentiles": {f"p{p:g}": round(float(v), 2) for p, v in zip(percentiles, values)},
+        "by_risk_level": {
+            band: {
+                "tenants": int(count[i]),
+                "expected_annual_loss": round(float(band_loss[i]), 2),
+                "expected_missed_months": round(float(band_months[i]), 2),
+                "mean_score": round(float(band_score[i] / count[i]), 2) if count[i] else None,
+            }
+            for i, band in enumerate(BANDS)
+        },
+    }
+
+
+def portfolio_impact(columns: dict, percentiles=(50, 90, 95, 99),
+                     lease_months: int = DEFAULT_LEASE_MONTHS, scores: dict = None) -> dict:
+    """Expected-loss totals, bands and percentiles for a whole portfolio.
+
+    columns is what app.services.batch.tenant_columns builds. Both models
+    are scored (or pass scores from portfolio_scores); legacy scores are
+    banded with the same cutoffs as the new model's.
+    """
+    if scores is None:
+        scores = portfolio_scores(columns)
+    rents = columns["monthly_rent"]
+    percentiles = list(percentiles)
+
+    summaries = {
+        name: _summary(model_scores, rents, percentiles, lease_months)
+        for name, model_scores in scores.items()
+    }
+
+    new_loss = impact_batch(scores["new_model"], rents)["expected_annual_loss"]
+    legacy_loss = impact_batch(scores["legacy_model"], rents)["expected_annual_loss"]
+    change = new_loss - legacy_loss
+
+    return {
+        "tenants": len(rents),
+        "lease_months": lease_months,
+        **summaries,
+        # new minus legacy; negative = the new model expects less loss
+        "difference": {
+            "expected_annual_loss": round(float(change.sum()), 2),
+            "expected_missed_months": round(
+                summaries["new_model"]["expected_missed_months"]
+                - summaries["legacy_model"]["expected_missed_months"], 2),
+            "tenants_lower_loss": int((change < 0).sum()),
+            "tenants_higher_loss": int((change > 0).sum()),
+        },
+    }
@@ -0,0 +1,21 @@
+from app.schemas.tenant import TenantInput
+
+
+# the affordability ratios both models start from, so /compare can work
+# them out once and hand them to compute_features and
+# adapt_to_legacy_features
+def base_ratios(tenant: TenantInput) -> dict:
+    income = tenant.monthly_income
+    rent = tenant.monthly_rent
+    savings = tenant.liquid_savings
+
+    income_to_rent = 0
+    savings_runway = 0  # not capped, the legacy adapter wants the raw value
+    if rent > 0:
+        income_to_rent = income / rent
+        savings_runway = savings / rent
+
+    return {
+        "income_to_rent": income_to_rent,
+        "savings_runway": savings_runway,
+    }
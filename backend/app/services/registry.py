@@ -0,0 +1,369 @@
+import json
+import math
+import queue
+import threading
+import time
+from pathlib import Path
+
+from app.config.constants import (
+    LOW_RISK_SCORE, MEDIUM_RISK_SCORE, MODEL_REGISTRY_PATH, SHADOW_CHUNK, SHADOW_QUEUE_SIZE, WEIGHTS,
+)
+from app.services.cache import scoring_fingerprint
+from app.services.features import FEATURE_NAMES, OPTIONAL_FEATURES
+from app.services.score import score_features
+
+# the version built from constants.py, always there
+CURRENT_VERSION = "current"
+
+
+class ModelVersion:
+    """One named scoring model: weights, risk cutoffs and optionally its own
+    legacy baseline artifact (else the app's, see app/legacy/input.py).
+    calibration is free-form provenance (Model/calibrate.py writes it), only
+    ever shown, never used for scoring."""
+
+    def __init__(self, name: str, weights: dict, low_risk_score: float = LOW_RISK_SCORE,
+                 medium_risk_score: float = MEDIUM_RISK_SCORE, legacy_artifact=None, calibration: dict = None):
+        if not weights or not all(isinstance(w, (int, float)) and math.isfinite(w) for w in weights.values()):
+            raise ValueError(f"model {name!r}: weights must be a non-empty map of finite numbers")
+        unknown = set(weights) - set(FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"model {name!r}: unknown features {sorted(unknown)}, use some of {list(FEATURE_NAMES)}")
+        # only the first weight is scored (see scored_features in batch.py),
+        # and a feature that can be None would leave a tenant with no score
+        lead = next(iter(weights))
+        if lead in OPTIONAL_FEATURES:
+            raise ValueError(f"model {name!r}: {lead!r} is not always there, it can't be the first weight")
+        # scores are 0-100; anything else would only fail once a request hits it
+        for field, cutoff in (("low_risk_score", low_risk_score), ("medium_risk_score", medium_risk_score)):
+            if isinstance(cutoff, bool) or not isinstance(cutoff, (int, float)) or not 0 <= cutoff <= 100:
+                raise ValueError(f"model {name!r}: {field} must be a number from 0 to 100, not {cutoff!r}")
+        if not medium_risk_score <= low_risk_score:
+            raise ValueError(f"model {name!r}: medium_risk_score is above low_risk_score")
+
+        self.name = name
+        self.weights = dict(weights)
+        self.low_risk_score = low_risk_score
+        self.medium_risk_score = medium_risk_score
+        self.legacy_artifact = Path(legacy_artifact) if legacy_artifact else None
+        self.calibration = calibration
+        # part of every cache key, so versions never share results
+        self.fingerprint = scoring_fingerprint(self.weights, low_risk_score, medium_risk_score)
+        self._kernel = None
+        self._kernel_lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: dict, base_dir: Path):
+        unknown = set(spec) - {"name", "weights", "low_risk_score", "medium_risk_score", "legacy_artifact", "calibration"}
+        if unknown:
+            raise ValueError(f"model {spec.get('name')!r}: unknown keys {sorted(unknown)}")
+
+        artifact = spec.get("legacy_artifact")
+        if artifact:
+            artifact = base_dir / artifact
+            if not artifact.is_file():
+                raise ValueError(f"model {spec['name']!r}: no legacy artifact at {artifact}")
+
+        return cls(
+            spec["name"],
+            spec["weights"],
+            spec.get("low_risk_score", LOW_RISK_SCORE),
+            spec.get("medium_risk_score", MEDIUM_RISK_SCORE),
+            artifact,
+            spec.get("calibration"),
+        )
+
+    def score(self, features: dict):
+        return score_features(features, self.weights, self.low_risk_score, self.medium_risk_score)
+
+    def score_batch(self, features: dict) -> dict:
+        from app.services.batch import score_features_batch
+
+        return score_features_batch(features, self.weights, self.low_risk_score, self.medium_risk_score)
+
+    def loaded_kernel(self):
+        # the legacy kernel if it is already in memory, else None
+        if self.legacy_artifact is None:
+            from app.legacy.input import loaded_kernel
+
+            return loaded_kernel()
+        return self._kernel
+
+    def get_kernel(self):
+        if self.legacy_artifact is None:
+            from app.legacy.input import get_kernel
+
+            return get_kernel()
+
+        if self._kernel is None:
+            with self._kernel_lock:
+                if self._kernel is None:
+                    from app.legacy.artifact import load_artifact
+                    from app.legacy.kernel import LegacyKernel
+
+                    artifact = load_artifact(self.legacy_artifact)
+                    if artifact is None:
+                        raise ValueError(f"model {self.name!r}: {self.legacy_artifact} is not a usable legacy artifact")
+                    self._kernel = LegacyKernel(artifact)
+        return self._kernel
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "fingerprint": self.fingerprint,
+            "weights": self.weights,
+            "low_risk_score": self.low_risk_score,
+            "medium_risk_score": self.medium_risk_score,
+            "legacy_artifact": str(self.legacy_artifact) if self.legacy_artifact else None,
+            "calibration": self.calibration,
+        }
+
+
+def current_version() -> ModelVersion:
+    return ModelVersion(CURRENT_VERSION, WEIGHTS, LOW_RISK_SCORE, MEDIUM_RISK_SCORE)
+
+
+class _Snapshot:
+    # everything one reload produces; swapped in whole, never edited
+    def __init__(self, versions: dict, default: str, shadow: tuple, source, loaded_at: float):
+        self.versions = versions
+        self.default = default
+        self.shadow = shadow
+        self.source = source
+        self.loaded_at = loaded_at
+
+
+def read_registry(path: Path) -> _Snapshot:
+    """Parse a registry file into a snapshot. Raises ValueError if it is bad.
+
+    {
+      "default": "current",             optional, which version serves
+      "shadow": ["candidate"],          optional, scored off the response path
+      "versions": [{"name": ..., "weights": {...}, "low_risk_score": 75,
+                    "medium_risk_score": 50, "legacy_artifact": "x.json"},
+                   "candidate.json"]    inline, or a file holding one version
+    }
+
+    Paths are relative to the registry file. "current" is always the
+    constants.py model and can't be redefined.
+    """
+    versions = {CURRENT_VERSION: current_version()}
+    if not path.is_file():
+        return _Snapshot(versions, CURRENT_VERSION, (), None, time.time())
+
+    try:
+        config = json.loads(path.read_text())
+        for spec in config.get("versions", []):
+            base_dir = path.parent
+            if isinstance(spec, str):
+                base_dir = (path.parent / spec).parent
+                spec = json.loads((path.parent / spec).read_text())
+            version = ModelVersion.from_spec(spec, base_dir)
+            if version.name in versions:
+                raise ValueError(f"model {version.name!r} is defined twice")
+            versions[version.name] = version
+    except (OSError, KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+        raise ValueError(f"{path}: {e!r}") from e
+
+    default = config.get("default", CURRENT_VERSION)
+    shadow = tuple(config.get("shadow", ()))
+    for name in (default, *shadow):
+        if name not in versions:
+            raise ValueError(f"{path}: unknown model version {name!r}")
+
+    return _Snapshot(versions, default, shadow, path, time.time())
+
+
+class ModelRegistry:
+    """Named scoring versions, loaded once and swapped atomically on reload.
+
+    Readers just take the current snapshot, so a request never sees half a
+    reload and never waits for one.
+    """
+
+    def __init__(self, path: Path = MODEL_REGISTRY_PATH):
+        self.path = Path(path)
+        self._reload_lock = threading.Lock()
+        self._snapshot = read_registry(self.path)
+
+    def get(self, name: str = None) -> ModelVersion:
+        # KeyError for a name that isn't registered
+        snapshot = self._snapshot
+        return snapshot.versions[name or snapshot.default]
+
+    def shadows(self, version: ModelVersion) -> list[ModelVersion]:
+        snapshot = self._snapshot
+        return [snapshot.versions[name] for name in snapshot.shadow if name != version.name]
+
+    def reload(self) -> dict:
+        # a bad file raises ValueError and the old versions keep serving
+        with self._reload_lock:
+            self._snapshot = read_registry(self.path)
+        SHADOW.reset()
+        return self.describe()
+
+    def describe(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "default": snapshot.default,
+            "shadow": list(snapshot.shadow),
+            "source": str(snapshot.source) if snapshot.source else None,
+            "loaded_at": snapshot.loaded_at,
+            "versions": [v.describe() for v in snapshot.versions.values()],
+        }
+
+
+class _Agreement:
+    # running totals for one (serving version, candidate) pair
+    def __init__(self):
+        self.compared = 0
+        self.same_band = 0
+        self.diff_sum = 0.0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+        self.bands = {}   # "low->medium" -> n
+
+    def add(self, scores, levels, shadow_scores, shadow_levels):
+        # numpy arrays, one entry per scored tenant
+        diff = shadow_scores - scores
+        same = levels == shadow_levels
+        self.compared += len(diff)
+        self.same_band += int(same.sum())
+        self.diff_sum += float(diff.sum())
+        self.abs_diff_sum += float(abs(diff).sum())
+        self.max_abs_diff = max(self.max_abs_diff, float(abs(diff).max(initial=0)))
+        for level, other in zip(levels[~same].tolist(), shadow_levels[~same].tolist()):
+            move = f"{level}->{other}"
+            self.bands[move] = self.bands.get(move, 0) + 1
+
+    def summary(self) -> dict:
+        n = self.compared or 1
+        return {
+            "compared": self.compared,
+            "agreement": round(self.same_band / n, 4),
+            "mean_score_diff": round(self.diff_sum / n, 4),
+            "mean_abs_score_diff": round(self.abs_diff_sum / n, 4),
+            "max_abs_score_diff": self.max_abs_diff,
+            "band_changes": dict(sorted(self.bands.items())),
+        }
+
+
+class ShadowScorer:
+    """Scores served requests again with the registry's shadow versions on a
+    background thread and keeps agreement statistics.
+
+    submit() only puts the request on a bounded queue; when the queue is
+    full the request is dropped (and counted) rather than waited on. The
+    thread takes whatever has queued up and scores it as one batch, so the
+    work competing with requests for the GIL stays small.
+    """
+
+    def __init__(self, registry_getter, maxsize: int = SHADOW_QUEUE_SIZE, chunk: int = SHADOW_CHUNK):
+        self._registry = registry_getter
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._chunk = chunk
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pairs = {}      # (version, candidate) -> _Agreement
+        self.dropped = 0
+        self.errors = 0
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+                self._thread.start()
+
+    def _put(self, item):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def submit(self, version: ModelVersion, tenant, result: dict):
+        # one tenant and what `version` gave it
+        candidates = self._registry().shadows(version)
+        if candidates:
+            self._put(("one", version, candidates, tenant, result))
+
+    def submit_batch(self, version: ModelVersion, features: dict, result: dict):
+        # batch features (app.services.batch) and score_features_batch's result
+        candidates = self._registry().shadows(version)
+        if candidates:
+            self._put(("batch", version, candidates, features, result))
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self._chunk:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._score(items)
+            except Exception:
+                with self._lock:
+                    self.errors += len(items)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _score(self, items):
+        import numpy as np
+        from app.services.batch import compute_features_batch, tenant_columns
+
+        # single tenants from the same version + candidates become one batch,
+        # batches go as they are
+        groups = {}
+        for kind, version, candidates, data, result in items:
+            singles, batches = groups.setdefault((version, tuple(candidates)), ([], []))
+            (singles if kind == "one" else batches).append((data, result))
+
+        outcomes = []
+        for (version, candidates), (singles, batches) in groups.items():
+            if singles:
+                tenants, results = zip(*singles)
+                features = compute_features_batch(tenant_columns(list(tenants)))
+                batches.append((features, {
+                    "score": np.array([r["score"] for r in results]),
+                    "risk_level": np.array([r["risk_level"] for r in results]),
+                }))
+            for features, result in batches:
+                for candidate in candidates:
+                    shadow = candidate.score_batch(features)
+                    outcomes.append((version.name, candidate.name, result, shadow))
+
+        with self._lock:
+            for name, candidate, result, shadow in outcomes:
+                pair = self._pairs.setdefault((name, candidate), _Agreement())
+                pair.add(result["score"], result["risk_level"], shadow["score"], shadow["risk_level"])
+
+    def wait(self):
+        # block until everything submitted so far has been scored
+        self._queue.join()
+
+    def reset(self):
+        with self._lock:
+            self._pairs = {}
+            self.dropped = 0
+            self.errors = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "pairs": [
+                    {"version": version, "candidate": candidate, **pair.summary()}
+                    for (version, candidate), pair in self._pairs.items()
+                ],
+            }
+
+
+REGISTRY = ModelRegistry()
+SHADOW = ShadowScorer(lambda: REGISTRY)
@@ -0,0 +1,51 @@
+import json
+import re
+
+from fastapi import Response
+
+from app.config.constants import FAST_RESPONSES
+
+try:
+    import orjson
+except ImportError:     # optional, the stdlib encoder gives the same bytes
+    orjson = None
+
+# orjson writes exponents as 1e16 / 1e-7 where json writes 1e+16 / 1e-07,
+# and NaN / inf as null where json refuses them. any of those -> redo the
+# encoding with json so the bytes (or the error) stay what they always were.
+# the odd false positive inside a string only costs a re-encode
+_EXPONENT = re.compile(rb"e-?[0-9]")
+
+
+def _stdlib_dumps(content) -> bytes:
+    # exactly what starlette's JSONResponse.render does
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        try:
+            body = orjson.dumps(content)
+        except TypeError:   # e.g. ints past 64 bits
+            return _stdlib_dumps(content)
+        if not (_EXPONENT.search(body) or b"null" in body):
+            return body
+    return _stdlib_dumps(content)
+
+
+def json_response(content) -> Response:
+    """Encode an already-trusted response body, skipping response_model
+    validation and jsonable_encoder; same bytes as FastAPI would send."""
+    return Response(content=dumps(content), media_type="application/json")
+
+
+def respond(result):
+    # the handlers build every field themselves, so with FAST_RESPONSES the
+    # response model is only documentation
+    return json_response(result) if FAST_RESPONSES else result
@@ -9,12 +9,14 @@ from app.config.constants import ( WEIGHTS, LOW_RISK_SCORE, MEDIUM_RISK_SCORE,
 #    "debt_to_income": -0.20,
 #}
 
-# this figures out the risk of the teneant
-def score_features(features: dict):
+# this figures out the risk of the teneant. weights / cutoffs default to
+# constants.py, a registry version passes its own (app/services/registry.py)
+def score_features(features: dict, weights: dict = WEIGHTS,
+                   low_risk_score: float = LOW_RISK_SCORE, medium_risk_score: float = MEDIUM_RISK_SCORE):
 
     score = 0.0
 
-    for feature_name, weight in WEIGHTS.items():
+    for feature_name, weight in weights.items():
         value = features.get(feature_name)
 
         if value is None: #=> cnat remeber if weight vals could be null cekc again
@@ -24,9 +26,9 @@ def score_features(features: dict):
         # normalize 0-100
         score = max(0, min(int(score * 100), 100))
 
-        if score >= LOW_RISK_SCORE:
+        if score >= low_risk_score:
             risk_level = "low"
-        elif score >= MEDIUM_RISK_SCORE:
+        elif score >= medium_risk_score:
             risk_level = "medium"
         else:
             risk_level = "high"
@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+
+from app.config.constants import LOW_RISK_SCORE, MEDIUM_RISK_SCORE, WEIGHTS
+from app.schemas.tenant import TenantInput
+from app.services.batch import adapt_to_legacy_features_batch, compute_features_batch, scored_features
+from app.services.history import IncomeHistories
+
+GRID_FIELDS = ("monthly_income", "monthly_rent", "liquid_savings", "monthly_debt")
+# the closed form is within a few ulps when it is right at all
+EDGE_MAX_STEPS = 64
+
+
+def grid_axes(ranges: dict) -> dict:
+    # {field: GridRange} -> {field: evenly spaced values}, in request order
+    return {name: np.linspace(r.start, r.stop, r.steps) for name, r in ranges.items()}
+
+
+def grid_columns(tenant: TenantInput, axes: dict) -> tuple[dict, tuple]:
+    """Batch columns for every point of the grid, row-major over axes.
+
+    axes is {field: values}; fields not in it keep the tenant's own value.
+    -> (columns, grid shape)
+    """
+    shape = tuple(len(values) for values in axes.values())
+    mesh = np.meshgrid(*axes.values(), indexing="ij")
+    n = int(np.prod(shape))
+
+    columns = {name: np.full(n, float(getattr(tenant, name))) for name in GRID_FIELDS}
+    for name, values in zip(axes, mesh):
+        columns[name] = values.ravel().astype(float)
+    columns["income_history"] = IncomeHistories.from_lists([tenant.income_history] * n)
+    return columns, shape
+
+
+def sensitivity_grid(tenant: TenantInput, axes: dict, version, include_legacy: bool = False) -> dict:
+    # version is the registry's ModelVersion: its weights, cutoffs and legacy kernel
+    columns, shape = grid_columns(tenant, axes)
+
+    result = version.score_batch(compute_features_batch(columns))
+    out = {
+        "score": result["score"].reshape(shape).tolist(),
+        "risk_level": result["risk_level"].reshape(shape).tolist(),
+    }
+
+    if include_legacy:
+        raw = version.get_kernel().score_many(adapt_to_legacy_features_batch(columns))
+        # python's round, as score_tenant does, so every point matches /compare
+        out["legacy_score"] = np.array([round(v, 2) for v in raw.tolist()]).reshape(shape).tolist()
+
+    return out
+
+
+def _scores_at_least(income: float, rent: float, weight: float, cutoff: float) -> bool:
+    # compute_features + score_features for the one feature that counts,
+    # written the same way so float rounding agrees with them exactly
+    income_to_rent = income / rent if rent > 0 else 0
+    score = 0.0 + weight * income_to_rent
+    return max(0, min(int(score * 100), 100)) >= cutoff
+
+
+def _step(x: float, toward: float):
+    # the next float toward `toward`, or None once there is nowhere to go
+    nxt = math.nextafter(x, toward)
+    return None if nxt == x or nxt == 0 or math.isinf(nxt) else nxt
+
+
+def _edge(guess: float, passes, toward_pass: float, away: float):
+    # the closed form can be an ulp or two off after rounding; settle on the
+    # last value that passes, next to the first that doesn't. None when that
+    # takes more than a few ulps (e.g. the guess under- or overflowed)
+    if not math.isfinite(guess) or guess == 0:
+        return None
+    x = guess
+    for _ in range(EDGE_MAX_STEPS):
+        if passes(x):
+            break
+        x = _step(x, toward_pass)
+        if x is None:
+            return None
+    else:
+        return None
+    for _ in range(EDGE_MAX_STEPS):
+        nxt = _step(x, away)
+        if nxt is None or not passes(nxt):
+            return x
+        x = nxt
+    return None
+
+
+def band_boundaries(tenant: TenantInput, weights: dict = WEIGHTS, low_risk_score: float = LOW_RISK_SCORE,
+                    medium_risk_score: float = MEDIUM_RISK_SCORE):
+    """Where the risk band changes along rent and income, in closed form.
+
+    The score is clamp(int(w * income / rent * 100), 0, 100) with
+    w = weights["income_to_rent"] (see scored_features), so a band with
+    cutoff c holds exactly while income / rent >= c / (100 w): a largest
+    rent and a smallest income. Savings and debt don't move the score.
+    None if the version scores anything but that one ratio.
+    """
+    if scored_features(weights) != ["income_to_rent"] or weights["income_to_rent"] <= 0:
+        return None
+    weight = weights["income_to_rent"]
+
+    income = tenant.monthly_income
+    rent = tenant.monthly_rent
+    if not (math.isfinite(income) and math.isfinite(rent)):
+        return None
+
+    rent_edges, income_edges = {}, {}
+    for band, cutoff in (("low", low_risk_score), ("medium", medium_risk_score)):
+        ratio = cutoff / (100 * weight)
+
+        # largest rent still in the band; with no income there is none
+        rent_edges[band] = None
+        guess = income / ratio
+        if income > 0 and guess > 0:
+            passes = lambda r: r > 0 and _scores_at_least(income, r, weight, cutoff)
+            rent_edges[band] = _edge(guess, passes, 0.0, math.inf)
+
+        # smallest income that reaches the band; with no rent the score is 0
+        income_edges[band] = None
+        if rent > 0:
+            passes = lambda i: _scores_at_least(i, rent, weight, cutoff)
+            income_edges[band] = _edge(ratio * rent, passes, math.inf, -math.inf)
+
+    return {
+        "monthly_rent": {**rent_edges, "direction": "max"},
+        "monthly_income": {**income_edges, "direction": "min"},
+    }
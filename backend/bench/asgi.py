@@ -0,0 +1,49 @@
+"""Minimal in-process ASGI client, so benchmarks need nothing beyond the app."""
+import json
+
+
+async def call(app, method: str, path: str, body=None, headers=None):
+    # one HTTP request straight through the ASGI interface -> (status, headers, bytes)
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+        headers = {"content-type": "application/json", **(headers or {})}
+    body = body or b""
+    path, _, query = path.partition("?")
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+                   + [(b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    sent = False
+    status = None
+    response_headers = []
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, {k.decode(): v.decode() for k, v in response_headers}, b"".join(chunks)
@@ -0,0 +1,44 @@
+"""Throughput of POST /api/score/batch vs one /api/score call per tenant.
+
+Run from backend/:  python -m bench.batch [--n 5000]
+
+Both sides go through the FastAPI app in-process (routing, parsing,
+validation, JSON), just without a socket in between.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from bench.asgi import call
+from bench.inputs import sample_payloads
+from main import app
+
+
+async def run(payloads):
+    start = time.perf_counter()
+    single = [(await call(app, "POST", "/api/score", p))[2] for p in payloads]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    status, _, body = await call(app, "POST", "/api/score/batch", payloads)
+    batch_s = time.perf_counter() - start
+
+    assert status == 200
+    assert [json.loads(b) for b in single] == json.loads(body), "batch results differ from /api/score"
+    return single_s, batch_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=5000)
+    args = parser.parse_args()
+
+    single_s, batch_s = asyncio.run(run(sample_payloads(args.n)))
+
+    print(f"per-request {args.n / single_s:12,.0f} tenants/s")
+    print(f"batch       {args.n / batch_s:12,.0f} tenants/s  ({single_s / batch_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure API cold start: import time plus the first /api/score/compare call.
+
+Run from backend/:  python -m bench.cold_start [--runs 5]
+
+Every measurement runs in a fresh interpreter so nothing is warm.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+SNIPPETS = {
+    # what every cold start used to pay: module-level train_model()
+    "train_at_import": """
+import time
+t = time.perf_counter()
+from app.legacy.input import train_model
+train_model()
+print(time.perf_counter() - t)
+""",
+    # the app itself is ready to serve /api/ and /api/score
+    "import_main": """
+import time
+t = time.perf_counter()
+import main
+print(time.perf_counter() - t)
+""",
+    # artifact exists and matches the csv
+    "fresh_artifact": """
+import time
+t = time.perf_counter()
+import asyncio
+import main
+from app.routes.score import compare_score
+from app.schemas.tenant import TenantInput
+asyncio.run(compare_score(TenantInput(monthly_income=5200, monthly_rent=1800, liquid_savings=6000, monthly_debt=400)))
+print(time.perf_counter() - t)
+""",
+    # artifact is stale -> retrain on first compare call
+    "stale_artifact": """
+import time, tempfile, os
+t = time.perf_counter()
+from app.legacy.artifact import load_or_build
+load_or_build(artifact_path=os.path.join(tempfile.mkdtemp(), "legacy_model.json"))
+print(time.perf_counter() - t)
+""",
+}
+
+
+def run(snippet: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {}
+    for name, snippet in SNIPPETS.items():
+        times = [run(snippet) for _ in range(args.runs)]
+        report[name] = {"median_s": statistics.median(times), "min_s": min(times)}
+        print(f"{name:16s} median {report[name]['median_s'] * 1000:8.1f} ms")
+
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
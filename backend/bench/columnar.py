@@ -0,0 +1,109 @@
+"""Load time and memory: pd.read_csv vs the memory-mapped column cache.
+
+Run from backend/:  python -m bench.columnar [--rows 5000 10000000] [--data-dir DIR]
+
+Datasets come from Model/Data_genrators.py and are kept in --data-dir, so
+only the first run pays for generating them. Every measurement runs in a
+fresh interpreter; "scan" touches every column once (sum of each numeric
+column, counts per race) so lazy loading can't hide any work. RSS is the
+peak resident set above the interpreter with pandas imported; anon is the
+part of the final resident set that is not file-backed, i.e. what the page
+cache can't simply drop again.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+GENERATOR = BACKEND_DIR.parent / "Model" / "Data_genrators.py"
+
+PRELUDE = """
+import json, resource, sys, time
+import numpy as np
+import pandas as pd
+from app.services.columnar import load_columns
+path = sys.argv[1]
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+def anon_mb():
+    # resident memory not backed by a file (memory-mapped columns are)
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(l.split()[1]) for l in f if l.startswith("RssAnon:")) / 1024
+    except (OSError, StopIteration):
+        return float("nan")
+def done(load, scan):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    print(json.dumps({"load_s": load, "scan_s": scan, "rss_mb": rss / 1024, "anon_mb": anon_mb()}))
+"""
+
+SNIPPETS = {
+    "read_csv": """
+t = time.perf_counter()
+df = pd.read_csv(path)
+load = time.perf_counter() - t
+t = time.perf_counter()
+total = [df[c].sum() for c in df.columns if c != "race"]
+counts = df["race"].value_counts()
+done(load, time.perf_counter() - t)
+""",
+    "cache_build": """
+t = time.perf_counter()
+table = load_columns(path, rebuild=True)
+done(time.perf_counter() - t, 0.0)
+""",
+    "cache_load": """
+t = time.perf_counter()
+table = load_columns(path)
+load = time.perf_counter() - t
+t = time.perf_counter()
+total = [table.raw(c).sum() for c in table.names if c != "race"]
+counts = np.bincount(table.raw("race"))
+done(load, time.perf_counter() - t)
+""",
+}
+
+
+def dataset(rows: int, data_dir: Path) -> Path:
+    path = data_dir / f"bench_{rows}.csv"
+    if not path.exists():
+        print(f"generating {rows:,} rows -> {path}", file=sys.stderr)
+        subprocess.run(
+            [sys.executable, str(GENERATOR), "--rows", str(rows), "--out", str(path.with_suffix("")),
+             "--test-size", "0", "--workers", str(os.cpu_count() or 1)],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+    return path
+
+
+def measure(name: str, path: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PRELUDE + SNIPPETS[name], str(path)],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 10_000_000])
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "fairtenant-bench"))
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"{'rows':>12s} {'method':12s} {'load s':>9s} {'scan s':>9s} {'RSS MB':>9s} {'anon MB':>9s}")
+    for rows in args.rows:
+        path = dataset(rows, data_dir)
+        # cache_build first so cache_load finds a fresh cache
+        for name in ("read_csv", "cache_build", "cache_load"):
+            r = measure(name, path)
+            print(f"{rows:12,d} {name:12s} {r['load_s']:9.4f} {r['scan_s']:9.4f} {r['rss_mb']:9.1f} {r['anon_mb']:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
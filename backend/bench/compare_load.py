@@ -0,0 +1,54 @@
+"""Closed-loop load test for POST /api/score/compare.
+
+Run from backend/:  python -m bench.compare_load [--requests 2000] [--concurrency 32]
+
+Every request is a distinct applicant, so the result cache never hits and
+each one pays for the full new + legacy pipeline.
+"""
+import argparse
+import asyncio
+import time
+
+from bench.asgi import call
+from bench.inputs import sample_payloads
+from bench.timing import percentiles
+from main import app
+
+
+async def run(payloads, concurrency):
+    queue = list(reversed(payloads))
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            payload = queue.pop()
+            start = time.perf_counter()
+            status, _, _ = await call(app, "POST", "/api/score/compare", payload)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    elapsed, latencies, errors = asyncio.run(run(sample_payloads(args.requests), args.concurrency))
+    ms = {k: v * 1000 for k, v in percentiles(latencies).items()}
+
+    print(
+        f"{args.requests / elapsed:,.0f} req/s  "
+        + "  ".join(f"{k} {v:.2f} ms" for k, v in ms.items())
+        + f"  errors {errors}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""What the decision log costs, and what it keeps up with.
+
+Run from backend/:  python -m bench.decision_log [--n 2000]
+
+request overhead   /api/score and /api/score/compare in-process with the log
+                   off and on (rounds interleaved, result cache off): median
+                   process CPU per request over the rounds, which includes
+                   the writer thread's work, and latency percentiles over
+                   all of them
+batch              /api/score/batch with the log off and on: process CPU per
+                   tenant, and every tenant's row read back
+writer             decisions recorded straight into a DecisionLog: what
+                   record() costs the request, process CPU per decision
+                   (record() + the writer), rows committed per second and
+                   rows per commit, for each synchronous setting
+overflow           a burst into a 256-slot queue under each policy: what was
+                   written, what was dropped, longest record() call
+segments           a log rotated every --segment-kb, then time range and
+                   risk level queries across the segments
+
+Everything is written to a temporary directory that is removed afterwards.
+"""
+import argparse
+import asyncio
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.legacy.input import get_kernel
+from app.schemas.tenant import TenantInput
+from app.services.cache import RESULT_CACHE
+from app.services.decision_log import DECISIONS, OVERFLOW_POLICIES, DecisionLog
+from app.routes.score import _score
+from app.services.registry import REGISTRY
+from bench.asgi import call
+from bench.inputs import sample_payloads
+from bench.timing import percentiles
+from main import app
+
+
+async def requests(path, bodies) -> list[float]:
+    latencies = []
+    for body in bodies:
+        started = time.perf_counter()
+        status, _, _ = await call(app, "POST", path, body)
+        latencies.append(time.perf_counter() - started)
+        assert status == 200, status
+    return latencies
+
+
+def request_overhead(payloads, repeat):
+    print("\nrequest overhead, per request (CPU includes the writer)")
+    print(f"{'route':22s} {'log':>4s} {'CPU':>9s} {'p50':>9s} {'p99':>9s}")
+    for path in ("/api/score", "/api/score/compare"):
+        cpu = {False: [], True: []}
+        latencies = {False: [], True: []}
+        for _ in range(repeat):
+            for enabled in (False, True):
+                DECISIONS.enabled = enabled
+                started = time.process_time()
+                latencies[enabled] += asyncio.run(requests(path, payloads))
+                DECISIONS.flush()     # the writer's backlog counts against "on"
+                cpu[enabled].append((time.process_time() - started) / len(payloads))
+        for enabled in (False, True):
+            points = percentiles(latencies[enabled])
+            print(f"{path:22s} {'on' if enabled else 'off':>4s} {statistics.median(cpu[enabled]) * 1e6:7.1f}us "
+                  f"{points['p50'] * 1e6:7.1f}us {points['p99'] * 1e6:7.1f}us")
+        extra = statistics.median(cpu[True]) - statistics.median(cpu[False])
+        print(f"{'':22s} {'':4s} {extra * 1e6:+7.1f}us per request")
+
+
+def batch(payloads, repeat):
+    print(f"\n/api/score/batch, {len(payloads)} tenants per request (CPU includes the writer)")
+    cpu = {False: [], True: []}
+    for _ in range(repeat):
+        for enabled in (False, True):
+            DECISIONS.enabled = enabled
+            started = time.process_time()
+            asyncio.run(requests("/api/score/batch", [payloads]))
+            DECISIONS.flush()
+            cpu[enabled].append((time.process_time() - started) / len(payloads))
+    for enabled in (False, True):
+        print(f"  log {'on' if enabled else 'off':3s} {statistics.median(cpu[enabled]) * 1e6:7.1f}us per tenant")
+
+    rows = DECISIONS.query(route="/api/score/batch", limit=len(payloads) * (repeat + 1))
+    assert len(rows) == len(payloads) * repeat, len(rows)
+    assert [row["input"]["monthly_income"] for row in rows[:len(payloads)]] == \
+        [payload["monthly_income"] for payload in payloads]
+    print(f"  {len(rows)} rows read back")
+
+
+def scored(payloads):
+    # (tenant, result, features) the way /api/score produces them
+    version = REGISTRY.get(None)
+    tenants = [TenantInput(**payload) for payload in payloads]
+    return [(tenant, *_score(tenant, version)) for tenant in tenants]
+
+
+def fill(log, items) -> float:
+    # -> slowest record() call, seconds
+    slowest = 0.0
+    for tenant, result, features in items:
+        started = time.perf_counter()
+        log.record("/api/score", "current", tenant, result, features)
+        slowest = max(slowest, time.perf_counter() - started)
+    return slowest
+
+
+def writer(items, directory):
+    print("\nwriter")
+    print(f"{'synchronous':12s} {'record()':>10s} {'CPU':>10s} {'rows/s':>9s} {'rows/commit':>12s}")
+    for synchronous in ("FULL", "NORMAL"):
+        log = DecisionLog(directory / synchronous, maxsize=len(items), synchronous=synchronous)
+        fill(log, items[:1])     # start the thread
+        log.flush()
+        started, cpu = time.perf_counter(), time.process_time()
+        fill(log, items)
+        recorded = time.perf_counter() - started
+        log.flush()
+        elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu
+        stats = log.stats()
+        log.close()
+        print(f"{synchronous:12s} {recorded / len(items) * 1e6:8.2f}us {cpu / len(items) * 1e6:8.1f}us "
+              f"{len(items) / elapsed:9.0f} "
+              f"{stats['mean_batch']:12.1f}")
+
+
+def overflow(items, directory):
+    print("\noverflow, burst into a 256-slot queue")
+    print(f"{'policy':12s} {'written':>8s} {'dropped':>8s} {'slowest record()':>17s}")
+    for policy in OVERFLOW_POLICIES:
+        log = DecisionLog(directory / policy, maxsize=256, overflow=policy)
+        slowest = fill(log, items)
+        log.flush()
+        stats = log.stats()
+        log.close()
+        assert stats["written"] + stats["dropped"] == len(items)
+        print(f"{policy:12s} {stats['written']:8d} {stats['dropped']:8d} {slowest * 1e3:14.2f}ms")
+
+
+def segments(items, directory, segment_kb):
+    log = DecisionLog(directory / "segments", segment_bytes=segment_kb * 1024, batch=256)
+    started = time.time()
+    for i in range(0, len(items), 256):
+        fill(log, items[i:i + 256])
+        log.flush()
+    log.close()
+    ended = time.time()
+    print(f"\nsegments: {log.stats()['written']} rows in {len(log.segments())} segments of ~{segment_kb} KB")
+
+    middle = started + (ended - started) / 2
+    cases = {
+        "everything": {"limit": len(items)},
+        "second half": {"start": middle, "limit": len(items)},
+        "medium risk": {"risk_level": "medium", "limit": len(items)},
+        "low, first half": {"risk_level": "low", "end": middle, "limit": len(items)},
+        "first 100": {"limit": 100},
+    }
+    everything = log.query(limit=len(items))
+    assert len(everything) == len(items)
+    assert all(a["ts"] <= b["ts"] for a, b in zip(everything, everything[1:]))
+    for name, query in cases.items():
+        started = time.perf_counter()
+        rows = log.query(**query)
+        elapsed = time.perf_counter() - started
+        expected = [
+            row for row in everything
+            if query.get("start", 0) <= row["ts"] < query.get("end", float("inf"))
+            and query.get("risk_level", row["risk_level"]) == row["risk_level"]
+        ][:query["limit"]]
+        assert rows == expected, name
+        print(f"  {name:16s} {len(rows):6d} rows {elapsed * 1e3:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=2000, help="requests per round")
+    parser.add_argument("--repeat", type=int, default=7, help="rounds per setting")
+    parser.add_argument("--batch", type=int, default=5000, help="tenants per /api/score/batch request")
+    parser.add_argument("--writes", type=int, default=20_000, help="decisions for the writer sections")
+    parser.add_argument("--segment-kb", type=int, default=1024)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="decisions-"))
+    DECISIONS.directory = directory / "app"
+    RESULT_CACHE.maxsize = 0
+    get_kernel()
+    try:
+        request_overhead(sample_payloads(args.n, seed=5), args.repeat)
+        batch(sample_payloads(args.batch, seed=7), args.repeat)
+        items = scored(sample_payloads(args.writes, seed=6))
+        writer(items, directory)
+        overflow(items, directory)
+        segments(items, directory, args.segment_kb)
+    finally:
+        DECISIONS.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
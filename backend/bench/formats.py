@@ -0,0 +1,163 @@
+"""POST /api/score/batch in each wire format, end to end.
+
+Run from backend/:  python -m bench.formats [--n 20000]
+
+For one batch of --n tenants (each with an income history) and each
+request / response format pair: what encoding the request costs the
+caller, what the server spends (routing, decoding, scoring, encoding),
+what decoding the response costs the caller, and the bytes each way.
+Everything runs in-process through the ASGI app, best of --repeat.
+Every format is run: without pyarrow or msgpack installed the run fails
+rather than leave rows out.
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+
+import numpy as np
+
+from app.services.cache import RESULT_CACHE
+from app.services.formats import ARROW, JSON, MSGPACK, NPZ, available
+from bench.asgi import call
+from bench.inputs import sample_payloads
+from main import app
+
+NUMBERS = ("monthly_income", "monthly_rent", "liquid_savings", "monthly_debt")
+
+
+def with_histories(payloads, seed=0):
+    rng = np.random.default_rng(seed)
+    for payload in payloads:
+        payload["income_history"] = np.round(rng.normal(payload["monthly_income"], 300, 12), 2).tolist()
+    return payloads
+
+
+# caller side: the pool as each format, and back
+
+def encode_json(payloads):
+    return json.dumps(payloads).encode()
+
+
+def encode_npz(columns):
+    buffer = io.BytesIO()
+    np.savez(buffer, **columns)
+    return buffer.getvalue()
+
+
+def encode_arrow(columns):
+    import pyarrow as pa
+
+    histories = pa.ListArray.from_arrays(pa.array(columns["income_history_offsets"].astype(np.int32)),
+                                         pa.array(columns["income_history_values"]))
+    table = pa.table({**{name: columns[name] for name in NUMBERS}, "income_history": histories})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode(body: bytes, media: str):
+    if media == JSON:
+        return json.loads(body)
+    if media == NPZ:
+        archive = np.load(io.BytesIO(body))
+        return {name: archive[name] for name in archive.files}
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(body).read_all()
+
+
+def scores_of(decoded, media: str) -> list:
+    if media == JSON:
+        return [row["score"] for row in decoded]
+    if media == NPZ:
+        return decoded["score"].tolist()
+    return decoded.column("score").to_pylist()
+
+
+def caller_columns(payloads) -> dict:
+    # what a pipeline that already holds arrays would have
+    lengths = [len(p["income_history"]) for p in payloads]
+    offsets = np.zeros(len(payloads) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return {
+        **{name: np.array([p[name] for p in payloads], dtype=float) for name in NUMBERS},
+        "income_history_values": np.array([v for p in payloads for v in p["income_history"]], dtype=float),
+        "income_history_offsets": offsets,
+    }
+
+
+def timed(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    missing = [media for media in (ARROW, MSGPACK) if not available(media)]
+    if missing:
+        raise SystemExit(f"{', '.join(missing)} not available, install backend/requirements.txt")
+
+    payloads = with_histories(sample_payloads(args.n, seed=3))
+    columns = caller_columns(payloads)
+    encoders = {JSON: lambda: encode_json(payloads), NPZ: lambda: encode_npz(columns),
+                ARROW: lambda: encode_arrow(columns)}
+    responses = [JSON, NPZ, ARROW]
+
+    print(f"{args.n} tenants per batch, best of {args.repeat}")
+    print(f"{'request':38s} {'response':38s} {'encode':>8s} {'server':>8s} {'decode':>8s} "
+          f"{'total':>8s} {'in KB':>7s} {'out KB':>7s}")
+    reference = None
+    for request_format, encoder in encoders.items():
+        encode_s, body = timed(encoder, args.repeat)
+        for response_format in responses:
+            headers = {"content-type": request_format, "accept": response_format}
+
+            def server():
+                status, response_headers, content = asyncio.run(call(app, "POST", "/api/score/batch", body, headers))
+                assert status == 200, content[:200]
+                assert response_headers["content-type"] == response_format
+                return content
+
+            server_s, content = timed(server, args.repeat)
+            decode_s, decoded = timed(lambda: decode(content, response_format), args.repeat)
+
+            # every pair scores the same
+            scores = scores_of(decoded, response_format)
+            reference = reference or scores
+            assert scores == reference, (request_format, response_format)
+
+            total = encode_s + server_s + decode_s
+            print(f"{request_format:38s} {response_format:38s} {encode_s * 1e3:6.1f}ms {server_s * 1e3:6.1f}ms "
+                  f"{decode_s * 1e3:6.1f}ms {total * 1e3:6.1f}ms {len(body) / 1024:7.0f} {len(content) / 1024:7.0f}")
+
+    import msgpack
+
+    async def singles(bodies, headers):
+        for body in bodies:
+            status, _, _ = await call(app, "POST", "/api/score", body, headers)
+            assert status == 200
+
+    RESULT_CACHE.maxsize = 0    # every request gets scored
+    records = payloads[:200]
+    print()
+    for media, encode in ((JSON, lambda r: json.dumps(r).encode()), (MSGPACK, msgpack.packb)):
+        bodies = [encode(record) for record in records]
+        server_s, _ = timed(lambda: asyncio.run(singles(bodies, {"content-type": media, "accept": media})),
+                            args.repeat)
+        print(f"/api/score {media:20s} {server_s / len(bodies) * 1e6:7.1f}us per request, "
+              f"{sum(map(len, bodies)) / len(bodies):.0f} bytes in")
+
+
+if __name__ == "__main__":
+    main()
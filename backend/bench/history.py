@@ -0,0 +1,70 @@
+"""IncomeHistories vs the per-tenant statistics path in compute_features.
+
+Run from backend/:  python -m bench.history [--tenants 20000] [--months 60]
+
+Checks that volatility and trend match compute_features before timing.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.schemas.tenant import TenantInput
+from app.services.features import compute_features
+from app.services.history import IncomeHistories
+
+
+def sample_histories(n, months, seed=0):
+    rng = random.Random(seed)
+    histories = []
+    for _ in range(n):
+        length = rng.choice([0, 2, rng.randint(3, months), months])
+        base = rng.uniform(1000, 12000)
+        histories.append([max(0.0, rng.gauss(base, base * 0.2)) for _ in range(length)])
+    return histories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tenants", type=int, default=20000)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--window", type=int, default=12)
+    args = parser.parse_args()
+
+    histories = sample_histories(args.tenants, args.months)
+    tenants = [
+        TenantInput(monthly_income=5000, monthly_rent=1500, liquid_savings=0, monthly_debt=0, income_history=h)
+        for h in histories
+    ]
+
+    start = time.perf_counter()
+    expected = [compute_features(t) for t in tenants]
+    per_tenant_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = IncomeHistories.from_lists(histories)
+    stats = engine.stats()
+    engine_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.rolling(args.window)
+    rolling_s = time.perf_counter() - start
+
+    worst = 0.0
+    for i, features in enumerate(expected):
+        for ours, theirs in ((stats["volatility"][i], features["income_volatility"]),
+                             (stats["trend"][i], features["income_trend"])):
+            if theirs is None:
+                assert np.isnan(ours), f"tenant {i}: expected None, got {ours}"
+            else:
+                worst = max(worst, abs(ours - theirs))
+    print(f"stats match compute_features, max abs diff {worst:.2e}")
+
+    print(f"compute_features (statistics) {per_tenant_s:8.3f}s")
+    print(f"IncomeHistories.stats         {engine_s:8.3f}s  ({per_tenant_s / engine_s:,.0f}x)")
+    print(f"IncomeHistories.rolling({args.window})   {rolling_s:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Realistic generated applicants shared by the benchmarks."""
+import random
+
+
+def sample_payloads(n, seed=0, history_months=(0, 24)):
+    # TenantInput-shaped dicts; income_history length drawn from history_months
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        income = rng.lognormvariate(8.4, 0.5)   # median ~4.4k / month
+        payloads.append({
+            "monthly_income": round(income, 2),
+            "monthly_rent": round(income * rng.uniform(0.2, 0.6), 2),
+            "liquid_savings": round(rng.expovariate(1 / 8000), 2),
+            "monthly_debt": round(income * rng.uniform(0, 0.4), 2),
+            "income_history": [
+                round(max(0.0, rng.gauss(income, income * 0.15)), 2)
+                for _ in range(rng.randint(*history_months))
+            ],
+        })
+    return payloads
@@ -0,0 +1,84 @@
+"""Parity check and microbenchmark: folded legacy kernel vs the pandas/sklearn path.
+
+Run from backend/:  python -m bench.legacy_kernel [--n 2000]
+
+Exits non-zero if the kernel disagrees with preprocess_data + predict_tenant.
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+
+import numpy as np
+
+from app.legacy.input import FEATURES, get_kernel, get_model, predict_tenant, preprocess_data
+from app.schemas.tenant import TenantInput
+from app.services.legacy_score import adapt_to_legacy_features
+
+
+def sample_legacy_features(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        tenant = TenantInput(
+            monthly_income=rng.uniform(0, 15000),
+            monthly_rent=rng.choice([0.0, rng.uniform(300, 5000)]),
+            liquid_savings=rng.uniform(0, 60000),
+            monthly_debt=rng.uniform(0, 5000),
+        )
+        rows.append(adapt_to_legacy_features(tenant))
+    return rows
+
+
+def sklearn_score(data):
+    model, scaler, min_score, max_score = get_model()
+    df = preprocess_data(data)[FEATURES]
+    with contextlib.redirect_stdout(io.StringIO()):
+        return predict_tenant(model, scaler, df, min_score, max_score)
+
+
+def per_call(fn, rows):
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return (time.perf_counter() - start) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=2000)
+    args = parser.parse_args()
+
+    kernel = get_kernel()
+    rows = sample_legacy_features(args.n)
+    expected = [sklearn_score(row) for row in rows]
+
+    # parity, including the rounding score_tenant applies
+    for row, want in zip(rows, expected):
+        got = kernel.score(row)
+        if round(want, 2) != round(got, 2):
+            print(f"rounded mismatch: {row} sklearn={want!r} kernel={got!r}")
+            sys.exit(1)
+
+    block = np.array([[row[name] for name in FEATURES] for row in rows])
+    worst = max(
+        max(abs(want - kernel.score(row)) for row, want in zip(rows, expected)),
+        float(np.max(np.abs(kernel.score_many(block) - expected))),
+    )
+    print(f"parity ok over {len(rows)} rows, max abs diff {worst:.2e}")
+
+    old = per_call(sklearn_score, rows[:500])
+    new = per_call(kernel.score, rows)
+    start = time.perf_counter()
+    kernel.score_many(block)
+    many = (time.perf_counter() - start) / len(rows)
+
+    print(f"pandas/sklearn    {old * 1e6:10.2f} us/call")
+    print(f"kernel.score      {new * 1e6:10.2f} us/call  ({old / new:,.0f}x)")
+    print(f"kernel.score_many {many * 1e6:10.3f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Legacy scoring throughput: the in-thread executor vs the process pool.
+
+Run from backend/:  python -m bench.legacy_pool [--requests 4000] [--concurrency 64] [--model kernel|sklearn]
+
+`concurrency` asyncio clients each score one tenant at a time, the way
+/api/score/compare hands legacy scoring off:
+
+  thread   a ThreadPoolExecutor with k threads, one tenant per call
+           (the default LEGACY_EXECUTOR path)
+  process  LegacyPool with k worker processes, micro-batched
+
+for k = 1, 2, 4, ... up to the core count, then both backends end to end
+through /api/score/compare with k = the core count.
+
+--model kernel (default) is the folded kernel /compare really runs, a few
+microseconds per tenant, so IPC dominates. --model sklearn scores with the
+old preprocess_data + predict_tenant path, which holds the GIL for every
+tenant; that is where threads stop scaling and processes don't.
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app.routes.score as score_routes
+import app.services.legacy_pool as legacy_pool
+from app.legacy.input import FEATURES, get_artifact, get_kernel
+from app.services.cache import RESULT_CACHE
+from app.services.legacy_pool import LegacyPool, kernel_scores
+from app.services.legacy_score import adapt_to_legacy_features
+from app.schemas.tenant import TenantInput
+from bench.asgi import call
+from bench.inputs import sample_payloads
+from bench.timing import percentiles
+from main import app
+
+
+def sklearn_scores(rows: list) -> list[float]:
+    # the pre-kernel path; credit_score / monthly_income are dropped before
+    # predicting, any value does
+    from bench.legacy_kernel import sklearn_score
+
+    return [
+        round(sklearn_score({**dict(zip(FEATURES, row)), "credit_score": 650, "monthly_income": 0.0}), 2)
+        for row in rows
+    ]
+
+
+SCORERS = {"kernel": kernel_scores, "sklearn": sklearn_scores}
+
+
+def in_thread(scorer):
+    # kernel_scores expects the worker's kernel; in-thread it is the app's
+    if scorer is kernel_scores:
+        legacy_pool._KERNEL = get_kernel()
+    return scorer
+
+
+async def closed_loop(score_one, items, concurrency):
+    queue = list(reversed(items))
+    latencies = []
+
+    async def client():
+        while queue:
+            item = queue.pop()
+            start = time.perf_counter()
+            await score_one(item)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+def thread_backend(scorer, k):
+    threads = ThreadPoolExecutor(max_workers=k)
+
+    async def score_one(row):
+        return (await asyncio.get_running_loop().run_in_executor(threads, scorer, [row]))[0]
+
+    return score_one, threads.shutdown
+
+
+def process_backend(scorer, k):
+    pool = LegacyPool(get_artifact(), workers=k, scorer=scorer)
+    return pool.score, pool.close
+
+
+def report(label, k, elapsed, latencies, n):
+    ms = {name: value * 1000 for name, value in percentiles(latencies).items()}
+    print(f"{label:10s} {k:3d}  {n / elapsed:12,.0f}/s  " + "  ".join(f"{name} {v:7.2f} ms" for name, v in ms.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--model", choices=SCORERS, default="kernel")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    sizes = sorted({1, cores, *(2 ** i for i in range(1, 8) if 2 ** i < cores)})
+    scorer = SCORERS[args.model]
+    payloads = sample_payloads(args.requests, seed=7)
+    rows = []
+    for payload in payloads:
+        legacy = adapt_to_legacy_features(TenantInput(**payload))
+        rows.append([legacy[name] for name in FEATURES])
+
+    print(f"{cores} cores, {args.model} model, {args.concurrency} concurrent clients\n")
+    print(f"{'backend':10s} {'k':>3s}  {'tenants':>14s}")
+    for backend, make in (("thread", thread_backend), ("process", process_backend)):
+        for k in sizes:
+            score_one, close = make(in_thread(scorer) if backend == "thread" else scorer, k)
+            asyncio.run(closed_loop(score_one, rows[:200], args.concurrency))   # warm up
+            elapsed, latencies = asyncio.run(closed_loop(score_one, rows, args.concurrency))
+            close()
+            report(backend, k, elapsed, latencies, len(rows))
+
+    # the real route, kernel model only: every request distinct, cache off
+    print("\n/api/score/compare end to end")
+    RESULT_CACHE.maxsize = 0
+
+    async def compare(payload):
+        status, _, _ = await call(app, "POST", "/api/score/compare", payload)
+        assert status == 200, status
+
+    for backend in ("thread", "process"):
+        score_routes.LEGACY_BACKEND = legacy_pool.LEGACY_BACKEND = backend
+        asyncio.run(closed_loop(compare, payloads[:200], args.concurrency))
+        elapsed, latencies = asyncio.run(closed_loop(compare, payloads, args.concurrency))
+        report(backend, cores, elapsed, latencies, len(payloads))
+
+    pool = legacy_pool.loaded_legacy_pool()
+    if pool is not None:
+        print(f"\nprocess pool: {pool.stats()}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""End-to-end load generator for /api/score and /api/score/compare.
+
+Run from backend/:
+
+  python -m bench.loadgen [--requests 5000] [--concurrency 32]        closed loop
+  python -m bench.loadgen --rate 500 --duration 20                     open loop
+  python -m bench.loadgen --url http://127.0.0.1:8000 ...              a running uvicorn
+  python -m bench.loadgen --replay traffic.jsonl ...                   recorded traffic
+  python -m bench.loadgen --json run.json --baseline last.json         regression check
+
+Without --url the app from main.py is driven in-process through the ASGI
+interface (bench/asgi.py); with it, over keep-alive HTTP/1.1 connections,
+one per client.
+
+Traffic is synthesized (bench/inputs.py applicants, --mix route weights,
+--distinct applicants so some repeat and hit the result cache) or replayed
+from a JSONL file with one {"method", "path", "body"} per line. --record
+writes the synthesized traffic in that format, to replay the exact same
+run later.
+
+Closed loop: --concurrency clients, each sending its next request when the
+last one is answered. Open loop: Poisson arrivals at --rate per second no
+matter how the server keeps up (at most --max-inflight outstanding, past
+that arrivals count as "dropped"); latency is measured from the scheduled
+arrival, so queueing in front of a slow server is included.
+
+The report gives throughput, latency percentiles and error rates per
+route. --baseline compares against an earlier --json and exits 1 when a
+route's throughput fell by more than --tolerance or its p99 rose by more
+than --p99-tolerance (latency tails are noisier than throughput).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+from bench.asgi import call
+from bench.inputs import sample_payloads
+from bench.timing import percentiles
+
+ROUTES = {"score": "/api/score", "compare": "/api/score/compare"}
+
+
+def synthesize(n: int, mix: dict, distinct: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    applicants = sample_payloads(distinct or n, seed=seed)
+    paths = rng.choices([ROUTES[name] for name in mix], weights=list(mix.values()), k=n)
+    return [{"method": "POST", "path": path, "body": rng.choice(applicants)} for path in paths]
+
+
+def read_traffic(path) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_traffic(traffic: list[dict], path):
+    with open(path, "w") as f:
+        for request in traffic:
+            f.write(json.dumps(request) + "\n")
+
+
+class AsgiTarget:
+    # the app in this process
+    def __init__(self):
+        from main import app
+
+        self.app = app
+
+    async def client(self):
+        return self
+
+    async def send(self, method, path, body) -> int:
+        status, _, _ = await call(self.app, method, path, body)
+        return status
+
+    async def close(self):
+        pass
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection; enough of the protocol for uvicorn."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def send(self, method, path, body) -> int:
+        data = b"" if body is None else json.dumps(body).encode()
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+        ).encode()
+        for attempt in (0, 1):   # once more on a fresh connection if it was closed
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self.writer.write(head + data)
+                return await self._response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+
+    async def _response(self) -> int:
+        status = int((await self.reader.readuntil(b"\r\n")).split()[1])
+        headers = {}
+        while (line := await self.reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while size := int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readuntil(b"\r\n")
+        else:
+            await self.reader.readexactly(int(headers.get("content-length", 0)))
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class HttpTarget:
+    # a running server, one connection per client
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connections = []
+
+    async def client(self):
+        connection = HttpConnection(self.host, self.port)
+        self.connections.append(connection)
+        return connection
+
+    async def close(self):
+        for connection in self.connections:
+            await connection.close()
+
+
+class Results:
+    def __init__(self):
+        self.routes = {}   # path -> {"latencies": [...], "statuses": {code: n}}
+        self.dropped = 0
+
+    def add(self, path, status, seconds):
+        route = self.routes.setdefault(path, {"latencies": [], "statuses": {}})
+        route["latencies"].append(seconds)
+        route["statuses"][status] = route["statuses"].get(status, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for path, route in sorted(self.routes.items()):
+            n = len(route["latencies"])
+            errors = sum(count for status, count in route["statuses"].items() if not 200 <= status < 300)
+            ms = percentiles(route["latencies"], (50, 90, 99))
+            routes[path] = {
+                "requests": n,
+                "throughput": round(n / elapsed, 1),
+                "error_rate": round(errors / n, 4),
+                "statuses": {str(status): count for status, count in sorted(route["statuses"].items(), key=str)},
+                **{f"{name}_ms": round(value * 1000, 3) for name, value in ms.items()},
+                "max_ms": round(max(route["latencies"]) * 1000, 3),
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "requests": total,
+            "throughput": round(total / elapsed, 1),
+            "dropped": self.dropped,
+            "routes": routes,
+        }
+
+
+async def send(target, results, request, start):
+    # start: when the request should have gone out
+    try:
+        status = await target.send(request["method"], request["path"], request.get("body"))
+    except Exception:
+        status = 599   # never got an answer
+    results.add(request["path"], status, time.perf_counter() - start)
+
+
+async def closed_loop(target, traffic, concurrency, deadline):
+    queue = list(reversed(traffic))
+    results = Results()
+
+    async def client():
+        connection = await target.client()
+        while queue and time.perf_counter() < deadline:
+            await send(connection, results, queue.pop(), time.perf_counter())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+async def open_loop(target, traffic, rate, max_inflight, deadline, seed=0):
+    rng = random.Random(seed)
+    results = Results()
+    idle = [await target.client() for _ in range(max_inflight)]
+    tasks = set()
+
+    async def one(connection, request, scheduled):
+        try:
+            await send(connection, results, request, scheduled)
+        finally:
+            idle.append(connection)
+
+    start = time.perf_counter()
+    scheduled = start
+    for request in traffic:
+        scheduled += rng.expovariate(rate)
+        if scheduled > deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if not idle:
+            results.dropped += 1
+            continue
+        task = asyncio.ensure_future(one(idle.pop(), request, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - start
+
+
+def compare_runs(report: dict, baseline: dict, tolerance: float, p99_tolerance: float) -> list[str]:
+    # -> regressions, one line each
+    problems = []
+    for path, now in report["routes"].items():
+        before = baseline["routes"].get(path)
+        if before is None:
+            continue
+        throughput = now["throughput"] / before["throughput"] - 1 if before["throughput"] else 0.0
+        p99 = now["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+        print(f"{path:22s} throughput {throughput:+7.1%}   p99 {p99:+7.1%}")
+        if throughput < -tolerance:
+            problems.append(f"{path}: throughput {throughput:+.1%}")
+        if p99 > p99_tolerance:
+            problems.append(f"{path}: p99 {p99:+.1%}")
+    return problems
+
+
+def print_report(report: dict):
+    print(f"{report['requests']} requests in {report['elapsed_seconds']:.2f} s: "
+          f"{report['throughput']:,.0f} req/s, {report['dropped']} dropped")
+    print(f"{'route':22s} {'req/s':>9s} {'errors':>7s} {'p50 ms':>9s} {'p90 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}")
+    for path, route in report["routes"].items():
+        print(f"{path:22s} {route['throughput']:9,.0f} {route['error_rate']:7.2%} {route['p50_ms']:9.2f} "
+              f"{route['p90_ms']:9.2f} {route['p99_ms']:9.2f} {route['max_ms']:9.2f}")
+
+
+def parse_mix(text: str) -> dict:
+    # "score=0.7,compare=0.3" -> {"score": 0.7, "compare": 0.3}
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route {name!r}, pick from {', '.join(ROUTES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="a running server, e.g. http://127.0.0.1:8000 (default: in-process)")
+    parser.add_argument("--replay", help="JSONL traffic to send instead of synthesizing it")
+    parser.add_argument("--record", help="write the synthesized traffic here as JSONL")
+    parser.add_argument("--requests", type=int, default=5000, help="synthesized requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("score=0.7,compare=0.3"))
+    parser.add_argument("--distinct", type=int, default=0, help="distinct applicants (default: all distinct)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=32, help="closed-loop clients")
+    parser.add_argument("--rate", type=float, help="open-loop arrivals per second")
+    parser.add_argument("--max-inflight", type=int, default=256, help="open-loop cap on outstanding requests")
+    parser.add_argument("--duration", type=float, help="stop sending after this many seconds")
+    parser.add_argument("--warmup", type=int, default=200, help="requests sent first and not counted")
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--baseline", help="an earlier --json report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="largest throughput drop allowed")
+    parser.add_argument("--p99-tolerance", type=float, default=0.50, help="largest p99 rise allowed")
+    args = parser.parse_args()
+
+    if args.replay:
+        traffic = read_traffic(args.replay)
+    else:
+        traffic = synthesize(args.requests, args.mix, args.distinct, args.seed)
+        if args.record:
+            write_traffic(traffic, args.record)
+    if args.rate and args.duration:
+        # open loop for a fixed time: cycle the traffic as long as needed
+        needed = int(args.rate * args.duration * 1.2) + 1
+        traffic = (traffic * (needed // len(traffic) + 1))[:needed]
+
+    async def run():
+        target = HttpTarget(args.url) if args.url else AsgiTarget()
+        await closed_loop(target, traffic[:args.warmup], args.concurrency, float("inf"))
+        deadline = time.perf_counter() + args.duration if args.duration else float("inf")
+        try:
+            if args.rate:
+                return await open_loop(target, traffic, args.rate, args.max_inflight, deadline, args.seed)
+            return await closed_loop(target, traffic, args.concurrency, deadline)
+        finally:
+            await target.close()
+
+    results, elapsed = asyncio.run(run())
+    report = {
+        "target": args.url or "in-process",
+        "mode": f"open loop {args.rate:g}/s" if args.rate else f"closed loop x{args.concurrency}",
+        **results.report(elapsed),
+    }
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare_runs(report, json.load(f), args.tolerance, args.p99_tolerance)
+        if problems:
+            print("regressions:\n  " + "\n  ".join(problems))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
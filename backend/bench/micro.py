@@ -0,0 +1,155 @@
+"""Microbenchmarks for the scoring services and route handlers.
+
+Run from backend/:
+
+    python -m bench.micro                          # print results
+    python -m bench.micro --out results.json       # also save them
+    python -m bench.micro --save-baseline bench/baseline.json
+    python -m bench.micro --baseline bench/baseline.json [--threshold 0.15]
+
+With --baseline, any case whose ops/sec dropped by more than --threshold
+(a fraction) is flagged and the exit status is 1. The result cache is
+turned off so the handlers really compute every call.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+
+from app.legacy.input import get_kernel, score_tenant
+from app.routes.score import compare_score, get_score
+from app.schemas.tenant import TenantInput
+from app.services.cache import RESULT_CACHE
+from app.services.explain import explain_features
+from app.services.features import compute_features
+from app.services.impact import calculate_impact
+from app.services.legacy_score import adapt_to_legacy_features
+from app.services.score import score_features
+from bench.inputs import sample_payloads
+from bench.timing import percentiles
+
+
+def build_cases(n):
+    short = [TenantInput(**p) for p in sample_payloads(n, seed=1, history_months=(0, 12))]
+    long = [TenantInput(**p) for p in sample_payloads(n, seed=2, history_months=(60, 60))]
+    features = [compute_features(t) for t in short]
+    legacy = [adapt_to_legacy_features(t) for t in short]
+    scores = [score_features(f)["score"] for f in features]
+    rents = [t.monthly_rent for t in short]
+
+    return {
+        "compute_features": (compute_features, [(t,) for t in short]),
+        "compute_features[60m history]": (compute_features, [(t,) for t in long]),
+        "score_features": (score_features, [(f,) for f in features]),
+        "explain_features": (explain_features, [(f,) for f in features]),
+        "calculate_impact": (calculate_impact, list(zip(scores, rents))),
+        "adapt_to_legacy_features": (adapt_to_legacy_features, [(t,) for t in short]),
+        "score_tenant": (score_tenant, [(x,) for x in legacy]),
+        "get_score": (get_score, [(t,) for t in short]),
+        "get_score[60m history]": (get_score, [(t,) for t in long]),
+        "compare_score": (compare_score, [(t,) for t in short]),
+    }
+
+
+def time_sync(fn, args_list, iterations):
+    timings = []
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        args = args_list[i % len(args_list)]
+        start = clock()
+        fn(*args)
+        timings.append(clock() - start)
+    return timings
+
+
+async def time_async(fn, args_list, iterations):
+    timings = []
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        args = args_list[i % len(args_list)]
+        start = clock()
+        await fn(*args)
+        timings.append(clock() - start)
+    return timings
+
+
+def run_case(fn, args_list, iterations):
+    is_async = asyncio.iscoroutinefunction(fn)
+    warmup = max(1, iterations // 10)
+    if is_async:
+        asyncio.run(time_async(fn, args_list, warmup))
+        timings = asyncio.run(time_async(fn, args_list, iterations))
+    else:
+        time_sync(fn, args_list, warmup)
+        timings = time_sync(fn, args_list, iterations)
+
+    us = [t / 1000 for t in timings]
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / (sum(timings) / 1e9),
+        **{f"{k}_us": v for k, v in percentiles(us, (50, 90, 99)).items()},
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        result["vs_baseline"] = change
+        if change < -threshold:
+            regressions.append((name, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--only", action="append", help="run just these cases (repeatable)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", help="write results JSON here as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed ops/sec drop vs baseline")
+    args = parser.parse_args()
+
+    RESULT_CACHE.maxsize = 0    # measure the work, not the cache
+    get_kernel()                # artifact load is not part of any case
+
+    cases = build_cases(min(args.iterations, 1000))
+    results = {}
+    for name, (fn, args_list) in cases.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_case(fn, args_list, args.iterations)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    print(f"{'case':32s} {'ops/sec':>12s} {'p50 us':>9s} {'p90 us':>9s} {'p99 us':>9s} {'vs base':>8s}")
+    for name, r in results.items():
+        change = f"{r['vs_baseline']:+.0%}" if "vs_baseline" in r else ""
+        print(f"{name:32s} {r['ops_per_sec']:12,.0f} {r['p50_us']:9.1f} {r['p90_us']:9.1f} {r['p99_us']:9.1f} {change:>8s}")
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "iterations": args.iterations,
+        "results": results,
+    }
+    for path in filter(None, (args.out, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+
+    for name, change in regressions:
+        print(f"REGRESSION: {name} {change:+.0%} ops/sec (threshold -{args.threshold:.0%})", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
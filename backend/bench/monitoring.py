@@ -0,0 +1,155 @@
+"""What the score monitor costs, and whether its numbers are right.
+
+Run from backend/:  python -m bench.monitoring [--n 20000]
+
+observe            observe() per /api/score and per /compare result, and
+                   observe_batch() per 1000-row batch
+report             GET /api/monitoring/scores' work with a full hour of slices
+memory             what one model version's ring holds, whatever the traffic
+windows            a fake clock run past the ring: the 5m / 1h windows only
+                   hold their slices, the total holds everything
+accuracy           quantiles and band rates against numpy over the raw scores
+psi                the reference against itself (0), a sample of it (stable)
+                   and the same applicants with incomes cut by a third
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from app.config.constants import MONITOR_QUANTILES
+from app.services.batch import compute_features_batch
+from app.services.history import IncomeHistories
+from app.services.monitoring import LEGACY_BINS, NEW_BINS, ScoreMonitor, psi, reference_columns
+from app.services.registry import REGISTRY
+
+
+class Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def results(version, n, seed):
+    # /compare-shaped results with made-up scores
+    rng = np.random.default_rng(seed)
+    out = []
+    for new, legacy in zip(rng.integers(0, 101, n).tolist(), np.round(rng.uniform(0, 100, n), 2).tolist()):
+        level = "low" if new >= version.low_risk_score else "medium" if new >= version.medium_risk_score else "high"
+        out.append({"new_model": {"score": new, "risk_level": level}, "legacy_model": {"score": legacy}})
+    return out
+
+
+def observe(version, items):
+    print("\nobserve")
+    monitor = ScoreMonitor(clock=Clock())
+    plain = [item["new_model"] for item in items]
+    for name, batch in (("/api/score", plain), ("/compare", items)):
+        started = time.perf_counter()
+        for result in batch:
+            monitor.observe(version, result)
+        print(f"  {name:12s} {(time.perf_counter() - started) / len(batch) * 1e6:6.2f}us per result")
+    scores = np.array([result["score"] for result in plain[:1000]])
+    started = time.perf_counter()
+    for _ in range(100):
+        monitor.observe_batch(version, scores)
+    print(f"  {'/batch':12s} {(time.perf_counter() - started) / 100 * 1e6:6.1f}us per 1000 rows")
+
+
+def report(version, items):
+    clock = Clock()
+    monitor = ScoreMonitor(clock=clock)
+    for result in items:
+        clock.now += 3600 / len(items)     # spread over an hour of slices
+        monitor.observe(version, result)
+    monitor.reference(version)             # built once, not timed
+    started = time.perf_counter()
+    for _ in range(20):
+        monitor.report(version)
+    print(f"\nreport: {(time.perf_counter() - started) / 20 * 1e3:.2f} ms with a full ring")
+
+    counters = (NEW_BINS + LEGACY_BINS + 9) * (monitor.buckets + 1)
+    print(f"memory: {monitor.buckets} slices + total, {counters} counters per model version "
+          f"(~{counters * 8 / 1024:.0f} KB of list slots)")
+
+
+def windows(version):
+    clock = Clock()
+    monitor = ScoreMonitor(clock=clock)
+    result = {"score": 90, "risk_level": "low"}
+    # one result a minute for two hours
+    for _ in range(120):
+        clock.now += 60
+        monitor.observe(version, result)
+    counts = {name: window["new_model"]["count"] for name, window in monitor.report(version)["windows"].items()}
+    print(f"\nwindows after 120 one-a-minute results: {counts}")
+    assert counts == {"5m": 5, "1h": 60, "total": 120}, counts
+
+
+def nearest_rank(values, q):
+    ordered = np.sort(values)
+    return ordered[max(1, math.ceil(q / 100 * len(ordered))) - 1]
+
+
+def accuracy(version, items):
+    monitor = ScoreMonitor(clock=Clock())
+    for result in items:
+        monitor.observe(version, result)
+    window = monitor.report(version)["windows"]["total"]
+    new = np.array([item["new_model"]["score"] for item in items])
+    legacy = np.array([item["legacy_model"]["score"] for item in items])
+
+    worst = {"new": 0.0, "legacy": 0.0}
+    for q in MONITOR_QUANTILES:
+        worst["new"] = max(worst["new"], abs(window["new_model"]["quantiles"][f"p{q}"] - nearest_rank(new, q)))
+        worst["legacy"] = max(worst["legacy"],
+                              abs(window["legacy_model"]["quantiles"][f"p{q}"] - nearest_rank(legacy, q)))
+    low = np.mean(legacy >= version.low_risk_score)
+    print(f"\naccuracy: worst quantile error new {worst['new']:.2f}, legacy {worst['legacy']:.2f} "
+          f"(bin {1 / 10:.1f}); legacy low-band rate {window['legacy_model']['band_rates']['low']:.4f} "
+          f"vs {low:.4f}")
+    assert worst["new"] == 0 and worst["legacy"] < 0.1 + 1e-9
+    assert window["legacy_model"]["band_rates"]["low"] == low
+
+
+def psi_checks(version, monitor):
+    reference = monitor.reference(version)
+    if reference is None:
+        print(f"\npsi: no reference file at {monitor.reference_path}, skipped")
+        return
+    columns = reference_columns(monitor.reference_path)
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(columns["monthly_rent"]), len(columns["monthly_rent"]) // 5, replace=False)
+
+    def scored(cols):
+        return np.bincount(version.score_batch(compute_features_batch(cols))["score"], minlength=NEW_BINS).tolist()
+
+    sampled = {name: column[sample] for name, column in columns.items() if name != "income_history"}
+    sampled["income_history"] = IncomeHistories(np.empty(0), np.zeros(len(sample) + 1, dtype=np.int64))
+    poorer = dict(columns, monthly_income=columns["monthly_income"] * (2 / 3))
+
+    print("\npsi against the reference (new model)")
+    for name, counts in (("itself", reference.new), ("20% sample", scored(sampled)),
+                         ("incomes -33%", scored(poorer))):
+        print(f"  {name:14s} {psi(counts, reference.new, 1):.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20_000, help="results to observe")
+    args = parser.parse_args()
+
+    version = REGISTRY.get(None)
+    items = results(version, args.n, seed=1)
+    observe(version, items)
+    report(version, items)
+    windows(version)
+    accuracy(version, items)
+    psi_checks(version, ScoreMonitor())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Batch refit (train_model) vs the one-pass online trainer.
+
+Run from backend/:  python -m bench.online_train [--rows 5000 10000000] [--workers N]
+
+Uses the same generated datasets as bench.columnar (kept in --data-dir).
+Each trainer runs in a fresh interpreter; the column cache is built before
+timing starts, so both read the same memory-mapped columns. Reports time,
+peak RSS and the largest difference between the two artifacts and between
+the scores they give.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from bench.columnar import BACKEND_DIR, dataset
+
+PRELUDE = """
+import json, resource, sys, time
+from app.legacy.artifact import build_artifact
+from app.legacy.online import train_artifact
+path, chunk_rows, workers = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+"""
+
+SNIPPETS = {
+    "batch": "t = time.perf_counter(); artifact = build_artifact(path)",
+    "online": "t = time.perf_counter(); artifact = train_artifact([path], chunk_rows, workers)",
+}
+
+EPILOGUE = """
+seconds = time.perf_counter() - t
+rss = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024
+print(json.dumps({"seconds": seconds, "rss_mb": rss, "artifact": artifact}))
+"""
+
+PARAMS = ("coef", "intercept", "scaler_mean", "scaler_var", "scaler_scale", "min_score", "max_score")
+
+
+def run(name, path, chunk_rows, workers) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PRELUDE + SNIPPETS[name] + EPILOGUE, str(path), str(chunk_rows), str(workers)],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def score_diff(a: dict, b: dict, n: int = 100_000) -> float:
+    from app.legacy.input import FEATURES
+    from app.legacy.kernel import LegacyKernel
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(n, len(FEATURES)))
+    return float(np.abs(LegacyKernel(a).score_many(X) - LegacyKernel(b).score_many(X)).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 10_000_000])
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "fairtenant-bench"))
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    from app.services.columnar import load_columns
+
+    data_dir = os.path.abspath(args.data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+
+    print(f"{'rows':>12s} {'trainer':8s} {'seconds':>9s} {'RSS MB':>9s} {'max param diff':>15s} {'max score diff':>15s}")
+    for rows in args.rows:
+        path = dataset(rows, Path(data_dir))
+        load_columns(path)   # cache build is not part of either trainer
+
+        batch = run("batch", path, args.chunk_rows, args.workers)
+        online = run("online", path, args.chunk_rows, args.workers)
+
+        diff = max(
+            float(np.max(np.abs(np.subtract(batch["artifact"][k], online["artifact"][k]))))
+            for k in PARAMS
+        )
+        scores = score_diff(batch["artifact"], online["artifact"])
+
+        print(f"{rows:12,d} {'batch':8s} {batch['seconds']:9.3f} {batch['rss_mb']:9.1f}")
+        print(f"{rows:12,d} {'online':8s} {online['seconds']:9.3f} {online['rss_mb']:9.1f} {diff:15.3g} {scores:15.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""POST /api/impact/portfolio for a large pool, per request body.
+
+Run from backend/:  python -m bench.portfolio [--n 100000]
+
+Server time (routing, decoding, scoring, the impact numbers, encoding) for
+one pool of --n tenants with income histories, in-process through the ASGI
+app, best of --repeat:
+
+tenant_input   the JSON body through PortfolioRequest, a TenantInput per row
+json           the same body through the fast path (columns straight from
+               the parsed JSON)
+npz / arrow    columnar bodies, as for /api/score/batch
+
+Every body must give the same response; the target for 100k tenants is
+well under a second.
+"""
+import argparse
+import asyncio
+import json
+
+import app.services.batch as batch
+from app.services.formats import ARROW, JSON, NPZ, available
+from bench.asgi import call
+from bench.formats import caller_columns, encode_arrow, encode_npz, timed, with_histories
+from bench.inputs import sample_payloads
+from main import app
+
+ROUTE = "/api/impact/portfolio"
+OPTIONS = {"percentiles": [50, 90, 95, 99], "lease_months": 12}
+
+
+def post(body: bytes, media: str) -> bytes:
+    query = "?" + "&".join([f"percentiles={p}" for p in OPTIONS["percentiles"]]
+                           + [f"lease_months={OPTIONS['lease_months']}"])
+    path = ROUTE if media == JSON else ROUTE + query
+    status, _, content = asyncio.run(call(app, "POST", path, body, {"content-type": media}))
+    assert status == 200, content[:200]
+    return content
+
+
+def tenant_input(body: bytes) -> bytes:
+    # the fast path declines every body, so FastAPI validates it as before
+    fast = batch.tenant_columns_from_json
+    batch.tenant_columns_from_json = lambda tenants: None
+    try:
+        return post(body, JSON)
+    finally:
+        batch.tenant_columns_from_json = fast
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payloads = with_histories(sample_payloads(args.n, seed=3))
+    columns = caller_columns(payloads)
+    bodies = {
+        "tenant_input": (json.dumps({"tenants": payloads, **OPTIONS}).encode(), JSON),
+        "json": (json.dumps({"tenants": payloads, **OPTIONS}).encode(), JSON),
+        "npz": (encode_npz(columns), NPZ),
+    }
+    # a missing package fails the run rather than dropping a row
+    assert available(ARROW), "the arrow body needs pyarrow"
+    bodies["arrow"] = (encode_arrow(columns), ARROW)
+
+    print(f"{args.n} tenants, best of {args.repeat}")
+    reference = None
+    for name, (body, media) in bodies.items():
+        send = (lambda: tenant_input(body)) if name == "tenant_input" else (lambda: post(body, media))
+        server_s, content = timed(send, args.repeat)
+        reference = reference or content
+        assert content == reference, name
+        print(f"  {name:14s} {server_s * 1e3:7.0f} ms  {len(body) / 2**20:6.1f} MB in")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""CPU per request: FastAPI response serialization vs the fast response path.
+
+Run from backend/:  python -m bench.responses [--n 3000] [--batch 100]
+
+Three modes:
+
+  validated      FAST_RESPONSES off: response_model validation (in the
+                 threadpool for sync handlers) + jsonable_encoder + json
+  fast[json]     fast path with the stdlib encoder (orjson not installed)
+  fast[orjson]   fast path with orjson
+
+"response stage" times only turning a handler's result into response bytes,
+the part the fast path replaces, exactly as FastAPI runs it.
+"end to end" sends the requests through the whole app in-process, modes
+interleaved round by round so drift hits them all alike; the fastest round
+counts. The result cache is off and all modes must produce byte-identical
+bodies.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+import app.services.responses as responses
+from app.legacy.input import get_kernel
+from app.services.cache import RESULT_CACHE
+from bench.asgi import call
+from bench.inputs import sample_payloads
+from main import app
+
+ORJSON = responses.orjson
+
+
+def set_mode(mode: str):
+    responses.FAST_RESPONSES = mode != "validated"
+    responses.orjson = ORJSON if mode == "fast[orjson]" else None
+
+
+def route_for(path):
+    return next(r for r in app.routes if getattr(r, "path", None) == path and "POST" in r.methods)
+
+
+async def encode(mode, route, results):
+    # result dicts -> response bodies, the way each mode does it
+    bodies = []
+    sync = not asyncio.iscoroutinefunction(route.dependant.call)
+    for result in results:
+        if mode == "validated":
+            content = await serialize_response(field=route.response_field, response_content=result, is_coroutine=not sync)
+            bodies.append(JSONResponse(content).body)
+        else:
+            bodies.append(responses.json_response(result).body)
+    return bodies
+
+
+async def requests(path, bodies):
+    out = []
+    for body in bodies:
+        status, _, response = await call(app, "POST", path, body)
+        assert status == 200, status
+        out.append(response)
+    return out
+
+
+def cpu(fn, *args):
+    start = time.process_time()
+    result = asyncio.run(fn(*args))
+    return time.process_time() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=3000)
+    parser.add_argument("--batch", type=int, default=100, help="tenants per /batch request")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per mode, the fastest counts")
+    args = parser.parse_args()
+
+    RESULT_CACHE.maxsize = 0
+    get_kernel()
+
+    payloads = sample_payloads(args.n, seed=3)
+    cases = {
+        "/api/score": payloads,
+        "/api/score/compare": payloads,
+        "/api/score/batch": [payloads[i:i + args.batch] for i in range(0, args.n, args.batch)],
+    }
+    modes = ["validated", "fast[json]"] + (["fast[orjson]"] if ORJSON else [])
+    header = f"{'route':22s} " + " ".join(f"{m:>14s}" for m in modes) + "   saving"
+
+    for stage in ("response stage", "end to end"):
+        print(f"\n{stage}, CPU per request\n{header}")
+        for path, bodies in cases.items():
+            route = route_for(path)
+            set_mode("validated")
+            reference = asyncio.run(requests(path, bodies))
+            results = [json.loads(b) for b in reference]
+
+            best = {mode: float("inf") for mode in modes}
+            for _ in range(args.repeat):
+                for mode in modes:
+                    set_mode(mode)
+                    if stage == "response stage":
+                        seconds, out = cpu(encode, mode, route, results)
+                    else:
+                        seconds, out = cpu(requests, path, bodies)
+                    assert out == reference, f"{mode} changed the response bytes of {path}"
+                    best[mode] = min(best[mode], seconds / len(bodies))
+
+            cells = " ".join(f"{best[m] * 1e6:11.1f} us" for m in modes)
+            print(f"{path:22s} {cells}   {1 - best[modes[-1]] / best['validated']:6.1%}")
+
+    set_mode("fast[orjson]" if ORJSON else "fast[json]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Import-time report and startup budget for the API.
+
+Run from backend/:  python -m bench.startup [--top 15]
+
+Imports main in a fresh interpreter under -X importtime, serves one
+/api/ and one /api/score request, then checks the budget below. Exits
+non-zero when startup got slower, pulled in more modules, or loaded any
+of the heavy modules that only the legacy/batch paths need, so it can run
+as a CI gate.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# budget, raise deliberately when a startup cost is worth paying
+MAX_IMPORT_MS = 1500
+MAX_MODULES = 600
+FORBIDDEN_AT_STARTUP = ("numpy", "pandas", "sklearn", "scipy")
+
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+import_s = time.perf_counter() - start
+
+from bench.asgi import call
+payload = {"monthly_income": 5200, "monthly_rent": 1800, "liquid_savings": 6000, "monthly_debt": 400}
+statuses = [
+    asyncio.run(call(main.app, "GET", "/api/"))[0],
+    asyncio.run(call(main.app, "POST", "/api/score", payload))[0],
+]
+print(json.dumps({"import_s": import_s, "statuses": statuses, "modules": sorted(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr: str, max_depth: int = 2) -> list[tuple[str, int, int]]:
+    # (module, self us, cumulative us) for imports nested at most max_depth deep
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue   # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= max_depth:
+            rows.append(("  " * depth + name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        print(proc.stderr, file=sys.stderr)
+        sys.exit(proc.returncode)
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    rows = parse_importtime(proc.stderr)
+
+    print(f"{'cumulative ms':>14}  module")
+    for name, _, cumulative in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{cumulative / 1000:14.1f}  {name}")
+
+    import_ms = result["import_s"] * 1000
+    modules = result["modules"]
+    heavy = [m for m in FORBIDDEN_AT_STARTUP if m in modules]
+
+    print(f"\nimport main: {import_ms:.0f} ms (budget {MAX_IMPORT_MS}), "
+          f"{len(modules)} modules (budget {MAX_MODULES}), heavy: {heavy or 'none'}")
+
+    failures = []
+    if import_ms > MAX_IMPORT_MS:
+        failures.append(f"import took {import_ms:.0f} ms > {MAX_IMPORT_MS} ms")
+    if len(modules) > MAX_MODULES:
+        failures.append(f"{len(modules)} modules loaded > {MAX_MODULES}")
+    if heavy:
+        failures.append(f"heavy modules loaded at startup: {', '.join(heavy)}")
+    if result["statuses"] != [200, 200]:
+        failures.append(f"probe requests failed: {result['statuses']}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
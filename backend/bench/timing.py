@@ -0,0 +1,12 @@
+"""Small timing helpers shared by the benchmarks."""
+
+
+def percentiles(samples, points=(50, 90, 99)) -> dict:
+    # nearest-rank percentiles, in the samples' own unit
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": None for p in points}
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+        for p in points
+    }
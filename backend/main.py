@@ -1,10 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from pydantic import BaseModel, Field
-from app.routes import score
+from app.routes import score, metrics, impact, models, decisions, monitoring
+from app.services.legacy_pool import get_legacy_pool, loaded_legacy_pool
+from app.services.admission import AdmissionMiddleware, Overloaded, overloaded_response
+from app.services.decision_log import DECISIONS
 
-app = FastAPI(title="Restaurant Finder API")
+
+@asynccontextmanager
+async def lifespan(app):
+    # a decision log that can't be written stops the app here, not later
+    DECISIONS.check_writable()
+    # with FAIRTENANT_LEGACY_BACKEND=process, start the legacy workers before
+    # the first request instead of during it
+    get_legacy_pool()
+    yield
+    pool = loaded_legacy_pool()
+    if pool is not None:
+        pool.close()
+
+
+app = FastAPI(title="Restaurant Finder API", lifespan=lifespan)
+# per-route concurrency limits, see ADMISSION_LIMITS
+app.add_middleware(AdmissionMiddleware)
+app.add_exception_handler(Overloaded, lambda request, e: overloaded_response(e))
 
 app.include_router(score.router)
+app.include_router(metrics.router)
+app.include_router(impact.router)
+app.include_router(models.router)
+app.include_router(decisions.router)
+app.include_router(monitoring.router)
 
 
 @app.get("/api/")
@@ -0,0 +1,157 @@
+"""Score a JSONL file of applicants with both the new and the legacy model.
+
+    python score_file.py applicants.jsonl -o scored.jsonl --workers 8
+
+Each input line is one TenantInput object; a "request_id" field, if present,
+is copied to the output line. A record that fails validation (including
+inf or NaN numbers, e.g. 1e400) gets "error" (the validation errors) and
+"line" instead of a score, as does one that can't be scored (a ratio that
+overflows) or a line that isn't a JSON object at all. Either way the rest
+of the file still gets scored. Lines are read and scored in chunks across a
+process pool, so memory stays bounded no matter how big the file is, and the
+output keeps the input order.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from pydantic import ConfigDict, ValidationError
+
+from app.legacy.input import get_kernel
+from app.schemas.tenant import TenantInput
+from app.services.features import compute_features
+from app.services.impact import calculate_impact
+from app.services.legacy_score import score_legacy
+from app.services.score import score_features
+
+
+class FiniteTenantInput(TenantInput):
+    # json.loads reads 1e400 as inf and NaN as nan; neither can be scored
+    model_config = ConfigDict(allow_inf_nan=False)
+
+
+def _json_safe(error: dict) -> dict:
+    # an inf / nan "input" would write Infinity / NaN, which isn't JSON
+    value = error.get("input")
+    if isinstance(value, float) and not math.isfinite(value):
+        return {**error, "input": str(value)}
+    return error
+
+
+def init_worker():
+    # load the legacy model once per process, not once per chunk
+    get_kernel()
+
+
+def score_record(line: str, line_number: int = None) -> dict:
+    # a line that isn't a JSON object gets an error result, like a record
+    # that fails validation; the rest of the file still gets scored
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"error": f"invalid JSON: {e}", "line": line_number}
+    if not isinstance(record, dict):
+        return {"error": f"expected a JSON object, got {type(record).__name__}", "line": line_number}
+    result = {"request_id": record["request_id"]} if "request_id" in record else {}
+
+    try:
+        tenant = FiniteTenantInput.model_validate(record)
+    except ValidationError as e:
+        result["error"] = [_json_safe(error) for error in e.errors(include_url=False)]
+        result["line"] = line_number
+        return result
+
+    rent = tenant.monthly_rent
+
+    try:
+        score_result = score_features(compute_features(tenant))
+        legacy = score_legacy(tenant)
+    except (OverflowError, ValueError) as e:
+        # finite inputs whose ratios aren't, e.g. a huge income over a tiny rent
+        result.update(error=f"can't score this record: {e}", line=line_number)
+        return result
+
+    result["new_model"] = {
+        "score": score_result["score"],
+        "risk_level": score_result["risk_level"],
+        "impact": calculate_impact(score_result["score"], rent),
+    }
+    result["legacy_model"] = {
+        "score": legacy["score"],
+        "impact": calculate_impact(legacy["score"], rent),
+    }
+    return result
+
+
+def score_chunk(lines: list[tuple[int, str]]) -> str:
+    # workers hand back ready-to-write text, the parent only does I/O
+    return "".join(json.dumps(score_record(line, n)) + "\n" for n, line in lines)
+
+
+def read_chunks(f, chunk_size: int):
+    # (line number, line) pairs, blank lines skipped
+    lines = ((n, line) for n, line in enumerate(f, 1) if line.strip())
+    while chunk := list(islice(lines, chunk_size)):
+        yield chunk
+
+
+def score_file(src, dst, workers: int, chunk_size: int) -> int:
+    count = 0
+
+    if workers <= 1:
+        init_worker()
+        for chunk in read_chunks(src, chunk_size):
+            dst.write(score_chunk(chunk))
+            count += len(chunk)
+        return count
+
+    # at most 2 chunks per worker in flight; results are written strictly in
+    # submission order, so output order == input order
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        pending = deque()
+        for chunk in read_chunks(src, chunk_size):
+            pending.append((len(chunk), pool.submit(score_chunk, chunk)))
+            if len(pending) >= workers * 2:
+                size, future = pending.popleft()
+                dst.write(future.result())
+                count += size
+
+        while pending:
+            size, future = pending.popleft()
+            dst.write(future.result())
+            count += size
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of applicants, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output path, - for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="records per chunk")
+    args = parser.parse_args()
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    start = time.perf_counter()
+    with src, dst:
+        count = score_file(src, dst, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"scored {count} records in {elapsed:.2f}s "
+        f"({count / elapsed if elapsed else 0:,.0f} records/s, {args.workers} workers)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
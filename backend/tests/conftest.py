@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# the app is imported the way main.py does, from backend/
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# route tests shouldn't append to backend/data/decisions
+os.environ.setdefault("FAIRTENANT_DECISION_LOG", "0")
@@ -0,0 +1,52 @@
+import pytest
+
+from app.legacy.input import DATA_PATH
+from app.legacy.online import TrainingStats, train_artifact, update_artifact
+
+
+@pytest.fixture
+def split_csvs(tmp_path):
+    header, *rows = DATA_PATH.read_text().splitlines()
+    rows = rows[:3000]
+    parts = [rows[:1200], rows[1200:2100], rows[2100:]]
+    paths = []
+    for i, part in enumerate(parts):
+        path = tmp_path / f"part{i}.csv"
+        path.write_text("\n".join([header, *part]) + "\n")
+        paths.append(path)
+    return paths
+
+
+def test_stats_round_trip(split_csvs):
+    artifact = train_artifact(split_csvs[:1])
+    stats = TrainingStats.from_dict(artifact["training_stats"])
+    assert stats.to_dict() == artifact["training_stats"]
+
+
+def test_update_matches_full_retrain(split_csvs):
+    full = train_artifact(split_csvs)
+
+    incremental = train_artifact(split_csvs[:1])
+    for path in split_csvs[1:]:
+        incremental = update_artifact(incremental, [path])
+
+    assert incremental["source_sha256"] == full["source_sha256"]
+    assert incremental["source_hashes"] == full["source_hashes"]
+    assert incremental["n_samples"] == full["n_samples"] == 3000
+    for key in ("coef", "scaler_mean", "scaler_scale"):
+        assert incremental[key] == pytest.approx(full[key], rel=1e-9)
+    for key in ("intercept", "min_score", "max_score"):
+        assert incremental[key] == pytest.approx(full[key], rel=1e-9)
+
+
+def test_update_refuses_a_csv_twice(split_csvs):
+    artifact = train_artifact(split_csvs[:2])
+    with pytest.raises(ValueError, match="already in the artifact"):
+        update_artifact(artifact, [split_csvs[1]])
+
+
+def test_update_needs_stored_stats(split_csvs):
+    artifact = train_artifact(split_csvs[:1])
+    del artifact["training_stats"]
+    with pytest.raises(ValueError, match="no training_stats"):
+        update_artifact(artifact, [split_csvs[1]])
@@ -0,0 +1,44 @@
+import json
+import math
+
+import pytest
+
+from app.config.constants import WEIGHTS
+from app.services.registry import ModelRegistry, ModelVersion
+
+GOOD = {"name": "candidate", "weights": dict(WEIGHTS), "low_risk_score": 80, "medium_risk_score": 40}
+
+
+@pytest.mark.parametrize("field, value", [
+    ("low_risk_score", "80"),
+    ("medium_risk_score", "40"),
+    ("low_risk_score", math.inf),
+    ("medium_risk_score", -math.inf),
+    ("low_risk_score", math.nan),
+    ("medium_risk_score", math.nan),
+    ("low_risk_score", 101),
+    ("medium_risk_score", -1),
+    ("low_risk_score", True),
+    ("medium_risk_score", None),
+])
+def test_malformed_cutoff_is_rejected(field, value):
+    with pytest.raises(ValueError, match=field):
+        ModelVersion.from_spec({**GOOD, field: value}, base_dir=None)
+
+
+def test_good_cutoffs_load():
+    version = ModelVersion.from_spec(GOOD, base_dir=None)
+    assert (version.low_risk_score, version.medium_risk_score) == (80, 40)
+
+
+def test_reload_with_a_malformed_cutoff_keeps_the_old_versions(tmp_path):
+    path = tmp_path / "models.json"
+    path.write_text(json.dumps({"versions": [GOOD]}))
+    registry = ModelRegistry(path)
+    assert registry.get("candidate").low_risk_score == 80
+
+    # json.dumps writes Infinity, which json.loads reads back as inf
+    path.write_text(json.dumps({"versions": [{**GOOD, "low_risk_score": math.inf}]}))
+    with pytest.raises(ValueError, match="low_risk_score"):
+        registry.reload()
+    assert registry.get("candidate").low_risk_score == 80
@@ -0,0 +1,37 @@
+import io
+import json
+
+import pytest
+
+from score_file import score_file
+
+GOOD = {"monthly_income": 4200, "monthly_rent": 1400, "liquid_savings": 5000, "monthly_debt": 300}
+
+
+def lines(*records) -> str:
+    return "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in records)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_non_finite_records_get_an_error_line(workers):
+    src = io.StringIO(lines(
+        dict(GOOD, request_id="a"),
+        '{"request_id": "inf", "monthly_income": 1e400, "monthly_rent": 1400, "liquid_savings": 0, "monthly_debt": 0}',
+        '{"request_id": "nan", "monthly_income": 4200, "monthly_rent": NaN, "liquid_savings": 0, "monthly_debt": 0}',
+        dict(GOOD, request_id="history", income_history=[4000, float("nan"), 4100]),
+        dict(GOOD, request_id="overflow", monthly_income=1e308, monthly_rent=1e-300),
+        "not json",
+        dict(GOOD, request_id="b"),
+    ))
+    dst = io.StringIO()
+
+    assert score_file(src, dst, workers=workers, chunk_size=2) == 7
+
+    # strict JSON out, one line per line in, in order
+    out = [json.loads(line, parse_constant=pytest.fail) for line in dst.getvalue().splitlines()]
+    assert [r.get("request_id") for r in out] == ["a", "inf", "nan", "history", "overflow", None, "b"]
+    assert "new_model" in out[0] and "new_model" in out[-1]
+    for n, record in enumerate(out[1:6], 2):
+        assert record["line"] == n and "error" in record and "new_model" not in record
+    assert out[1]["error"][0]["type"] == "finite_number"
+    assert out[3]["error"][0]["loc"] == ["income_history", 1]
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config.constants import WEIGHTS
+from app.routes import score
+from app.services.registry import ModelRegistry
+
+STEEP = {
+    "name": "steep",
+    "weights": {**WEIGHTS, "income_to_rent": 0.5},
+    "low_risk_score": 90,
+    "medium_risk_score": 60,
+}
+TENANT = {"monthly_income": 4000, "monthly_rent": 2000, "liquid_savings": 3000, "monthly_debt": 200}
+RENTS = {"start": 1000, "stop": 4000, "steps": 13}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from main import app
+
+    path = tmp_path / "models.json"
+    path.write_text(json.dumps({"versions": [STEEP]}))
+    monkeypatch.setattr(score, "REGISTRY", ModelRegistry(path))
+    return TestClient(app)
+
+
+def _sensitivity(client, model=None):
+    params = {"model": model} if model else {}
+    response = client.post("/api/score/sensitivity", params=params,
+                           json={"tenant": TENANT, "ranges": {"monthly_rent": RENTS}})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _score(client, model, **tenant):
+    response = client.post("/api/score", params={"model": model}, json={**TENANT, **tenant})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_grid_uses_the_requested_version(client):
+    grid = _sensitivity(client, "steep")
+    rents = grid["axes"][0]["values"]
+    for rent, points, level in zip(rents, grid["score"], grid["risk_level"]):
+        single = _score(client, "steep", monthly_rent=rent)
+        assert (points, level) == (single["score"], single["risk_level"])
+
+    assert grid["score"] != _sensitivity(client)["score"]
+
+
+def test_boundaries_use_the_requested_version(client):
+    boundaries = _sensitivity(client, "steep")["boundaries"]
+    assert boundaries != _sensitivity(client)["boundaries"]
+
+    rent = boundaries["monthly_rent"]
+    assert _score(client, "steep", monthly_rent=rent["low"])["risk_level"] == "low"
+    assert _score(client, "steep", monthly_rent=rent["low"] * (1 + 1e-9))["risk_level"] != "low"
+    assert _score(client, "steep", monthly_rent=rent["medium"])["risk_level"] in ("low", "medium")
+    assert _score(client, "steep", monthly_rent=rent["medium"] * (1 + 1e-9))["risk_level"] == "high"
+
+    income = boundaries["monthly_income"]
+    assert _score(client, "steep", monthly_income=income["low"])["risk_level"] == "low"
+    assert _score(client, "steep", monthly_income=income["low"] * (1 - 1e-9))["risk_level"] != "low"
+
+
+def test_unknown_version_is_404(client):
+    response = client.post("/api/score/sensitivity", params={"model": "nope"},
+                           json={"tenant": TENANT, "ranges": {"monthly_rent": RENTS}})
+    assert response.status_code == 404